@@ -1,3 +1,40 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from .models import TeamAlias, UnresolvedTeamName
+from .teams import normalize_team_name
+
+
+@admin.register(TeamAlias)
+class TeamAliasAdmin(admin.ModelAdmin):
+    list_display = ('name', 'provider', 'team', 'manual')
+    list_filter = ('provider', 'manual')
+    search_fields = ('name', 'team__name')
+    readonly_fields = ('normalized_name', 'manual')
+
+    def save_model(self, request, obj, form, change):
+        # Anything saved here is an override and must win over learned aliases
+        obj.normalized_name = normalize_team_name(obj.name)
+        obj.manual = True
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(UnresolvedTeamName)
+class UnresolvedTeamNameAdmin(admin.ModelAdmin):
+    list_display = ('name', 'provider', 'suggestion', 'occurrences', 'last_seen')
+    list_filter = ('provider',)
+    search_fields = ('name',)
+    ordering = ('-last_seen',)
+    actions = ['accept_suggestions']
+
+    @admin.action(description="Add manual aliases mapping the selected names to their suggested team")
+    def accept_suggestions(self, request, queryset):
+        accepted = 0
+        for unresolved in queryset.exclude(suggestion=None):
+            TeamAlias.objects.update_or_create(
+                provider=unresolved.provider,
+                normalized_name=unresolved.normalized_name,
+                defaults={'name': unresolved.name, 'team_id': unresolved.suggestion_id, 'manual': True},
+            )
+            unresolved.delete()
+            accepted += 1
+        self.message_user(request, f"Added {accepted} manual aliases", messages.SUCCESS)
@@ -0,0 +1,144 @@
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from .db import WRITER, writes
+from .models import ArbitrageOpportunity, BookmakerOdds, Match, OddsSnapshot
+
+# Outcome order along the last axis of every price array
+OUTCOMES = tuple(outcome for outcome, _ in OddsSnapshot.OUTCOME_CHOICES)
+
+
+class OddsBoard:
+    """Decimal prices for many matches as a dense (matches x bookmakers x outcomes) array
+
+    Missing quotes are stored as NaN so every computation can run on the whole board at once.
+    """
+
+    def __init__(self, match_ids, bookmakers, prices, names=None):
+        self.match_ids = list(match_ids)
+        self.bookmakers = list(bookmakers)
+        self.prices = prices
+        # Display name per bookmaker, for boards keyed by bookmaker_key
+        self.names = names or {}
+
+    @classmethod
+    def from_quotes(cls, quotes):
+        """Build a board from (match_id, bookmaker, home, draw, away) tuples"""
+        quotes = list(quotes)
+        match_ids = sorted({quote[0] for quote in quotes})
+        bookmakers = sorted({quote[1] for quote in quotes})
+        match_index = {match_id: i for i, match_id in enumerate(match_ids)}
+        bookmaker_index = {name: j for j, name in enumerate(bookmakers)}
+
+        prices = np.full((len(match_ids), len(bookmakers), len(OUTCOMES)), np.nan)
+        if quotes:
+            rows = np.array([match_index[quote[0]] for quote in quotes])
+            cols = np.array([bookmaker_index[quote[1]] for quote in quotes])
+            prices[rows, cols] = np.array([quote[2:] for quote in quotes], dtype=float)
+        return cls(match_ids, bookmakers, prices)
+
+    @classmethod
+    def load(cls, matches=None):
+        """Load the stored odds board keyed by bookmaker_key, optionally restricted to a Match queryset"""
+        quotes = BookmakerOdds.objects.all()
+        if matches is not None:
+            quotes = quotes.filter(match__in=matches)
+        quotes = list(quotes.values_list(
+            'match_id', 'bookmaker_key', 'bookmaker', 'home_win_odds', 'draw_odds', 'away_win_odds'
+        ))
+        board = cls.from_quotes((quote[0], quote[1], *quote[3:]) for quote in quotes)
+        board.names = {quote[1]: quote[2] for quote in quotes}
+        return board
+
+    def best_prices(self):
+        """Return (best price, index of the bookmaker offering it), each shaped (matches, outcomes)"""
+        filled = np.nan_to_num(self.prices, nan=0.0)
+        if not self.bookmakers:
+            shape = (len(self.match_ids), len(OUTCOMES))
+            return np.zeros(shape), np.zeros(shape, dtype=int)
+        best_index = filled.argmax(axis=1)
+        best = np.take_along_axis(filled, best_index[:, None, :], axis=1)[:, 0, :]
+        return best, best_index
+
+
+def three_way_arbitrage(best, bankroll=1000.0):
+    """Evaluate every match's best 1X2 prices in a single vectorized pass
+
+    best is a (matches, 3) array of decimal prices, 0 where an outcome has no quote.
+    Stakes split the bankroll in proportion to implied probability, so every
+    outcome pays the same amount and profit is guaranteed when the sum is below 1.
+    """
+    best = np.asarray(best, dtype=float)
+    complete = (best > 1.0).all(axis=1)
+    implied = np.divide(1.0, best, out=np.zeros_like(best), where=best > 0)
+    total = implied.sum(axis=1)
+    safe_total = np.where(complete, total, 1.0)
+
+    stakes = bankroll * implied / safe_total[:, None]
+    payout = bankroll / safe_total
+    profit = np.where(complete, payout - bankroll, 0.0)
+    return {
+        'complete': complete,
+        'total_probability': np.where(complete, total, np.nan),
+        'is_arbitrage': complete & (total < 1.0),
+        'stakes': np.where(complete[:, None], stakes, 0.0),
+        'profit': profit,
+        'profit_pct': profit / bankroll * 100,
+    }
+
+
+def scan(board, bankroll=1000.0):
+    """Return every arbitrage opportunity on the board, most profitable first"""
+    best, best_index = board.best_prices()
+    result = three_way_arbitrage(best, bankroll)
+
+    opportunities = []
+    for i in np.flatnonzero(result['is_arbitrage']):
+        keys = [board.bookmakers[j] for j in best_index[i]]
+        opportunities.append({
+            'match_id': board.match_ids[i],
+            'total_probability': float(result['total_probability'][i]),
+            'profit': float(result['profit'][i]),
+            'profit_pct': float(result['profit_pct'][i]),
+            'legs': [
+                {
+                    'outcome': outcome,
+                    'bookmaker': board.names.get(keys[k], keys[k]),
+                    'bookmaker_key': keys[k],
+                    'price': float(best[i, k]),
+                    'stake': float(result['stakes'][i, k]),
+                }
+                for k, outcome in enumerate(OUTCOMES)
+            ],
+        })
+    opportunities.sort(key=lambda opportunity: opportunity['profit_pct'], reverse=True)
+    return opportunities
+
+
+@writes
+def rebuild_opportunities(competition, bankroll=1000.0):
+    """Rescan a competition's upcoming matches and replace its ArbitrageOpportunity rows"""
+    upcoming = Match.objects.filter(competition=competition, status__in=['scheduled', 'live'])
+    kickoffs = dict(upcoming.values_list('id', 'match_date'))
+    opportunities = scan(OddsBoard.load(upcoming), bankroll)
+
+    rows = []
+    for opportunity in opportunities:
+        row = ArbitrageOpportunity(
+            match_id=opportunity['match_id'],
+            total_probability=opportunity['total_probability'],
+            profit_pct=opportunity['profit_pct'],
+            match_date=kickoffs[opportunity['match_id']],
+        )
+        for leg in opportunity['legs']:
+            setattr(row, f"{leg['outcome']}_bookmaker", leg['bookmaker'])
+            setattr(row, f"{leg['outcome']}_bookmaker_key", leg['bookmaker_key'])
+            setattr(row, f"{leg['outcome']}_odds", Decimal(str(leg['price'])))
+        rows.append(row)
+
+    with transaction.atomic(using=WRITER):
+        ArbitrageOpportunity.objects.filter(match__competition=competition).delete()
+        ArbitrageOpportunity.objects.bulk_create(rows)
+    return len(rows)
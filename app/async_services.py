@@ -0,0 +1,100 @@
+import asyncio
+import logging
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from .http_client import AsyncApiClient
+from .metrics import ingest_phase
+from .services import FootballDataService
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFootballDataService:
+    """Non-blocking FootballDataService: fetches upstream feeds concurrently on one event loop
+
+    Requests go through the same rate limiters and response cache as the sync service;
+    database writes are handed to the sync service via sync_to_async.
+    """
+
+    def __init__(self, service=None, max_concurrency=4):
+        self.service = service or FootballDataService()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.http = None
+
+    async def __aenter__(self):
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+        )
+        self.football_client = AsyncApiClient(self.service.football_client, self.http)
+        self.odds_client = AsyncApiClient(self.service.odds_client, self.http)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.http.aclose()
+
+    async def _get_json(self, endpoint, client, url, params=None, headers=None):
+        async with self.semaphore:
+            return await self.service.cache.aget_json(
+                endpoint, url, client.get, params=params, headers=headers
+            )
+
+    async def fetch_upcoming_matches(self):
+        url, params = self.service.upcoming_matches_request()
+        data = await self._get_json(
+            'matches', self.football_client, url, params, self.service.headers
+        )
+        return data.get('matches', [])
+
+    async def fetch_league_table(self):
+        url = self.service.league_table_request()
+        data = await self._get_json('standings', self.football_client, url, headers=self.service.headers)
+        return data['standings'][0]['table']
+
+    async def fetch_fixtures(self, external_ids):
+        url, params = self.service.fixtures_request(external_ids)
+        async with self.semaphore:
+            with ingest_phase(self.service.competition.code, 'live', 'fetch'):
+                response = await self.football_client.get(url, params=params, headers=self.service.headers)
+        response.raise_for_status()
+        return self.service.fixtures_from_response(external_ids, response.json())
+
+    async def poll_fixtures(self):
+        """Fetch every due batch of fixtures concurrently, then store each one"""
+        scheduler = self.service.fixture_scheduler
+        batches = await sync_to_async(scheduler.plan)(self.service.fixture_budget())
+        results = await asyncio.gather(
+            *(self.fetch_fixtures(batch) for batch in batches), return_exceptions=True
+        )
+        polled = 0
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error polling {len(batch)} fixtures: {result}")
+                continue
+            await sync_to_async(self.service.upsert_matches)(result, feed='live')
+            scheduler.mark_polled(batch)
+            polled += len(batch)
+        return polled
+
+    async def fetch_odds_board(self):
+        url, params = self.service.odds_board_request()
+        async with self.semaphore:
+            response = await self.odds_client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def update_matches(self):
+        with ingest_phase(self.service.competition.code, 'matches', 'fetch'):
+            matches = await self.fetch_upcoming_matches()
+        return await sync_to_async(self.service.upsert_matches)(matches)
+
+    async def sync_league_table(self):
+        with ingest_phase(self.service.competition.code, 'league_table', 'fetch'):
+            standings = await self.fetch_league_table()
+        return await sync_to_async(self.service.sync_league_table)(standings)
+
+    async def refresh_odds(self):
+        with ingest_phase(self.service.competition.code, 'odds', 'fetch'):
+            events = await self.fetch_odds_board()
+        return await sync_to_async(self.service.store_odds)(events)
@@ -0,0 +1,209 @@
+import logging
+import re
+import time
+from collections import Counter
+from itertools import islice
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .db import WRITER, writes
+from .fixture_weeks import rebuild_fixture_weeks
+from .http_client import get_client
+from .metrics import ingest_phase, record_rows
+from .models import BackfillProgress, Match, SeasonStanding
+from .services import FootballDataService
+from .signals import bump_feed_version
+from .streaming import CHUNK_SIZE, chunked, decode_chunks, iter_json_array
+
+logger = logging.getLogger(__name__)
+
+FEEDS = ('matches', 'standings')
+
+# Seconds to wait before resuming after a failed request that gave no Retry-After
+RETRY_DELAY = 60
+
+
+def parse_seasons(value):
+    """Season start years from '2019..2025', '2021' or '2019,2021'; raises ValueError"""
+    seasons = set()
+    for part in value.split(','):
+        match = re.fullmatch(r'\s*(\d{4})\s*(?:\.\.\s*(\d{4})\s*)?', part)
+        if not match:
+            raise ValueError(f"Invalid season {part.strip()!r}, expected e.g. 2019 or 2019..2025")
+        first, last = int(match[1]), int(match[2] or match[1])
+        if last < first:
+            raise ValueError(f"Season range {part.strip()!r} runs backwards")
+        seasons.update(range(first, last + 1))
+    return sorted(seasons)
+
+
+class SeasonBackfill:
+    """Loads past seasons' finished matches and final standings for one competition
+
+    Each (season, feed) is a single streamed upstream request. Its items are parsed
+    as the body arrives and written in chunks, each chunk in one transaction together
+    with the feed's BackfillProgress checkpoint, so an interrupted run resumes after
+    the last committed chunk. Requests are capped at a share of the football-data.org
+    rate limit (settings.BACKFILL_RATE_SHARE). That cap is local to this process: a
+    running ingestor keeps its own full budget, and both only slow down once the
+    upstream's remaining-requests header shows the other's calls. A request that still
+    fails, e.g. a 429 after the client's own retries, is retried from the checkpoint
+    after the upstream's Retry-After.
+    """
+
+    def __init__(self, competition=None, chunk_rows=None, attempts=3, service=None):
+        self.service = service or FootballDataService(competition)
+        self.competition = self.service.competition
+        self.client = get_client(
+            'football_data', f"{self.competition.code}:backfill", settings.BACKFILL_RATE_SHARE
+        )
+        self.chunk_rows = chunk_rows or settings.BACKFILL_CHUNK_ROWS
+        self.attempts = attempts
+        # Items committed by this instance per (season, feed), across retries
+        self.written = Counter()
+
+    def season_request(self, feed, season):
+        """URL and params for one season of a feed"""
+        url = f"{self.service.BASE_URL}/competitions/{self.competition.code}/{feed}"
+        params = {'season': season}
+        if feed == 'matches':
+            params['status'] = 'FINISHED'
+        return url, params
+
+    def stream(self, feed, season):
+        """Items of one season feed, parsed incrementally from the response body"""
+        url, params = self.season_request(feed, season)
+        with ingest_phase(self.competition.code, f"{feed}_backfill", 'fetch'):
+            response = self.client.get(url, params=params, headers=self.service.headers, stream=True)
+        with response:
+            response.raise_for_status()
+            items = iter_json_array(decode_chunks(response.iter_content(CHUNK_SIZE)), feed)
+            if feed == 'matches':
+                yield from items
+                return
+            # Standings come as groups (total, home, away); cups have one total per group
+            for group in items:
+                if group.get('type', 'TOTAL') == 'TOTAL':
+                    yield from group['table']
+
+    def run(self, seasons, feeds=FEEDS, restart=False):
+        """Backfill every season and feed; returns {(season, feed): items written}"""
+        for season in seasons:
+            for feed in feeds:
+                self.load_with_retries(feed, season, restart)
+        if any(count for (season, feed), count in self.written.items() if feed == 'matches'):
+            self.rebuild_latest_weeks()
+        return {(season, feed): self.written[(season, feed)] for season in seasons for feed in feeds}
+
+    def load_with_retries(self, feed, season, restart=False):
+        for attempt in range(1, self.attempts + 1):
+            try:
+                # Only the first attempt may restart; later ones resume what it wrote
+                self.load(feed, season, restart and attempt == 1)
+                return
+            except requests.RequestException as e:
+                if attempt == self.attempts:
+                    raise
+                response = getattr(e, 'response', None)
+                retry_after = response.headers.get('Retry-After') if response is not None else None
+                delay = int(retry_after) if (retry_after or '').isdigit() else RETRY_DELAY
+                logger.warning(
+                    f"Backfill of {self.competition.code} {season} {feed} failed ({e}), "
+                    f"resuming in {delay}s"
+                )
+                time.sleep(delay)
+
+    @writes
+    def load(self, feed, season, restart=False):
+        """Write one season feed from its checkpoint onwards"""
+        progress, _ = BackfillProgress.objects.get_or_create(
+            competition=self.competition.code, season=season, feed=feed
+        )
+        if restart:
+            progress.rows_done, progress.completed_at = 0, None
+            progress.save(update_fields=['rows_done', 'completed_at', 'updated_at'])
+        elif progress.completed_at:
+            logger.info(f"{self.competition.code} {season} {feed} already backfilled, skipping")
+            return
+
+        try:
+            remaining = islice(self.stream(feed, season), progress.rows_done, None)
+            for chunk in chunked(remaining, self.chunk_rows):
+                self.write_chunk(feed, season, chunk, progress)
+        except (requests.RequestException, ValueError) as e:
+            # JSON decoding errors are ValueErrors; both leave the checkpoint where it was
+            progress.last_error = str(e)
+            progress.save(update_fields=['last_error', 'updated_at'])
+            raise
+
+        progress.completed_at = timezone.now()
+        progress.last_error = ''
+        progress.save(update_fields=['rows_done', 'completed_at', 'last_error', 'updated_at'])
+        logger.info(f"Backfilled {progress.rows_done} {feed} rows for {self.competition.name} {season}")
+
+    def write_chunk(self, feed, season, chunk, progress):
+        code = self.competition.code
+        with ingest_phase(code, f"{feed}_backfill", 'write'), transaction.atomic(using=WRITER):
+            if feed == 'matches':
+                inserted, updated = self.write_matches(chunk)
+                if inserted or updated:
+                    # Bulk upserts send no signals; cached pages and API ETags key on this
+                    bump_feed_version(self.competition.name, 'matches')
+            else:
+                inserted, updated = self.write_standings(season, chunk)
+            progress.rows_done += len(chunk)
+            progress.save(update_fields=['rows_done', 'updated_at'])
+        self.written[(season, feed)] += len(chunk)
+        record_rows(
+            code, f"{feed}_backfill", inserted=inserted, updated=updated,
+            skipped=len(chunk) - inserted - updated,
+        )
+
+    def write_matches(self, matches):
+        rows = self.service.match_rows(matches)
+        existing = set(Match.objects.filter(
+            external_id__in=[row.external_id for row in rows]
+        ).values_list('external_id', flat=True))
+        Match.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['external_id'],
+            update_fields=FootballDataService.MATCH_UPDATE_FIELDS,
+        )
+        return len(rows) - len(existing), len(existing)
+
+    def write_standings(self, season, standings):
+        teams = self.service.resolve_teams([standing['team'] for standing in standings])
+        fields = FootballDataService.LEAGUE_TABLE_FIELDS
+        rows = [
+            SeasonStanding(
+                team=teams[standing['team']['name']],
+                competition=self.competition.name,
+                season=season,
+                **{field: standing[key] for field, key in fields.items()},
+            )
+            for standing in standings
+        ]
+        existing = SeasonStanding.objects.filter(
+            competition=self.competition.name, season=season, team__in=teams.values()
+        ).count()
+        SeasonStanding.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['competition', 'season', 'team'],
+            update_fields=list(fields),
+        )
+        return len(rows) - existing, existing
+
+    @writes
+    def rebuild_latest_weeks(self):
+        """Refresh the read model in case the backfill reached the current season"""
+        name = self.competition.name
+        latest = Match.objects.filter(
+            competition=name, season__isnull=False
+        ).order_by('-season').values_list('season', flat=True).first()
+        weeks = Match.objects.filter(competition=name, season=latest).values_list('matchweek', flat=True)
+        rebuild_fixture_weeks(name, set(weeks))
@@ -0,0 +1,4 @@
+"""Offline benchmarks: replayed upstream payloads, synthetic leagues and stored baselines
+
+Run with `python manage.py benchmark`.
+"""
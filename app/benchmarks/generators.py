@@ -0,0 +1,251 @@
+import copy
+import hashlib
+import json
+import math
+import random
+from datetime import timedelta
+from pathlib import Path
+
+from django.utils import timezone
+
+PAYLOAD_DIR = Path(__file__).resolve().parent / 'payloads'
+
+PAYLOAD_FILES = {
+    'matches': 'football_data_matches.json',
+    'match': 'football_data_match.json',
+    'standings': 'football_data_standings.json',
+    'odds_board': 'odds_api_odds.json',
+    'event_odds': 'odds_api_event_odds.json',
+    'events': 'odds_api_events.json',
+}
+
+BOOKMAKER_NAMES = [
+    'DraftKings', 'FanDuel', 'BetMGM', 'Caesars', 'BetRivers', 'Bovada', 'BetOnline.ag',
+    'MyBookie.ag', 'LowVig.ag', 'BetUS', 'Unibet', 'PointsBet', 'Pinnacle', 'Betfair',
+    'William Hill', 'Ladbrokes', 'Coral', 'Paddy Power', 'Sky Bet', 'Betway',
+]
+
+
+def load_payload(name):
+    """One of the recorded upstream responses in payloads/"""
+    with open(PAYLOAD_DIR / PAYLOAD_FILES[name]) as f:
+        return json.load(f)
+
+
+def iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def rebase_kickoffs(payloads, start=None):
+    """Shift every kickoff in recorded payloads so the earliest is at start (default: tomorrow)
+
+    Recorded fixtures are in the past; views only show upcoming matches.
+    """
+    start = start or timezone.now() + timedelta(days=1)
+    payloads = copy.deepcopy(payloads)
+    matches = payloads['matches']['matches']
+    first = min(timezone.datetime.fromisoformat(m['utcDate'].replace('Z', '+00:00')) for m in matches)
+    shift = start - first
+
+    def moved(value):
+        return iso(timezone.datetime.fromisoformat(value.replace('Z', '+00:00')) + shift)
+
+    for match in [*matches, payloads['match']]:
+        match['utcDate'] = moved(match['utcDate'])
+    for event in [*payloads['odds_board'], *payloads['events'], payloads['event_odds']]:
+        event['commence_time'] = moved(event['commence_time'])
+    return payloads
+
+
+def recorded_payloads():
+    """The recorded responses, kickoffs moved into the future"""
+    return rebase_kickoffs({name: load_payload(name) for name in PAYLOAD_FILES})
+
+
+class SyntheticLeague:
+    """Scalable upstream payloads: N fixtures priced by M bookmakers
+
+    Shapes are cloned from the recorded responses so the generated payloads walk
+    the same parsing paths. Output is deterministic for a given seed.
+    """
+
+    def __init__(self, fixtures=380, bookmakers=20, seed=0, start=None):
+        self.rng = random.Random(seed)
+        self.start = start or timezone.now() + timedelta(days=1)
+        self.templates = {name: load_payload(name) for name in ('matches', 'standings', 'odds_board')}
+        # Enough teams that a double round robin covers the requested fixtures
+        team_count = max(2, math.ceil((1 + math.sqrt(1 + 4 * fixtures)) / 2))
+        self.teams = [self._team(i) for i in range(team_count)]
+        self.fixtures = self._fixtures(fixtures)
+        self.bookmakers = [
+            (f"book{i}", BOOKMAKER_NAMES[i % len(BOOKMAKER_NAMES)] + (f" {i}" if i >= len(BOOKMAKER_NAMES) else ''))
+            for i in range(bookmakers)
+        ]
+
+    def _team(self, i):
+        # Letters, not digits: team name normalization ignores numbers like "04"
+        tag = ''.join(chr(ord('a') + digit) for digit in (i // 676, i // 26 % 26, i % 26)).title()
+        return {
+            'id': 10000 + i,
+            'name': f"Synthetic {tag} FC",
+            'odds_name': f"Synthetic {tag}",
+            'shortName': f"Club {tag}",
+            'tla': f"S{i:02d}"[:3],
+            'crest': f"https://crests.example/{i}.png",
+        }
+
+    def _fixtures(self, count):
+        pairs = [
+            (home, away)
+            for home in range(len(self.teams)) for away in range(len(self.teams)) if home != away
+        ]
+        self.rng.shuffle(pairs)
+        fixtures = []
+        for k, (home, away) in enumerate(pairs[:count]):
+            fixtures.append({
+                'id': 900000 + k,
+                'home': self.teams[home],
+                'away': self.teams[away],
+                # Ten fixtures per matchweek, one matchweek per week
+                'kickoff': self.start + timedelta(days=7 * (k // 10), hours=k % 10),
+                'matchday': k // 10 + 1,
+            })
+        return fixtures
+
+    def _api_team(self, team):
+        return {key: team[key] for key in ('id', 'name', 'shortName', 'tla', 'crest')}
+
+    def match(self, fixture, status='TIMED', score=(None, None)):
+        match = copy.deepcopy(self.templates['matches']['matches'][0])
+        match.update({
+            'id': fixture['id'],
+            'utcDate': iso(fixture['kickoff']),
+            'status': status,
+            'matchday': fixture['matchday'],
+            'homeTeam': self._api_team(fixture['home']),
+            'awayTeam': self._api_team(fixture['away']),
+        })
+        match['score']['fullTime'] = {'home': score[0], 'away': score[1]}
+        return match
+
+    def matches(self, fixtures=None):
+        payload = copy.deepcopy(self.templates['matches'])
+        payload['matches'] = [self.match(fixture) for fixture in (fixtures or self.fixtures)]
+        payload['resultSet']['count'] = len(payload['matches'])
+        return payload
+
+    def standings(self):
+        payload = copy.deepcopy(self.templates['standings'])
+        template = payload['standings'][0]['table'][0]
+        rows = []
+        for position, team in enumerate(self.teams, 1):
+            row = copy.deepcopy(template)
+            won = self.rng.randint(0, 30)
+            draw = self.rng.randint(0, 8)
+            row.update({
+                'position': position,
+                'team': self._api_team(team),
+                'won': won,
+                'draw': draw,
+                'lost': 38 - won - draw,
+                'points': 3 * won + draw,
+            })
+            rows.append(row)
+        payload['standings'][0]['table'] = rows
+        return payload
+
+    def event_id(self, fixture):
+        return hashlib.md5(str(fixture['id']).encode()).hexdigest()
+
+    def event(self, fixture):
+        """Odds API event for a fixture, priced by every synthetic bookmaker"""
+        event = copy.deepcopy(self.templates['odds_board'][0])
+        event.update({
+            'id': self.event_id(fixture),
+            'commence_time': iso(fixture['kickoff']),
+            'home_team': fixture['home']['odds_name'],
+            'away_team': fixture['away']['odds_name'],
+        })
+        bookmaker_template = event['bookmakers'][0]
+        event['bookmakers'] = []
+        for key, title in self.bookmakers:
+            home = round(self.rng.uniform(1.4, 5.0), 2)
+            draw = round(self.rng.uniform(3.0, 4.6), 2)
+            away = round(self.rng.uniform(1.4, 6.0), 2)
+            bookmaker = copy.deepcopy(bookmaker_template)
+            bookmaker.update({'key': key, 'title': title})
+            bookmaker['markets'][0]['outcomes'] = [
+                {'name': event['home_team'], 'price': home},
+                {'name': event['away_team'], 'price': away},
+                {'name': 'Draw', 'price': draw},
+            ]
+            event['bookmakers'].append(bookmaker)
+        return event
+
+    def odds_board(self):
+        return [self.event(fixture) for fixture in self.fixtures]
+
+    def payloads(self):
+        """Everything the transport stub serves, keyed like PAYLOAD_FILES"""
+        odds_board = self.odds_board()
+        return {
+            'matches': self.matches(),
+            'match': self.match(self.fixtures[0]),
+            'standings': self.standings(),
+            'odds_board': odds_board,
+            'event_odds': odds_board[0],
+            'events': [
+                {key: value for key, value in event.items() if key != 'bookmakers'}
+                for event in odds_board
+            ],
+        }
+
+
+def nudge_prices(events, move=0.05, seed=1):
+    """Copy of an odds board with every price moved by up to move (a fraction)
+
+    Alternating between a board and its nudged copy makes each refresh a real
+    price change rather than a skipped, unchanged payload.
+    """
+    rng = random.Random(seed)
+    events = copy.deepcopy(events)
+    for event in events:
+        for bookmaker in event['bookmakers']:
+            for market in bookmaker['markets']:
+                for outcome in market['outcomes']:
+                    outcome['price'] = max(1.01, round(outcome['price'] * (1 + rng.uniform(-move, move)), 2))
+    return events
+
+
+def record_payloads(service):
+    """Capture live upstream responses into payloads/ (needs both API keys)
+
+    Replaces the stored samples so later replays use the providers' current data.
+    """
+    recorded = {
+        'matches': service.cache.get_json(
+            'matches', *service.upcoming_matches_request(),
+            headers=service.headers, fetch=service.football_client.get,
+        ),
+        'standings': service.cache.get_json(
+            'standings', service.league_table_request(),
+            headers=service.headers, fetch=service.football_client.get,
+        ),
+        'odds_board': service.fetch_odds_board(),
+        'events': service.fetch_odds_events(),
+    }
+    if not recorded['matches'].get('matches') or not recorded['odds_board']:
+        raise ValueError("Upstream returned no fixtures or no odds to record")
+    recorded['match'] = service.fetch_fixtures([recorded['matches']['matches'][0]['id']])[0]
+    event = recorded['odds_board'][0]
+    response = service.odds_client.get(
+        f"{service.odds_base_url}/sports/{service.competition.odds_sport_key}/events/{event['id']}/odds",
+        params=service.odds_board_request()[1],
+    )
+    response.raise_for_status()
+    recorded['event_odds'] = response.json()
+
+    for name, payload in recorded.items():
+        with open(PAYLOAD_DIR / PAYLOAD_FILES[name], 'w') as f:
+            json.dump(payload, f, indent=2)
+    return recorded
@@ -0,0 +1,232 @@
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from app.arbitrage import rebuild_opportunities
+from app.backfill import SeasonBackfill
+from app.market import rebuild_market_analytics
+from app.competitions import get_competition
+from app.db import use_writer
+from app.http_cache import LRUCacheBackend, ResponseCache
+from app.models import (
+    ArbitrageOpportunity, BackfillProgress, BookmakerOdds, FeedStatus, LeagueTable, MarketAnalytics,
+    Match, MatchOdds, OddsSnapshot, SeasonStanding, Team, TeamAlias,
+)
+from app.services import FootballDataService
+
+from .generators import nudge_prices
+
+BASELINES_PATH = Path(__file__).resolve().parent / 'baselines.json'
+
+COMPETITION = 'PL'
+
+
+class Case:
+    """One benchmarked operation; setup runs before every repetition, outside the timer"""
+
+    def __init__(self, name, run, setup=None):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda: None)
+
+
+class Bench:
+    """Shared state for the cases: replayed payloads, services and a test client"""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.odds_boards = [payloads['odds_board'], nudge_prices(payloads['odds_board'])]
+        payloads['fixtures'] = self.poll_response
+        self.client = Client()
+        self.member = None
+
+    def service(self):
+        # A private response cache per run, so upstream calls are never served from a warm cache
+        return FootballDataService(COMPETITION, cache=ResponseCache(LRUCacheBackend()))
+
+    def reset_feed(self, feed):
+        FeedStatus.objects.filter(name=f"{COMPETITION}:{feed}").delete()
+
+    def reset_matches(self):
+        with use_writer():
+            Match.objects.all().delete()
+            TeamAlias.objects.all().delete()
+            Team.objects.all().delete()
+            FeedStatus.objects.all().delete()
+
+    def reset_league_table(self):
+        with use_writer():
+            LeagueTable.objects.all().delete()
+            self.reset_feed('league_table')
+
+    def reset_odds(self):
+        with use_writer():
+            for model in (
+                ArbitrageOpportunity, MarketAnalytics, OddsSnapshot, BookmakerOdds, MatchOdds, TeamAlias
+            ):
+                model.objects.all().delete()
+            Match.objects.update(odds_api_id=None)
+            self.reset_feed('odds')
+
+    def reset_backfill(self):
+        with use_writer():
+            BackfillProgress.objects.all().delete()
+            SeasonStanding.objects.all().delete()
+
+    def reset_live(self):
+        with use_writer():
+            self.reset_feed('live')
+
+    def swap_odds_board(self):
+        """Serve the other of the two boards, so the next refresh sees moved prices"""
+        self.odds_boards.reverse()
+        self.payloads['odds_board'] = self.odds_boards[0]
+
+    def poll_response(self, request):
+        """/matches?ids= answer built from the recorded fixture window"""
+        ids = set(parse_qs(urlparse(request.url).query)['ids'][0].split(','))
+        matches = [m for m in self.payloads['matches']['matches'] if str(m['id']) in ids]
+        return {'resultSet': {'count': len(matches)}, 'matches': matches}
+
+    def first_match(self):
+        return Match.objects.select_related('home_team', 'away_team').order_by('match_date', 'id').first()
+
+    def member_client(self):
+        """Client logged in as a member, for pages that only render for signed-in users"""
+        if self.member is None:
+            user, _ = User.objects.get_or_create(username='benchmark')
+            self.member = Client()
+            self.member.force_login(user)
+        return self.member
+
+    def get(self, path, member=False):
+        """Request a page; path may be a callable for URLs that depend on ingested data"""
+        def run():
+            url = path() if callable(path) else path
+            client = self.member_client() if member else self.client
+            response = client.get(url)
+            assert response.status_code == 200, f"{url} returned {response.status_code}"
+            # Streaming responses only do their work when consumed
+            if response.streaming and response.is_async:
+                async_to_sync(drain)(response.streaming_content)
+            elif response.streaming:
+                b''.join(response.streaming_content)
+        return run
+
+
+async def drain(chunks):
+    async for _ in chunks:
+        pass
+
+
+def build_cases(bench):
+    """Every benchmark, in the order it has to run: each one leaves data for the next"""
+    cases = [
+        Case('ingest.update_matches.cold', lambda: bench.service().update_matches(), bench.reset_matches),
+        Case('ingest.update_matches.unchanged', lambda: bench.service().update_matches()),
+        Case('ingest.fetch_league_table.cold', lambda: bench.service().fetch_league_table(),
+             bench.reset_league_table),
+        Case('ingest.fetch_league_table.unchanged', lambda: bench.service().fetch_league_table()),
+        Case('ingest.poll_fixtures', lambda: bench.service().poll_fixtures(), bench.reset_live),
+        # The replayed season is the current fixture window, so this rewrites stored matches
+        Case('ingest.backfill.season', lambda: SeasonBackfill(COMPETITION).run([2024]),
+             bench.reset_backfill),
+        Case('odds.refresh_odds.cold', lambda: bench.service().refresh_odds(), bench.reset_odds),
+        Case('odds.refresh_odds.moved', lambda: bench.service().refresh_odds(), bench.swap_odds_board),
+        Case('odds.refresh_odds.unchanged', lambda: bench.service().refresh_odds()),
+        Case('odds.get_odds_for_match', lambda: bench.service().get_odds_for_match(bench.first_match())),
+        Case('odds.rebuild_opportunities',
+             lambda: rebuild_opportunities(get_competition(COMPETITION).name)),
+        Case('odds.rebuild_market_analytics',
+             lambda: rebuild_market_analytics(get_competition(COMPETITION).name)),
+    ]
+
+    views = {
+        'epl': '/epl/',
+        'league_table': f"/competitions/{COMPETITION}/table/",
+        'match_details': lambda: f"/match/{bench.first_match().id}/",
+        'api_matches': '/api/matches/?limit=200&embed=odds',
+        'arbitrage': '/arbitrage/',
+        'api_arbitrage': '/api/arbitrage/',
+        'export_odds_history_csv': '/api/export/odds_history/?format=csv',
+        'export_odds_history_parquet': '/api/export/odds_history/?format=parquet',
+    }
+    for name, path in views.items():
+        # Uncached render: the page and fragment caches are cleared before every run
+        cases.append(Case(f"view.{name}", bench.get(path), cache.clear))
+    cases.append(Case('view.home.member', bench.get('/', member=True), cache.clear))
+    cases.append(Case('view.epl.cached', bench.get('/epl/')))
+    return cases
+
+
+def measure(case, repeat=5):
+    """Median wall time, peak traced allocation and query count for one case"""
+    timings = []
+    for _ in range(repeat):
+        case.setup()
+        gc.collect()
+        started = time.perf_counter()
+        case.run()
+        timings.append(time.perf_counter() - started)
+
+    case.setup()
+    with ExitStack() as stack:
+        captured = [
+            stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections
+        ]
+        case.run()
+    queries = sum(len(context.captured_queries) for context in captured)
+
+    case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'peak_kib': round(peak / 1024, 1),
+        'queries': queries,
+    }
+
+
+def load_baselines():
+    try:
+        with open(BASELINES_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(baselines):
+    with open(BASELINES_PATH, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def regressions(result, baseline, time_tolerance, alloc_tolerance):
+    """Reasons a result is worse than its baseline; queries must not grow at all"""
+    problems = []
+    if result['queries'] > baseline['queries']:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    if result['median_ms'] > baseline['median_ms'] * (1 + time_tolerance):
+        problems.append(f"time {baseline['median_ms']}ms -> {result['median_ms']}ms")
+    if result['peak_kib'] > baseline['peak_kib'] * (1 + alloc_tolerance):
+        problems.append(f"allocations {baseline['peak_kib']}KiB -> {result['peak_kib']}KiB")
+    return problems
@@ -0,0 +1,112 @@
+import json
+import re
+from contextlib import contextmanager
+
+import requests
+from django.test import override_settings
+from requests.adapters import BaseAdapter
+
+from app import http_client
+
+# Upstream routes served by the stub, matched against the request path
+ROUTES = [
+    ('football_data', re.compile(r'/v4/competitions/\w+/matches$'), 'matches'),
+    ('football_data', re.compile(r'/v4/competitions/\w+/standings$'), 'standings'),
+    ('football_data', re.compile(r'/v4/matches/\d+$'), 'match'),
+    ('football_data', re.compile(r'/v4/matches$'), 'fixtures'),
+    ('odds_api', re.compile(r'/v4/sports/[\w-]+/events/\w+/odds$'), 'event_odds'),
+    ('odds_api', re.compile(r'/v4/sports/[\w-]+/events$'), 'events'),
+    ('odds_api', re.compile(r'/v4/sports/[\w-]+/odds$'), 'odds_board'),
+]
+
+HOSTS = {
+    'api.football-data.org': 'football_data',
+    'api.the-odds-api.com': 'odds_api',
+}
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport that answers upstream calls from in-memory payloads
+
+    payloads maps a route name (see ROUTES) to the JSON body to return, or to a
+    callable taking the PreparedRequest, so a case can change the data between
+    calls. Bodies are serialized once per payload object, as a real response
+    would arrive as bytes. Every request is recorded in self.calls.
+    """
+
+    def __init__(self, payloads):
+        super().__init__()
+        self.payloads = payloads
+        self.calls = []
+        self._encoded = {}
+
+    def _body(self, payload):
+        key = id(payload)
+        cached = self._encoded.get(key)
+        if cached is None or cached[0] is not payload:
+            cached = (payload, json.dumps(payload).encode())
+            self._encoded[key] = cached
+        return cached[1]
+
+    def send(self, request, **kwargs):
+        self.calls.append(request.url)
+        host = requests.utils.urlparse(request.url).hostname
+        path = requests.utils.urlparse(request.url).path.rstrip('/')
+
+        payload = None
+        for upstream, pattern, route in ROUTES:
+            if HOSTS.get(host) == upstream and pattern.search(path):
+                payload = self.payloads.get(route)
+                break
+        if callable(payload):
+            payload = payload(request)
+
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if payload is None:
+            response.status_code = 404
+            response._content = b'{"message": "not recorded"}'
+        else:
+            response.status_code = 200
+            response._content = self._body(payload)
+        response.headers['Content-Type'] = 'application/json'
+        # Lets iter_content serve the body for streamed requests too
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        pass
+
+
+# Rate limits while replaying: high enough that benchmarks never wait on the bucket
+UNLIMITED_APIS = {
+    'football_data': {'rate_per_minute': 10 ** 9},
+    'odds_api': {'rate_per_minute': 10 ** 9},
+}
+
+
+@contextmanager
+def replay_upstreams(payloads):
+    """Serve every upstream call from payloads instead of the network
+
+    Mounts a ReplayAdapter on the shared session and rebuilds the rate-limited
+    clients without their budgets; both are restored on exit.
+    """
+    adapter = ReplayAdapter(payloads)
+    session = http_client.get_session()
+    original = dict(session.adapters)
+    with http_client._clients_lock:
+        saved_clients = dict(http_client._clients)
+        http_client._clients.clear()
+    try:
+        for scheme in ('http://', 'https://'):
+            session.mount(scheme, adapter)
+        with override_settings(UPSTREAM_APIS=UNLIMITED_APIS):
+            yield adapter
+    finally:
+        session.adapters.clear()
+        session.adapters.update(original)
+        with http_client._clients_lock:
+            http_client._clients.clear()
+            http_client._clients.update(saved_clients)
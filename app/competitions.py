@@ -0,0 +1,69 @@
+from django.conf import settings
+
+
+class Competition:
+    """A competition we ingest: its football-data.org code, display name and Odds API sport key"""
+
+    def __init__(self, code, name, odds_sport_key, rate_share=1.0, intervals=None):
+        self.code = code
+        self.name = name
+        self.odds_sport_key = odds_sport_key
+        # Relative share of the football-data.org request budget
+        self.rate_share = rate_share
+        # Per-feed interval overrides on top of settings.INGESTION_INTERVALS
+        self.intervals = intervals or {}
+
+    def __repr__(self):
+        return f"Competition({self.code!r})"
+
+    def feed_name(self, feed):
+        """FeedStatus name for one of this competition's feeds, e.g. 'PL:matches'"""
+        return f"{self.code}:{feed}"
+
+    def interval(self, feed):
+        return self.intervals.get(feed, settings.INGESTION_INTERVALS[feed])
+
+
+COMPETITIONS = {
+    competition.code: competition
+    for competition in [
+        Competition('PL', 'Premier League', 'soccer_epl', rate_share=2.0),
+        Competition('PD', 'La Liga', 'soccer_spain_la_liga'),
+        Competition('SA', 'Serie A', 'soccer_italy_serie_a'),
+        Competition('BL1', 'Bundesliga', 'soccer_germany_bundesliga'),
+        # Fixtures are sparse, so the league phase table changes rarely
+        Competition(
+            'CL', 'UEFA Champions League', 'soccer_uefa_champs_league',
+            intervals={'league_table': 3600},
+        ),
+    ]
+}
+
+DEFAULT_COMPETITION = 'PL'
+
+
+def get_competition(code):
+    """Look up a competition by its football-data.org code; raises KeyError if unknown"""
+    return COMPETITIONS[code]
+
+
+def competition_named(name):
+    """Look up a competition by the display name stored on Match.competition"""
+    return next((c for c in COMPETITIONS.values() if c.name == name), COMPETITIONS[DEFAULT_COMPETITION])
+
+
+def enabled_competitions():
+    """Competitions the ingestor should run, as configured by settings.INGEST_COMPETITIONS"""
+    return [COMPETITIONS[code] for code in settings.INGEST_COMPETITIONS]
+
+
+def budget_share(competition, competitions=None):
+    """Fraction of an upstream's rate limit this competition may spend
+
+    The limit is split between the competitions running side by side, by default
+    the enabled ones; pass the ones a process actually runs.
+    """
+    competitions = competitions or enabled_competitions()
+    if competition not in competitions:
+        competitions = [*competitions, competition]
+    return competition.rate_share / sum(c.rate_share for c in competitions)
@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+# Database aliases (config/settings.py); see app.db.router
+WRITER = 'writer'
+READER = 'reader'
+
+_writing = ContextVar('writing', default=False)
+
+
+def is_writing():
+    """True inside use_writer(), where every app query goes to the writer alias"""
+    return _writing.get()
+
+
+@contextmanager
+def use_writer():
+    """Route reads and writes of app models to the writer connection
+
+    Reads go there too so a write path always sees its own uncommitted rows.
+    Context variables follow sync_to_async and threads started within the block's context.
+    """
+    token = _writing.set(True)
+    try:
+        yield
+    finally:
+        _writing.reset(token)
+
+
+def writes(func):
+    """Run func inside use_writer()"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_writer():
+            return func(*args, **kwargs)
+    return wrapper
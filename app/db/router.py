@@ -0,0 +1,29 @@
+from . import READER, WRITER, is_writing
+
+
+class DatabaseRouter:
+    """Send ingestion traffic to the writer alias and everything else in the app to the reader
+
+    Auth, sessions and other contrib apps keep using 'default', as do app writes
+    made outside ingestion (admin edits, signal receivers).
+    """
+
+    def _is_app_model(self, model):
+        return model._meta.app_label == 'app'
+
+    def db_for_read(self, model, **hints):
+        if not self._is_app_model(model):
+            return None
+        return WRITER if is_writing() else READER
+
+    def db_for_write(self, model, **hints):
+        if not self._is_app_model(model):
+            return None
+        return WRITER if is_writing() else 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias points at the same database file
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
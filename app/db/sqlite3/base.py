@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite backend tuned for one ingestion writer alongside many web readers
+
+    Applies settings.SQLITE_PRAGMAS to every new connection and makes READ_ONLY
+    aliases refuse writes. Transactions on writable aliases start with BEGIN
+    IMMEDIATE: a deferred transaction that reads and then writes cannot wait out
+    the busy timeout, so it fails with "database is locked" instead.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        if self.settings_dict.get('READ_ONLY'):
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.settings_dict.get('READ_ONLY'):
+            self.cursor().execute("BEGIN")
+        else:
+            self.cursor().execute("BEGIN IMMEDIATE")
@@ -0,0 +1,323 @@
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .competitions import COMPETITIONS
+from .models import BookmakerOdds, LeagueTable, Match, OddsSnapshot, SeasonStanding
+from .streaming import chunked
+
+
+class ExportError(ValueError):
+    """A bad export request: unknown dataset or format, or a filter it can't apply"""
+
+
+class Dataset:
+    """One exportable table: its columns and the lookups its filters apply to
+
+    columns are (name, ORM path, kind) triples, kind being one of COLUMN_KINDS. A filter
+    lookup left as None means the dataset doesn't support that filter.
+    """
+
+    def __init__(self, model, columns, order_by, competition=None, season=None,
+                 date=None, bookmaker=None):
+        self.model = model
+        self.columns = columns
+        self.order_by = order_by
+        self.lookups = {
+            'competition': competition, 'season': season, 'date': date, 'bookmaker': bookmaker,
+        }
+
+    @property
+    def names(self):
+        return [name for name, _, _ in self.columns]
+
+    def queryset(self, filters):
+        rows = self.model.objects.all()
+        for name, value in filters.items():
+            lookup = self.lookups[name]
+            if lookup is None:
+                raise ExportError(f"This dataset can't be filtered by {name}")
+            if name == 'date':
+                start, end = value
+                if start:
+                    rows = rows.filter(**{f"{lookup}__gte": start})
+                if end:
+                    rows = rows.filter(**{f"{lookup}__lt": end})
+            elif name == 'bookmaker':
+                rows = rows.filter(**{f"{lookup}__in": value})
+            else:
+                rows = rows.filter(**{lookup: value})
+        return rows.order_by(*self.order_by).values_list(*(path for _, path, _ in self.columns))
+
+    def rows(self, filters):
+        """Value tuples streamed from a server-side cursor, EXPORT_CHUNK_SIZE rows at a time"""
+        return self.queryset(filters).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+MATCH_COLUMNS = [
+    ('competition', 'match__competition', 'str'),
+    ('season', 'match__season', 'int'),
+    ('match_date', 'match__match_date', 'datetime'),
+    ('home_team', 'match__home_team__name', 'str'),
+    ('away_team', 'match__away_team__name', 'str'),
+]
+
+STANDING_COLUMNS = [
+    ('team', 'team__name', 'str'),
+    ('position', 'position', 'int'),
+    ('played_games', 'played_games', 'int'),
+    ('won', 'won', 'int'),
+    ('draw', 'draw', 'int'),
+    ('lost', 'lost', 'int'),
+    ('points', 'points', 'int'),
+    ('goals_for', 'goals_for', 'int'),
+    ('goals_against', 'goals_against', 'int'),
+    ('goal_difference', 'goal_difference', 'int'),
+]
+
+DATASETS = {
+    'matches': Dataset(
+        Match,
+        [
+            ('id', 'id', 'int'),
+            ('external_id', 'external_id', 'int'),
+            ('competition', 'competition', 'str'),
+            ('season', 'season', 'int'),
+            ('matchweek', 'matchweek', 'int'),
+            ('match_date', 'match_date', 'datetime'),
+            ('status', 'status', 'str'),
+            ('home_team', 'home_team__name', 'str'),
+            ('away_team', 'away_team__name', 'str'),
+            ('home_score', 'home_score', 'int'),
+            ('away_score', 'away_score', 'int'),
+            ('venue', 'venue', 'str'),
+        ],
+        ['match_date', 'id'],
+        competition='competition', season='season', date='match_date',
+    ),
+    'standings': Dataset(
+        LeagueTable,
+        [('competition', 'competition', 'str'), *STANDING_COLUMNS,
+         ('last_updated', 'last_updated', 'datetime')],
+        ['competition', 'position'],
+        competition='competition',
+    ),
+    'season_standings': Dataset(
+        SeasonStanding,
+        [('competition', 'competition', 'str'), ('season', 'season', 'int'), *STANDING_COLUMNS],
+        ['competition', 'season', 'position'],
+        competition='competition', season='season',
+    ),
+    'odds': Dataset(
+        BookmakerOdds,
+        [
+            ('match_id', 'match_id', 'int'),
+            *MATCH_COLUMNS,
+            ('bookmaker_key', 'bookmaker_key', 'str'),
+            ('bookmaker', 'bookmaker', 'str'),
+            ('home_win_odds', 'home_win_odds', 'float'),
+            ('draw_odds', 'draw_odds', 'float'),
+            ('away_win_odds', 'away_win_odds', 'float'),
+            ('bookmaker_updated', 'bookmaker_updated', 'datetime'),
+            ('last_updated', 'last_updated', 'datetime'),
+        ],
+        ['match__match_date', 'match_id', 'bookmaker_key'],
+        competition='match__competition', season='match__season', date='match__match_date',
+        bookmaker='bookmaker_key',
+    ),
+    # Every recorded price change; the date range applies to when the price was seen
+    'odds_history': Dataset(
+        OddsSnapshot,
+        [
+            ('match_id', 'match_id', 'int'),
+            *MATCH_COLUMNS,
+            ('bookmaker_key', 'bookmaker_key', 'str'),
+            ('outcome', 'outcome', 'str'),
+            ('price', 'price_ticks', 'ticks'),
+            ('captured_at', 'captured_at', 'datetime'),
+        ],
+        ['match_id', 'bookmaker_key', 'outcome', 'captured_at'],
+        competition='match__competition', season='match__season', date='captured_at',
+        bookmaker='bookmaker_key',
+    ),
+}
+
+# How each column kind is written to the text formats
+COLUMN_KINDS = {
+    'str': lambda value: value,
+    'int': lambda value: value,
+    'float': float,
+    'ticks': lambda value: value / 100,
+    'datetime': lambda value: value.isoformat(),
+}
+
+
+def parse_date_range(params):
+    """(start, end) datetimes for ISO from/to dates, or None when neither is given
+
+    Either bound may be None. to is inclusive, so end is midnight UTC after it.
+    Raises ExportError on a malformed date.
+    """
+    if not (params.get('from') or params.get('to')):
+        return None
+    bounds = []
+    for key, offset in (('from', 0), ('to', 1)):
+        day = None
+        if params.get(key):
+            try:
+                day = parse_date(params[key])
+            except ValueError:
+                pass
+            if day is None:
+                raise ExportError(f"{key} must be a date, e.g. 2024-08-16")
+            day = datetime.combine(day + timedelta(days=offset), time.min, tzinfo=timezone.utc)
+        bounds.append(day)
+    return tuple(bounds)
+
+
+def parse_filters(params):
+    """Export filters from query-string style params; raises ExportError on bad input
+
+    competition is a code (PL), season a start year, from/to ISO dates (to is
+    inclusive) and bookmaker a comma-separated list of bookmaker keys.
+    """
+    filters = {}
+    if params.get('competition'):
+        competition = COMPETITIONS.get(params['competition'].upper())
+        if competition is None:
+            raise ExportError(f"Unknown competition {params['competition']}")
+        filters['competition'] = competition.name
+    if params.get('season'):
+        try:
+            filters['season'] = int(params['season'])
+        except ValueError:
+            raise ExportError('season must be a year, e.g. 2024')
+    date_range = parse_date_range(params)
+    if date_range:
+        filters['date'] = date_range
+    if params.get('bookmaker'):
+        filters['bookmaker'] = [key.strip() for key in params['bookmaker'].split(',') if key.strip()]
+    return filters
+
+
+def csv_chunks(dataset, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(dataset.names)
+    converters = [COLUMN_KINDS[kind] for _, _, kind in dataset.columns]
+    for block in chunked(rows, settings.EXPORT_CHUNK_SIZE):
+        writer.writerows(
+            [None if value is None else convert(value) for convert, value in zip(converters, row)]
+            for row in block
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Only the header is left unsent when there were no rows
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(dataset, rows):
+    names = dataset.names
+    converters = [COLUMN_KINDS[kind] for _, _, kind in dataset.columns]
+    for block in chunked(rows, settings.EXPORT_CHUNK_SIZE):
+        yield ''.join(
+            json.dumps({
+                name: None if value is None else convert(value)
+                for name, convert, value in zip(names, converters, row)
+            }) + '\n'
+            for row in block
+        ).encode()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def parquet_chunks(dataset, rows):
+    """Parquet, one row group per chunk, each sent as soon as it's written
+
+    pyarrow is optional; it's imported here so the other formats work without it.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError('Parquet export needs the pyarrow package (pip install pyarrow)')
+
+    types = {
+        'str': pa.string(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'ticks': pa.float64(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+    }
+    schema = pa.schema([(name, types[kind]) for name, _, kind in dataset.columns])
+    # Arrow takes datetimes as they are; decimals and ticks become floats
+    converters = [COLUMN_KINDS[kind] if kind in ('float', 'ticks') else None for _, _, kind in dataset.columns]
+
+    def generate():
+        sink = _DrainableSink()
+        writer = pq.ParquetWriter(sink, schema)
+        for block in chunked(rows, settings.EXPORT_CHUNK_SIZE):
+            columns = [list(column) for column in zip(*block)]
+            for i, convert in enumerate(converters):
+                if convert is not None:
+                    columns[i] = [None if value is None else convert(value) for value in columns[i]]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+    return generate()
+
+
+FORMATS = {
+    'csv': (csv_chunks, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_chunks, 'application/x-ndjson'),
+    'parquet': (parquet_chunks, 'application/vnd.apache.parquet'),
+}
+
+
+def export(name, fmt, filters):
+    """Return (byte chunk iterator, content type) for a dataset in a format
+
+    Nothing is read until the iterator is consumed, and then only one chunk of rows
+    is held at a time. Raises ExportError for an unknown dataset or format, or a
+    filter the dataset doesn't support.
+    """
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise ExportError(f"Unknown dataset {name}; choose from {', '.join(DATASETS)}")
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format {fmt}; choose from {', '.join(FORMATS)}")
+    writer, content_type = FORMATS[fmt]
+    # Built before any row is read, so bad filters surface as errors, not a broken stream
+    dataset.queryset(filters)
+    return writer(dataset, dataset.rows(filters)), content_type
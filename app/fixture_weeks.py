@@ -0,0 +1,146 @@
+from collections import defaultdict
+from datetime import datetime
+
+from django.db.models import Q, Subquery
+from django.utils import timezone
+
+from .db import writes
+from .models import FixtureWeek, Match
+from .odds import OUTCOMES
+
+
+def fixture_document(match):
+    """Everything a page or the API shows for one fixture, with no further lookups needed
+
+    match must come with home_team, away_team and odds already loaded.
+    """
+    odds = getattr(match, 'odds', None)
+    return {
+        'id': match.id,
+        'matchweek': match.matchweek,
+        'kickoff': match.match_date.astimezone(timezone.utc).isoformat(),
+        'status': match.status,
+        'venue': match.venue,
+        'home_score': match.home_score,
+        'away_score': match.away_score,
+        'home_team': {'name': match.home_team.name, 'crest': match.home_team.logo_url},
+        'away_team': {'name': match.away_team.name, 'crest': match.away_team.logo_url},
+        'odds': odds and {
+            outcome: float(price) if (price := getattr(odds, f"{outcome}_odds")) is not None else None
+            for outcome in OUTCOMES
+        },
+    }
+
+
+@writes
+def rebuild_fixture_weeks(competition, matchweeks):
+    """Rewrite the FixtureWeek rows for some of a competition's matchweeks
+
+    competition is the competition name stored on Match. Only the given weeks are
+    read and written; a week left without fixtures is deleted. Weeks hold the latest
+    season's fixtures: past seasons loaded by manage.py backfill reuse the same
+    matchweek numbers.
+    """
+    matchweeks = set(matchweeks)
+    if not matchweeks:
+        return 0
+
+    weeks = defaultdict(list)
+    latest_season = Match.objects.filter(
+        competition=competition, season__isnull=False
+    ).order_by('-season').values('season')[:1]
+    matches = Match.objects.filter(
+        Q(season__isnull=True) | Q(season=Subquery(latest_season)),
+        competition=competition, matchweek__in=matchweeks,
+    ).select_related('home_team', 'away_team', 'odds').order_by('match_date', 'id')
+    for match in matches:
+        weeks[match.matchweek].append(match)
+
+    versions = dict(FixtureWeek.objects.filter(
+        competition=competition, matchweek__in=matchweeks
+    ).values_list('matchweek', 'version'))
+    FixtureWeek.objects.bulk_create(
+        [
+            FixtureWeek(
+                competition=competition,
+                matchweek=matchweek,
+                first_kickoff=week[0].match_date,
+                last_kickoff=max(match.match_date for match in week),
+                fixtures=[fixture_document(match) for match in week],
+                version=versions.get(matchweek, 0) + 1,
+            )
+            for matchweek, week in weeks.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['competition', 'matchweek'],
+        update_fields=['first_kickoff', 'last_kickoff', 'fixtures', 'version', 'updated_at'],
+    )
+    emptied = matchweeks - weeks.keys()
+    if emptied:
+        FixtureWeek.objects.filter(competition=competition, matchweek__in=emptied).delete()
+    return len(weeks)
+
+
+def rebuild_weeks_for_matches(matches):
+    """Rebuild every week the given (competition, matchweek) pairs fall in"""
+    by_competition = defaultdict(set)
+    for competition, matchweek in matches:
+        by_competition[competition].add(matchweek)
+    for competition, matchweeks in by_competition.items():
+        rebuild_fixture_weeks(competition, matchweeks)
+
+
+def rebuild_weeks_for_teams(team_ids):
+    """Rebuild the weeks of every fixture involving these teams, e.g. after a crest changes"""
+    rebuild_weeks_for_matches(
+        Match.objects.filter(Q(home_team_id__in=team_ids) | Q(away_team_id__in=team_ids))
+        .values_list('competition', 'matchweek').distinct()
+    )
+
+
+def upcoming_weeks(competition, now=None):
+    """FixtureWeek rows that still have a kickoff ahead, in matchweek order"""
+    now = now or timezone.now()
+    return FixtureWeek.objects.filter(
+        competition=competition, last_kickoff__gte=now
+    ).order_by('matchweek').values_list('fixtures', flat=True)
+
+
+def next_fixture_ids(competition, now=None):
+    """Ids of scheduled fixtures still to kick off, in (kickoff, id) order, read off a Match index
+
+    The first one changes exactly when select_upcoming's first fixture does, so it can
+    stand in for the documents when only that is needed, e.g. to build an ETag.
+    """
+    now = now or timezone.now()
+    return Match.objects.filter(
+        competition=competition, status='scheduled', match_date__gte=now
+    ).order_by('match_date', 'id').values_list('id', flat=True)
+
+
+def select_upcoming(weeks, now=None):
+    """Scheduled fixtures still to kick off from a sequence of week documents, in (kickoff, id) order
+
+    Each fixture gets a parsed kickoff_at alongside the stored ISO string.
+    """
+    now = now or timezone.now()
+    upcoming = []
+    for fixtures in weeks:
+        for fixture in fixtures:
+            kickoff = datetime.fromisoformat(fixture['kickoff'])
+            if fixture['status'] == 'scheduled' and kickoff >= now:
+                upcoming.append({**fixture, 'kickoff_at': kickoff})
+    # Weeks overlap when fixtures are rescheduled, so order across them
+    upcoming.sort(key=lambda fixture: (fixture['kickoff_at'], fixture['id']))
+    return upcoming
+
+
+def upcoming_fixtures(competition, now=None):
+    """A competition's upcoming fixtures from the read model: one indexed query, no joins"""
+    now = now or timezone.now()
+    return select_upcoming(upcoming_weeks(competition, now), now)
+
+
+async def aupcoming_fixtures(competition, now=None):
+    now = now or timezone.now()
+    return select_upcoming([fixtures async for fixtures in upcoming_weeks(competition, now)], now)
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCacheBackend:
+    """In-process cache holding parsed payloads, evicting the least recently used entry"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCacheBackend:
+    """Cache that survives restarts by pickling entries into a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def set(self, key, entry):
+        # Write to a temp file first so readers never see a half-written entry
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.pickle'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class DjangoCacheBackend:
+    """Store entries in one of the project's configured Django caches"""
+
+    def __init__(self, alias='default', prefix='http_cache'):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.cache.get(f"{self.prefix}:{key}")
+
+    def set(self, key, entry):
+        # Keep entries past their TTL so they can still be revalidated with a 304
+        self.cache.set(f"{self.prefix}:{key}", entry, timeout=None)
+
+    def clear(self):
+        self.cache.clear()
+
+
+BACKENDS = {
+    'lru': LRUCacheBackend,
+    'filesystem': FileCacheBackend,
+    'django': DjangoCacheBackend,
+}
+
+
+class ResponseCache:
+    """JSON GET cache with per-endpoint TTLs and ETag/Last-Modified revalidation
+
+    Fresh entries are served without touching the network. Expired entries are
+    revalidated with a conditional request, and a 304 reuses the stored payload.
+    """
+
+    def __init__(self, backend, ttls=None, default_ttl=60, fetch=None):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.fetch = fetch or requests.get
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def make_key(url, params=None):
+        query = '&'.join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+
+    def _prepare(self, url, params, headers):
+        """Return (key, cached entry, fresh data or None, request headers)"""
+        key = self.make_key(url, params)
+        entry = self.backend.get(key)
+        if entry is not None and entry['expires_at'] > time.time():
+            self._count('hits')
+            return key, entry, entry['data'], None
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+        return key, entry, None, request_headers
+
+    def _complete(self, endpoint, key, entry, response):
+        """Store or revalidate an entry from an upstream response and return its data"""
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+        now = time.time()
+
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            entry['expires_at'] = now + ttl
+            self.backend.set(key, entry)
+            return entry['data']
+
+        response.raise_for_status()
+        self._count('misses')
+        data = response.json()
+        self.backend.set(key, {
+            'data': data,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'expires_at': now + ttl,
+        })
+        return data
+
+    def get_json(self, endpoint, url, params=None, headers=None, fetch=None, **kwargs):
+        """Return the parsed JSON body for url, using the cache where possible"""
+        key, entry, data, request_headers = self._prepare(url, params, headers)
+        if request_headers is None:
+            return data
+        response = (fetch or self.fetch)(url, params=params, headers=request_headers, **kwargs)
+        return self._complete(endpoint, key, entry, response)
+
+    async def aget_json(self, endpoint, url, fetch, params=None, headers=None, **kwargs):
+        """Async get_json; fetch is a coroutine function such as AsyncApiClient.get"""
+        key, entry, data, request_headers = self._prepare(url, params, headers)
+        if request_headers is None:
+            return data
+        response = await fetch(url, params=params, headers=request_headers, **kwargs)
+        return self._complete(endpoint, key, entry, response)
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide ResponseCache configured by settings.HTTP_RESPONSE_CACHE"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                config = settings.HTTP_RESPONSE_CACHE
+                backend = BACKENDS[config['BACKEND']](**config.get('OPTIONS', {}))
+                _response_cache = ResponseCache(
+                    backend,
+                    ttls=config.get('TTLS'),
+                    default_ttl=config.get('DEFAULT_TTL', 60),
+                )
+    return _response_cache
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Raised instead of sending a request that would overrun an upstream budget"""
+
+
+class TokenBucket:
+    """Token bucket that can be re-synchronised from upstream rate-limit headers"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        # Upstream told us we are out of requests until this monotonic time
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait=0.0):
+        """Take one token, waiting at most max_wait seconds. Returns False if none came free."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def available(self):
+        """Whole tokens that could be taken right now without waiting"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.blocked_until:
+                return 0
+            return int(self.tokens)
+
+    def sync(self, remaining=None, reset_seconds=None):
+        """Trust the server's view of our budget over our own bookkeeping"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if remaining <= 0 and reset_seconds is not None:
+                    self.blocked_until = now + reset_seconds
+
+
+def _int_header(headers, name):
+    if not name:
+        return None
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+class ApiClient:
+    """Pooled, rate-limited HTTP client for one upstream API"""
+
+    def __init__(self, name, session, rate_per_minute, remaining_header=None,
+                 reset_header=None, quota_header=None, quota_reserve=0, timeout=(3.05, 10),
+                 max_retries=3, backoff=0.5, max_wait=10.0):
+        self.name = name
+        self.session = session
+        self.limiter = TokenBucket(rate_per_minute)
+        self.remaining_header = remaining_header
+        self.reset_header = reset_header
+        # Long-running credit quota (e.g. monthly); stop spending at the reserve
+        self.quota_header = quota_header
+        self.quota_reserve = quota_reserve
+        self.quota_remaining = None
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+
+    def _backoff_delay(self, attempt, response):
+        """Seconds to sleep before a retry; raises RateLimitExceeded rather than wait past max_wait"""
+        retry_after = _int_header(response.headers, 'Retry-After') if response is not None else None
+        if retry_after is not None:
+            if retry_after > self.max_wait:
+                # The response rides along so callers (e.g. the backfill) can still honour it
+                raise RateLimitExceeded(
+                    f"{self.name} asked to retry after {retry_after}s", response=response
+                )
+            return retry_after
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    def _record_budget(self, response, seconds):
+        quota = _int_header(response.headers, self.quota_header)
+        if quota is not None:
+            self.quota_remaining = quota
+        remaining = _int_header(response.headers, self.remaining_header)
+        self.limiter.sync(remaining, _int_header(response.headers, self.reset_header))
+        metrics.record_upstream(
+            self.name, response.status_code, seconds,
+            requests_remaining=remaining, quota_remaining=self.quota_remaining,
+        )
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        """GET url, retrying 429/5xx with jittered backoff and respecting the rate budget
+
+        With stream=True the body is left unread, for the caller to consume with iter_content.
+        """
+        if self.quota_remaining is not None and self.quota_remaining <= self.quota_reserve:
+            raise RateLimitExceeded(f"{self.name} quota exhausted ({self.quota_remaining} left)")
+
+        response = None
+        for attempt in range(self.max_retries + 1):
+            if not self.limiter.acquire(self.max_wait):
+                raise RateLimitExceeded(f"{self.name} rate limit reached")
+
+            started = time.perf_counter()
+            try:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=timeout or self.timeout,
+                    stream=stream,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.record_upstream(self.name, 'error', time.perf_counter() - started)
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"{self.name} request failed ({e}), retrying")
+                time.sleep(self._backoff_delay(attempt, None))
+                continue
+
+            self._record_budget(response, time.perf_counter() - started)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+
+            # Release the pooled connection of an unread streamed body before retrying
+            response.close()
+            delay = self._backoff_delay(attempt, response)
+            logger.warning(f"{self.name} returned {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+        return response
+
+
+class AsyncApiClient:
+    """asyncio counterpart of ApiClient that shares its rate limiter and quota bookkeeping"""
+
+    def __init__(self, client, http):
+        self.client = client
+        self.http = http
+
+    async def _acquire(self):
+        deadline = time.monotonic() + self.client.max_wait
+        while not self.client.limiter.acquire(0):
+            if time.monotonic() >= deadline:
+                raise RateLimitExceeded(f"{self.client.name} rate limit reached")
+            await asyncio.sleep(0.25)
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        """GET url, retrying 429/5xx with jittered backoff and respecting the rate budget"""
+        client = self.client
+        if client.quota_remaining is not None and client.quota_remaining <= client.quota_reserve:
+            raise RateLimitExceeded(f"{client.name} quota exhausted ({client.quota_remaining} left)")
+
+        # requests silently drops None headers (e.g. a missing API key); httpx rejects them
+        headers = {name: value for name, value in (headers or {}).items() if value is not None}
+        connect, read = client.timeout
+        response = None
+        for attempt in range(client.max_retries + 1):
+            await self._acquire()
+            started = time.perf_counter()
+            try:
+                response = await self.http.get(
+                    url, params=params, headers=headers,
+                    timeout=timeout or httpx.Timeout(read, connect=connect),
+                )
+            except httpx.TransportError as e:
+                metrics.record_upstream(client.name, 'error', time.perf_counter() - started)
+                if attempt == client.max_retries:
+                    raise
+                logger.warning(f"{client.name} request failed ({e}), retrying")
+                await asyncio.sleep(client._backoff_delay(attempt, None))
+                continue
+
+            client._record_budget(response, time.perf_counter() - started)
+            if response.status_code not in RETRY_STATUSES or attempt == client.max_retries:
+                return response
+
+            delay = client._backoff_delay(attempt, response)
+            logger.warning(f"{client.name} returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        return response
+
+
+_session = None
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide keep-alive session shared by every upstream client"""
+    global _session
+    with _clients_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def get_client(name, partition=None, share=1.0):
+    """Return the process-wide ApiClient configured in settings.UPSTREAM_APIS[name]
+
+    A partition (e.g. a competition code) gets its own client whose rate limit is
+    the given share of the upstream's, so one busy pipeline cannot starve another.
+    """
+    session = get_session()
+    key = (name, partition)
+    with _clients_lock:
+        if key not in _clients:
+            config = dict(settings.UPSTREAM_APIS[name])
+            config['rate_per_minute'] = max(1, int(config['rate_per_minute'] * share))
+            label = f"{name}:{partition}" if partition else name
+            _clients[key] = ApiClient(label, session, **config)
+        return _clients[key]
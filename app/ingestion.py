@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .async_services import AsyncFootballDataService
+from .competitions import COMPETITIONS, budget_share, enabled_competitions
+from .db import writes
+from .metrics import ingest_phase, ingest_runs
+from .models import FeedStatus
+from .services import FootballDataService
+
+logger = logging.getLogger(__name__)
+
+
+class Ingestor:
+    """Owns every call into FootballDataService for one competition and runs each feed on its own interval"""
+
+    def __init__(self, service=None, intervals=None, competition=None, share=None):
+        self.service = service or FootballDataService(competition, share=share)
+        self.competition = self.service.competition
+        self.intervals = intervals or {
+            feed: self.competition.interval(feed) for feed in settings.INGESTION_INTERVALS
+        }
+        self.feeds = {
+            'matches': self.service.update_matches,
+            'live': self.service.poll_fixtures,
+            'league_table': self.service.fetch_league_table,
+            'odds': self.service.refresh_odds,
+        }
+        self.next_run = {}
+
+    def run_feed(self, name):
+        """Run a single feed and record the outcome in FeedStatus"""
+        feed_name = self.competition.feed_name(name)
+        code = self.competition.code
+        attempted_at = timezone.now()
+        try:
+            with ingest_phase(code, name, 'total'):
+                result = self.feeds[name]()
+            # Services signal failure by returning False rather than raising
+            if result is False:
+                raise RuntimeError(f"{feed_name} feed reported a failure")
+        except Exception as e:
+            logger.error(f"Ingestion of {feed_name} failed: {e}")
+            ingest_runs.inc(competition=code, feed=name, result='error')
+            record_feed_result(feed_name, attempted_at, error=str(e))
+            return False
+
+        ingest_runs.inc(competition=code, feed=name, result='ok')
+        record_feed_result(feed_name, attempted_at)
+        logger.info(f"Ingested {feed_name} (http cache: {self.service.cache.stats})")
+        return True
+
+    def run_feeds(self, names):
+        for name in names:
+            self.run_feed(name)
+
+    def run_once(self, feeds=None):
+        """Run the given feeds (default: all) one time each"""
+        self.run_feeds(feeds or list(self.feeds))
+
+    def due_feeds(self, feeds, now):
+        return [name for name in feeds if self.next_run.get(name, 0) <= now]
+
+    def run_forever(self, feeds=None, tick=1.0):
+        """Loop forever, running each feed whenever its interval has elapsed"""
+        feeds = feeds or list(self.feeds)
+        while True:
+            due = self.due_feeds(feeds, time.monotonic())
+            if due:
+                self.run_feeds(due)
+                for name in due:
+                    self.next_run[name] = time.monotonic() + self.intervals[name]
+            time.sleep(tick)
+
+
+class AsyncIngestor(Ingestor):
+    """Ingestor that fetches all due feeds concurrently through AsyncFootballDataService"""
+
+    def run_feeds(self, names):
+        asyncio.run(self._run_feeds(names))
+
+    async def _run_feeds(self, names):
+        async with AsyncFootballDataService(self.service) as service:
+            coroutines = {
+                'matches': service.update_matches,
+                'live': service.poll_fixtures,
+                'league_table': service.sync_league_table,
+                'odds': service.refresh_odds,
+            }
+            await asyncio.gather(*(self._run_feed(name, coroutines[name]) for name in names))
+
+    async def _run_feed(self, name, coroutine):
+        feed_name = self.competition.feed_name(name)
+        code = self.competition.code
+        attempted_at = timezone.now()
+        error = None
+        try:
+            with ingest_phase(code, name, 'total'):
+                result = await coroutine()
+            # Failures reported by return value, as in Ingestor.run_feed
+            if result is False:
+                raise RuntimeError(f"{feed_name} feed reported a failure")
+        except Exception as e:
+            logger.error(f"Ingestion of {feed_name} failed: {e}")
+            error = str(e)
+        ingest_runs.inc(competition=code, feed=name, result='ok' if error is None else 'error')
+        await sync_to_async(record_feed_result)(feed_name, attempted_at, error=error)
+
+
+class CompetitionRunner:
+    """Runs one ingestor per competition side by side, each in its own thread
+
+    Every competition keeps its own schedule and rate-limit partition, so a slow or
+    failing league never delays the others.
+    """
+
+    def __init__(self, competitions=None, ingestor_class=Ingestor):
+        competitions = competitions or enabled_competitions()
+        # Split the rate limits between the competitions this runner starts
+        self.ingestors = [
+            ingestor_class(competition=c.code, share=budget_share(c, competitions))
+            for c in competitions
+        ]
+
+    def _run_all(self, method, feeds):
+        # Daemon threads so Ctrl-C in the main thread stops run_forever loops too
+        threads = [
+            threading.Thread(
+                target=getattr(ingestor, method), args=(feeds,),
+                name=f"ingestor-{ingestor.competition.code}", daemon=True,
+            )
+            for ingestor in self.ingestors
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
+
+    def run_once(self, feeds=None):
+        self._run_all('run_once', feeds)
+
+    def run_forever(self, feeds=None):
+        self._run_all('run_forever', feeds)
+
+
+@writes
+def record_feed_result(name, attempted_at, error=None):
+    """Persist the outcome of one feed run"""
+    status, _ = FeedStatus.objects.get_or_create(name=name)
+    status.last_attempt = attempted_at
+    if error is not None:
+        status.last_error = error
+        status.save(update_fields=['last_attempt', 'last_error'])
+        return
+    status.last_success = attempted_at
+    status.last_error = ''
+    status.save(update_fields=['last_attempt', 'last_success', 'last_error'])
+
+
+def feed_freshness(name, status=None):
+    """Describe how stale a feed's data is, for display in views"""
+    if status is None:
+        status = FeedStatus.objects.filter(name=name).first()
+    # Names look like 'PL:matches'; the interval comes from the competition's feed
+    code, _, feed = name.rpartition(':')
+    competition = COMPETITIONS.get(code)
+    if feed not in settings.INGESTION_INTERVALS:
+        interval = None
+    elif competition is not None:
+        interval = competition.interval(feed)
+    else:
+        interval = settings.INGESTION_INTERVALS[feed]
+    age = status.age_seconds() if status else None
+    return {
+        'last_updated': status.last_success if status else None,
+        'version': status.version if status else 0,
+        'age_seconds': age,
+        # Allow one missed cycle before calling the data stale
+        'is_stale': age is None or (interval is not None and age > 2 * interval),
+    }
+
+
+async def afeed_freshness(name):
+    """feed_freshness for async views"""
+    status = await FeedStatus.objects.filter(name=name).afirst()
+    return feed_freshness(name, status or FeedStatus(name=name))
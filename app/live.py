@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import FeedStatus, Match, MatchOdds
+
+logger = logging.getLogger(__name__)
+
+# How far around now the broadcaster watches for score, status and odds changes
+LIVE_WINDOW_BEFORE = timedelta(hours=6)
+LIVE_WINDOW_AFTER = timedelta(days=7)
+
+
+class Subscriber:
+    """One open event stream, optionally filtered to a competition or a match"""
+
+    def __init__(self, competition=None, match_id=None, queue_size=100):
+        self.competition = competition
+        self.match_id = match_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def wants(self, event):
+        if self.competition is not None and event['competition'] != self.competition:
+            return False
+        return self.match_id is None or event['match_id'] == self.match_id
+
+
+def load_live_state(now=None):
+    """Scores, statuses and best odds for every match inside the live window
+
+    Returns ({match_id: (competition, status, home_score, away_score)},
+             {match_id: (home_win, draw, away_win)}).
+    """
+    now = now or timezone.now()
+    window = Match.objects.filter(
+        match_date__gte=now - LIVE_WINDOW_BEFORE,
+        match_date__lte=now + LIVE_WINDOW_AFTER,
+    )
+    matches = {
+        row[0]: row[1:]
+        for row in window.values_list('id', 'competition', 'status', 'home_score', 'away_score')
+    }
+    odds = {
+        row[0]: tuple(float(price) if price is not None else None for price in row[1:])
+        for row in MatchOdds.objects.filter(match__in=window).values_list(
+            'match_id', 'home_win_odds', 'draw_odds', 'away_win_odds'
+        )
+    }
+    return matches, odds
+
+
+def diff_live_state(old, new):
+    """Events describing what changed between two load_live_state() results"""
+    old_matches, old_odds = old
+    new_matches, new_odds = new
+    events = []
+    for match_id, (competition, status, home_score, away_score) in new_matches.items():
+        previous = old_matches.get(match_id)
+        if previous is None:
+            continue
+        base = {'match_id': match_id, 'competition': competition}
+        if (home_score, away_score) != previous[2:]:
+            events.append(('score', {**base, 'home_score': home_score, 'away_score': away_score}))
+        if status != previous[1]:
+            events.append(('status', {**base, 'status': status}))
+        prices = new_odds.get(match_id)
+        if prices is not None and prices != old_odds.get(match_id):
+            home_win, draw, away_win = prices
+            events.append(('odds', {**base, 'home_win': home_win, 'draw': draw, 'away_win': away_win}))
+    return events
+
+
+class Broadcaster:
+    """Fans ingestion changes out to every open event stream in this process
+
+    Ingestion runs in its own process, so one watcher task polls the FeedStatus
+    versions and, only when one moves, reloads the live window and diffs it against
+    the last copy. That costs the same one or two queries whether a single client or
+    thousands are connected. Each event is serialized once and the same bytes are
+    queued for every interested subscriber; a subscriber whose queue fills up is
+    disconnected rather than allowed to hold the others back. The last few hundred
+    events are kept so reconnecting clients can resume from Last-Event-ID.
+    """
+
+    def __init__(self, poll_interval=None, history=500):
+        self.poll_interval = poll_interval or settings.LIVE_POLL_INTERVAL
+        self.subscribers = set()
+        self.recent = deque(maxlen=history)
+        self.next_id = 1
+        self.task = None
+        self.loop = None
+
+    def subscribe(self, competition=None, match_id=None):
+        subscriber = Subscriber(competition, match_id, settings.LIVE_QUEUE_SIZE)
+        self.subscribers.add(subscriber)
+        self._ensure_watcher()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def replay(self, subscriber, last_event_id):
+        """Recent events after last_event_id that the subscriber wants"""
+        return [
+            (event_id, message) for event_id, event, message in self.recent
+            if event_id > last_event_id and subscriber.wants(event)
+        ]
+
+    def publish(self, kind, event):
+        event_id = self.next_id
+        self.next_id += 1
+        message = format_sse(kind, event, event_id)
+        self.recent.append((event_id, event, message))
+        for subscriber in list(self.subscribers):
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+                self.subscribers.discard(subscriber)
+                logger.warning("Dropped a live subscriber that stopped reading")
+        return event_id
+
+    def _ensure_watcher(self):
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.loop is not loop:
+            self.loop = loop
+            self.task = loop.create_task(self._watch())
+
+    async def _watch(self):
+        versions = await sync_to_async(feed_versions)()
+        state = await sync_to_async(load_live_state)()
+        while self.subscribers:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                current = await sync_to_async(feed_versions)()
+                if current == versions:
+                    continue
+                versions = current
+                new_state = await sync_to_async(load_live_state)()
+            except Exception as e:
+                logger.error(f"Live watcher failed to read the database: {e}")
+                continue
+            for kind, event in diff_live_state(state, new_state):
+                self.publish(kind, event)
+            state = new_state
+
+
+def feed_versions():
+    return dict(FeedStatus.objects.values_list('name', 'version'))
+
+
+def format_sse(kind, data, event_id):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,54 @@
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from app.backfill import FEEDS, SeasonBackfill, parse_seasons
+from app.competitions import COMPETITIONS, DEFAULT_COMPETITION
+
+
+class Command(BaseCommand):
+    help = "Load past seasons' finished matches and final standings from football-data.org"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season', required=True,
+            help="Season start year(s): 2021, 2019..2025 or 2019,2021.",
+        )
+        parser.add_argument(
+            '--competition', action='append', dest='competitions',
+            help=f"Competition code, e.g. PL (may be repeated). Defaults to {DEFAULT_COMPETITION}.",
+        )
+        parser.add_argument(
+            '--feed', action='append', dest='feeds', choices=FEEDS,
+            help="Only load this feed (may be repeated). Defaults to matches and standings.",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help="Items written per transaction. Defaults to BACKFILL_CHUNK_ROWS.",
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help="Ignore checkpoints and load the seasons again from the start.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            seasons = parse_seasons(options['season'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        codes = [code.upper() for code in options['competitions'] or [DEFAULT_COMPETITION]]
+        unknown = set(codes) - set(COMPETITIONS)
+        if unknown:
+            raise CommandError(f"Unknown competition(s): {', '.join(sorted(unknown))}")
+        feeds = options['feeds'] or FEEDS
+
+        for code in codes:
+            backfill = SeasonBackfill(code, chunk_rows=options['chunk_size'])
+            try:
+                written = backfill.run(seasons, feeds, restart=options['restart'])
+            except (requests.RequestException, ValueError) as e:
+                raise CommandError(
+                    f"Backfill of {code} stopped: {e}. Progress is checkpointed; "
+                    f"run the command again to resume."
+                )
+            for (season, feed), count in written.items():
+                self.stdout.write(f"{code} {season} {feed}: {count} rows")
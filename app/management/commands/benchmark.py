@@ -0,0 +1,121 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from app.benchmarks.generators import SyntheticLeague, record_payloads, recorded_payloads
+from app.benchmarks.runner import (
+    Bench, build_cases, load_baselines, measure, regressions, save_baselines,
+)
+from app.benchmarks.transport import replay_upstreams
+from app.services import FootballDataService
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ingestion, odds processing and views against replayed upstream payloads "
+        "and compare wall time, allocations and query counts with the stored baselines"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fixtures', type=int, default=380,
+            help="Synthetic fixtures to generate (default: a 380-match season).",
+        )
+        parser.add_argument(
+            '--bookmakers', type=int, default=20,
+            help="Synthetic bookmakers pricing every fixture.",
+        )
+        parser.add_argument(
+            '--recorded', action='store_true',
+            help="Replay the recorded payloads in app/benchmarks/payloads instead of synthetic ones.",
+        )
+        parser.add_argument(
+            '--case', action='append', dest='cases',
+            help="Only report cases whose name starts with this prefix (may be repeated).",
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case.")
+        parser.add_argument(
+            '--time-tolerance', type=float, default=1.0,
+            help="Allowed slowdown over the baseline as a fraction (default 1.0 = twice as slow).",
+        )
+        parser.add_argument(
+            '--alloc-tolerance', type=float, default=0.25,
+            help="Allowed growth in peak allocations over the baseline as a fraction.",
+        )
+        parser.add_argument(
+            '--update-baselines', action='store_true',
+            help="Store this run's results as the new baselines instead of comparing.",
+        )
+        parser.add_argument(
+            '--record', action='store_true',
+            help="Capture fresh payloads from the live APIs into app/benchmarks/payloads and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options['record']:
+            recorded = record_payloads(FootballDataService())
+            self.stdout.write(f"Recorded {len(recorded)} payloads")
+            return
+
+        if options['recorded']:
+            scale = 'recorded'
+            payloads = recorded_payloads()
+        else:
+            if options['fixtures'] < 1 or options['bookmakers'] < 1:
+                raise CommandError("--fixtures and --bookmakers must be at least 1")
+            scale = f"{options['fixtures']}x{options['bookmakers']}"
+            payloads = SyntheticLeague(options['fixtures'], options['bookmakers']).payloads()
+
+        # Everything runs against a throwaway copy of the schema, never the real database
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            with replay_upstreams(payloads):
+                results = self.run_cases(Bench(payloads), options)
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        baselines = load_baselines()
+        if options['update_baselines']:
+            baselines.setdefault(scale, {}).update(results)
+            save_baselines(baselines)
+            self.stdout.write(self.style.SUCCESS(f"Updated {len(results)} baselines for {scale}"))
+            return
+
+        stored = baselines.get(scale, {})
+        failures = []
+        for name, result in results.items():
+            if name not in stored:
+                continue
+            problems = regressions(
+                result, stored[name], options['time_tolerance'], options['alloc_tolerance']
+            )
+            if problems:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"REGRESSION {name}: {'; '.join(problems)}"))
+        if not stored:
+            self.stdout.write(self.style.WARNING(
+                f"No baselines for {scale}; run with --update-baselines to store them"
+            ))
+        if failures:
+            raise CommandError(f"{len(failures)} benchmarks regressed: {', '.join(failures)}")
+
+    def run_cases(self, bench, options):
+        prefixes = options['cases']
+        self.stdout.write(f"{'case':<40}{'median ms':>12}{'peak KiB':>12}{'queries':>10}")
+        results = {}
+        for case in build_cases(bench):
+            # Filtered-out cases still run once, since later cases build on their data
+            if prefixes and not any(case.name.startswith(prefix) for prefix in prefixes):
+                case.setup()
+                case.run()
+                continue
+            result = measure(case, options['repeat'])
+            results[case.name] = result
+            self.stdout.write(
+                f"{case.name:<40}{result['median_ms']:>12.2f}"
+                f"{result['peak_kib']:>12.1f}{result['queries']:>10}"
+            )
+        return results
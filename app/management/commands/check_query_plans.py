@@ -0,0 +1,83 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from app.fixture_weeks import next_fixture_ids, upcoming_weeks
+from app.models import ArbitrageOpportunity, LeagueTable, Match
+
+# Queries the site runs on every page view or ingest, each expected to use an index
+HOT_QUERIES = {
+    'upcoming fixtures': lambda now: Match.objects.filter(
+        match_date__gte=now, status='scheduled'
+    ).order_by('match_date'),
+    'upcoming fixtures by competition': lambda now: Match.objects.filter(
+        competition='Premier League', match_date__gte=now, status='scheduled'
+    ).order_by('match_date', 'id'),
+    'team fixtures': lambda now: Match.objects.filter(
+        Q(home_team_id=1) | Q(away_team_id=1), match_date__gte=now
+    ).order_by('match_date'),
+    'upcoming fixture weeks': lambda now: upcoming_weeks('Premier League', now),
+    'next fixture': lambda now: next_fixture_ids('Premier League', now)[:1],
+    'matchweek': lambda now: Match.objects.filter(competition='Premier League', matchweek=1),
+    'upsert lookup': lambda now: Match.objects.filter(external_id__in=[1, 2, 3]),
+    'odds event lookup': lambda now: Match.objects.filter(odds_api_id='event'),
+    'standings': lambda now: LeagueTable.objects.filter(
+        competition='Premier League'
+    ).order_by('position'),
+    'arbitrage scanner': lambda now: ArbitrageOpportunity.objects.filter(
+        match_date__gte=now
+    ).order_by('-profit_pct'),
+}
+
+# Plan lines that mean a whole table is read, per database vendor
+FULL_SCAN_PATTERNS = {
+    # "SCAN app_match" is a table scan; "SCAN app_match USING INDEX ..." walks an index
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+def full_scans(plan):
+    """Names of tables the plan reads in full"""
+    pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        return []
+    return pattern.findall(plan)
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot queries and fail if any of them falls back to a full table scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help="Print the full plan for every query, not just the failing ones.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            raise CommandError(f"No plan checks for the {connection.vendor} backend")
+
+        if connection.vendor == 'postgresql':
+            # Tiny tables are cheaper to seq-scan; ask whether an index *can* be used
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+        now = timezone.now()
+        failures = []
+        for label, build in HOT_QUERIES.items():
+            plan = build(now).explain()
+            scanned = full_scans(plan)
+            if scanned:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {label}: {', '.join(scanned)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok         {label}"))
+            if scanned or options['verbose_plans']:
+                self.stdout.write(f"    {plan}".replace('\n', '\n    '))
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries scan a full table: {', '.join(failures)}")
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.exports import DATASETS, FORMATS, ExportError, export, parse_filters
+
+
+class Command(BaseCommand):
+    help = "Stream matches, standings or odds to a CSV, NDJSON or Parquet file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=DATASETS)
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help="File to write. Defaults to standard output.",
+        )
+        parser.add_argument('--competition', help="Competition code, e.g. PL.")
+        parser.add_argument('--season', help="Season start year, e.g. 2024.")
+        parser.add_argument('--from', dest='from', help="First date to include, e.g. 2024-08-16.")
+        parser.add_argument('--to', help="Last date to include, e.g. 2025-05-25.")
+        parser.add_argument('--bookmaker', help="Comma-separated bookmaker keys.")
+
+    def handle(self, *args, **options):
+        try:
+            chunks, _ = export(options['dataset'], options['format'], parse_filters(options))
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if options['output'] == '-':
+            self.write(chunks, sys.stdout.buffer)
+            return
+        with open(options['output'], 'wb') as output:
+            self.write(chunks, output)
+        self.stderr.write(f"Wrote {options['dataset']} to {options['output']}")
+
+    def write(self, chunks, output):
+        for chunk in chunks:
+            output.write(chunk)
+        output.flush()
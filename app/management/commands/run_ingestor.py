@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app import metrics
+from app.competitions import COMPETITIONS, enabled_competitions
+from app.ingestion import AsyncIngestor, CompetitionRunner, Ingestor
+
+
+class Command(BaseCommand):
+    help = "Run the background ingestor that refreshes matches, standings and odds for each competition"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--feed', action='append', dest='feeds',
+            help="Only run this feed (may be repeated). Defaults to every feed.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Run each feed one time and exit instead of looping.",
+        )
+        parser.add_argument(
+            '--async', action='store_true', dest='use_async',
+            help="Fetch due feeds concurrently on an asyncio event loop.",
+        )
+        parser.add_argument(
+            '--competition', action='append', dest='competitions',
+            help="Only ingest this competition code, e.g. PL (may be repeated). "
+                 "Defaults to INGEST_COMPETITIONS.",
+        )
+        parser.add_argument(
+            '--metrics-port', type=int, default=settings.INGEST_METRICS_PORT,
+            help="Serve Prometheus metrics for this process on the port. "
+                 "Defaults to INGEST_METRICS_PORT (off when unset).",
+        )
+
+    def handle(self, *args, **options):
+        codes = [code.upper() for code in options['competitions'] or []]
+        unknown = set(codes) - set(COMPETITIONS)
+        if unknown:
+            raise CommandError(f"Unknown competition(s): {', '.join(sorted(unknown))}")
+        competitions = [COMPETITIONS[code] for code in codes] if codes else enabled_competitions()
+
+        ingestor_class = AsyncIngestor if options['use_async'] else Ingestor
+        ingestor = CompetitionRunner(competitions, ingestor_class)
+        feeds = options['feeds']
+        unknown = set(feeds or []) - set(ingestor.ingestors[0].feeds)
+        if unknown:
+            raise CommandError(f"Unknown feed(s): {', '.join(sorted(unknown))}")
+
+        if options['metrics_port']:
+            metrics.serve(options['metrics_port'])
+
+        if options['once']:
+            ingestor.run_once(feeds)
+            return
+
+        for competition_ingestor in ingestor.ingestors:
+            self.stdout.write(
+                f"Starting {competition_ingestor.competition.name} ingestor "
+                f"with intervals {competition_ingestor.intervals}"
+            )
+        try:
+            ingestor.run_forever(feeds)
+        except KeyboardInterrupt:
+            self.stdout.write("Ingestor stopped")
@@ -0,0 +1,180 @@
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from .arbitrage import OUTCOMES, OddsBoard
+from .db import WRITER, writes
+from .models import BookmakerOdds, Match, MarketAnalytics
+
+# Shin's z is found with Newton's method, which converges in a handful of steps for 1X2 books
+SHIN_TOLERANCE = 1e-9
+SHIN_MAX_ITERATIONS = 50
+
+
+def implied_probabilities(prices):
+    """1 / price for every quote on a (..., outcomes) price array; NaN where there is no valid quote"""
+    prices = np.asarray(prices, dtype=float)
+    return np.divide(1.0, prices, out=np.full_like(prices, np.nan), where=prices > 1.0)
+
+
+def overround(prices):
+    """Bookmaker margin: how far the implied probabilities of a book sum above 1"""
+    return implied_probabilities(prices).sum(axis=-1) - 1.0
+
+
+def proportional_probabilities(prices):
+    """De-vig by scaling each book's implied probabilities down until they sum to 1"""
+    implied = implied_probabilities(prices)
+    return implied / implied.sum(axis=-1, keepdims=True)
+
+
+def shin_probabilities(prices):
+    """De-vig with Shin's model; returns (probabilities, z) for a (..., outcomes) price array
+
+    Shin treats the margin as protection against a share z of insider money, which
+    takes more margin off longshots than favourites. z solves
+    z = (sum(sqrt(z^2 + 4(1 - z) pi^2 / B)) - 2) / (n - 2) for implied probabilities pi
+    summing to B. Books with no margin (B <= 1) carry no insider signal and are
+    normalized proportionally with z = 0.
+
+    Iterating that equation directly oscillates around the root and can take hundreds
+    of steps. The residual sum(sqrt(...)) - 2 - (n - 2) z is convex and falls from
+    z = 0 for a book with margin, so Newton steps from 0 rise straight to the root.
+    """
+    implied = implied_probabilities(prices)
+    booksum = implied.sum(axis=-1, keepdims=True)
+    scaled = implied ** 2 / booksum
+    n = implied.shape[-1]
+    has_margin = booksum > 1.0
+
+    z = np.zeros_like(booksum)
+    for _ in range(SHIN_MAX_ITERATIONS):
+        root = np.sqrt(z ** 2 + 4 * (1 - z) * scaled)
+        residual = root.sum(axis=-1, keepdims=True) - 2 - (n - 2) * z
+        slope = ((z - 2 * scaled) / root).sum(axis=-1, keepdims=True) - (n - 2)
+        step = np.where(has_margin, residual / slope, 0.0)
+        z = z - step
+        if np.nan_to_num(np.abs(step)).max(initial=0.0) < SHIN_TOLERANCE:
+            break
+
+    probabilities = (np.sqrt(z ** 2 + 4 * (1 - z) * scaled) - z) / (2 * (1 - z))
+    probabilities /= probabilities.sum(axis=-1, keepdims=True)
+    probabilities = np.where(has_margin, probabilities, implied / booksum)
+    return probabilities, np.where(has_margin, z, 0.0)[..., 0]
+
+
+def analyse(board):
+    """Margins, de-vigged probabilities, consensus and edges for every match on a board
+
+    Consensus is the mean of the books' Shin probabilities, renormalized; a price's edge
+    is its expected return per unit staked at those consensus probabilities.
+    """
+    quoted = ~np.isnan(board.prices).any(axis=-1)
+    margins = overround(board.prices)
+    proportional = proportional_probabilities(board.prices)
+    shin, z = shin_probabilities(board.prices)
+
+    counts = quoted.sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        consensus = np.nansum(shin, axis=1) / counts[:, None]
+        consensus /= consensus.sum(axis=-1, keepdims=True)
+    edges = board.prices * consensus[:, None, :] - 1.0
+    return {
+        'quoted': quoted,
+        'bookmaker_count': counts,
+        'overround': margins,
+        'proportional': proportional,
+        'shin': shin,
+        'shin_z': z,
+        'consensus': consensus,
+        'edge': edges,
+    }
+
+
+def _by_outcome(values):
+    return dict(zip(OUTCOMES, values))
+
+
+@writes
+def rebuild_market_analytics(competition):
+    """Recompute and replace the MarketAnalytics rows for a competition's upcoming matches"""
+    upcoming = Match.objects.filter(competition=competition, status__in=['scheduled', 'live'])
+    quotes = list(BookmakerOdds.objects.filter(match__in=upcoming).values_list(
+        'match_id', 'bookmaker_key', 'bookmaker', 'home_win_odds', 'draw_odds', 'away_win_odds'
+    ))
+    names = {quote[1]: quote[2] for quote in quotes}
+    board = OddsBoard.from_quotes((quote[0], quote[1], *quote[3:]) for quote in quotes)
+    result = analyse(board)
+    # Plain nested lists: far cheaper to index per bookmaker than numpy scalars
+    stored = {
+        key: np.round(result[key], 4).tolist()
+        for key in ('overround', 'shin_z', 'proportional', 'shin', 'edge')
+    }
+    # Bookmaker columns are sorted by key; list each match's books by display name
+    order = sorted(range(len(board.bookmakers)), key=lambda j: names[board.bookmakers[j]])
+
+    rows = []
+    for i, match_id in enumerate(board.match_ids):
+        quoted = result['quoted'][i]
+        books = [j for j in order if quoted[j]]
+        if not books:
+            continue
+        margins = result['overround'][i, books]
+        row = MarketAnalytics(
+            match_id=match_id,
+            bookmaker_count=len(books),
+            mean_overround=float(margins.mean()),
+            min_overround=float(margins.min()),
+            bookmakers=[
+                {
+                    'key': board.bookmakers[j],
+                    'name': names[board.bookmakers[j]],
+                    'overround': stored['overround'][i][j],
+                    'shin_z': stored['shin_z'][i][j],
+                    'proportional': _by_outcome(stored['proportional'][i][j]),
+                    'shin': _by_outcome(stored['shin'][i][j]),
+                    'edge': _by_outcome(stored['edge'][i][j]),
+                }
+                for j in books
+            ],
+        )
+        for outcome, probability in zip(OUTCOMES, result['consensus'][i].tolist()):
+            setattr(row, f"{outcome}_probability", probability)
+            setattr(row, f"{outcome}_fair_odds", Decimal(f"{1 / probability:.2f}"))
+        rows.append(row)
+
+    with transaction.atomic(using=WRITER):
+        MarketAnalytics.objects.filter(match__competition=competition).delete()
+        MarketAnalytics.objects.bulk_create(rows)
+    return len(rows)
+
+
+def annotate_odds(odds_structure, analytics):
+    """Add stored margins, consensus and edges to a summarize_odds structure, in place
+
+    Bookmakers are matched by display name, as summarize_odds only carries names.
+    """
+    if not odds_structure or analytics is None:
+        return odds_structure
+    books = {book['name']: book for book in analytics.bookmakers}
+    for bookmaker in odds_structure['bookmakers']:
+        book = books.get(bookmaker['name'])
+        if book is None:
+            continue
+        bookmaker['overround'] = round(book['overround'] * 100, 2)
+        for outcome in OUTCOMES:
+            bookmaker[outcome]['fair_probability'] = round(book['shin'][outcome] * 100, 1)
+            bookmaker[outcome]['edge'] = round(book['edge'][outcome] * 100, 2)
+    odds_structure['consensus'] = {
+        'bookmaker_count': analytics.bookmaker_count,
+        'mean_overround': round(analytics.mean_overround * 100, 2),
+        **{
+            outcome: {
+                'probability': round(getattr(analytics, f"{outcome}_probability") * 100, 1),
+                'fair_odds': float(getattr(analytics, f"{outcome}_fair_odds")),
+            }
+            for outcome in OUTCOMES
+        },
+    }
+    return odds_structure
@@ -0,0 +1,255 @@
+import contextvars
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, Prometheus' defaults trimmed to what a page or upstream call takes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """One named metric family; each distinct label tuple is its own series"""
+
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self.series.items())
+        for key, value in series:
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.series[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _render_series(self, key, value):
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip((*self.buckets, float('inf')), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labels, key, [('le', _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(float(total))}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Process-wide set of metrics, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+view_latency = registry.register(Histogram(
+    'footybetz_view_duration_seconds', "Time spent producing a response, per view",
+    labels=('view', 'method', 'status'),
+))
+view_queries = registry.register(Histogram(
+    'footybetz_view_db_queries', "ORM queries run while producing a response, per view",
+    labels=('view',), buckets=QUERY_COUNT_BUCKETS,
+))
+view_query_time = registry.register(Histogram(
+    'footybetz_view_db_duration_seconds', "Time spent in ORM queries per response, per view",
+    labels=('view',),
+))
+upstream_latency = registry.register(Histogram(
+    'footybetz_upstream_request_duration_seconds', "Latency of outbound upstream API requests",
+    labels=('upstream', 'partition', 'status'),
+))
+upstream_requests_remaining = registry.register(Gauge(
+    'footybetz_upstream_requests_remaining', "Requests left in the current upstream rate-limit window",
+    labels=('upstream', 'partition'),
+))
+upstream_quota_remaining = registry.register(Gauge(
+    'footybetz_upstream_quota_remaining', "Credits left in the long-running upstream quota",
+    labels=('upstream', 'partition'),
+))
+ingest_runs = registry.register(Counter(
+    'footybetz_ingest_runs_total', "Feed runs by outcome",
+    labels=('competition', 'feed', 'result'),
+))
+ingest_rows = registry.register(Counter(
+    'footybetz_ingest_rows_total', "Rows written or skipped by ingestion",
+    labels=('competition', 'feed', 'outcome'),
+))
+ingest_phase_duration = registry.register(Histogram(
+    'footybetz_ingest_phase_duration_seconds', "Time spent in each phase of a feed run",
+    labels=('competition', 'feed', 'phase'),
+))
+
+
+class RequestStats:
+    """Database and upstream time accumulated while serving one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+
+
+# Set by MetricsMiddleware; copied into sync_to_async threads along with the rest of the context
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+def query_timer(execute, sql, params, many, context):
+    """Database execute wrapper that charges each query to the current request"""
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created receiver: time queries on every new database connection"""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def record_upstream(name, status, seconds, requests_remaining=None, quota_remaining=None):
+    """Record one outbound upstream call; name is an ApiClient name like 'odds_api:PL'"""
+    upstream, _, partition = name.partition(':')
+    upstream_latency.observe(seconds, upstream=upstream, partition=partition, status=status)
+    if requests_remaining is not None:
+        upstream_requests_remaining.set(requests_remaining, upstream=upstream, partition=partition)
+    if quota_remaining is not None:
+        upstream_quota_remaining.set(quota_remaining, upstream=upstream, partition=partition)
+    stats = current_request.get()
+    if stats is not None:
+        stats.upstream_calls += 1
+        stats.upstream_seconds += seconds
+
+
+@contextmanager
+def ingest_phase(competition, feed, phase):
+    """Time one phase (fetch, write, ...) of a feed run"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ingest_phase_duration.observe(
+            time.perf_counter() - started, competition=competition, feed=feed, phase=phase
+        )
+
+
+def record_rows(competition, feed, **outcomes):
+    """Count rows by outcome, e.g. record_rows('PL', 'matches', inserted=3, updated=17)"""
+    for outcome, count in outcomes.items():
+        if count:
+            ingest_rows.inc(count, competition=competition, feed=feed, outcome=outcome)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, address='0.0.0.0'):
+    """Expose this process's metrics on their own port, for processes without a web server"""
+    server = ThreadingHTTPServer((address, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    logger.info(f"Serving metrics on {address}:{port}")
+    return server
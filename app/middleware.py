@@ -0,0 +1,63 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics
+
+
+class MetricsMiddleware:
+    """Records latency, ORM queries and upstream calls per view and reports them in Server-Timing
+
+    Should be first in MIDDLEWARE so the timings cover every other middleware too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        return self.record(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        return self.record(request, response, stats)
+
+    def record(self, request, response, stats):
+        elapsed = time.perf_counter() - stats.started
+        match = request.resolver_match
+        # Label by route name, never by raw path, so ids don't explode the series count
+        view = (match.view_name if match else None) or 'unmatched'
+        metrics.view_latency.observe(
+            elapsed, view=view, method=request.method, status=response.status_code
+        )
+        metrics.view_queries.observe(stats.queries, view=view)
+        metrics.view_query_time.observe(stats.query_seconds, view=view)
+
+        timings = [
+            f'db;dur={stats.query_seconds * 1000:.1f};desc="{stats.queries} queries"',
+            f"app;dur={elapsed * 1000:.1f}",
+        ]
+        if stats.upstream_calls:
+            timings.insert(1, (
+                f'upstream;dur={stats.upstream_seconds * 1000:.1f};'
+                f'desc="{stats.upstream_calls} calls"'
+            ))
+        response['Server-Timing'] = ', '.join(timings)
+        return response
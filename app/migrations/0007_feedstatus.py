@@ -0,0 +1,23 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_alter_match_options_remove_matchodds_away_win_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_attempt', models.DateTimeField(blank=True, null=True)),
+                ('last_success', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_feedstatus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='external_id',
+            field=models.IntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
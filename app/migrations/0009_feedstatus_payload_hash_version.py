@@ -0,0 +1,23 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_match_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedstatus',
+            name='payload_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='feedstatus',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_feedstatus_payload_hash_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookmakerOdds',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookmaker_key', models.CharField(max_length=50)),
+                ('bookmaker', models.CharField(max_length=100)),
+                ('home_win_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('draw_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('away_win_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('bookmaker_updated', models.DateTimeField(blank=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookmaker_odds', to='app.match')),
+            ],
+            options={
+                'ordering': ['bookmaker'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookmakerodds',
+            constraint=models.UniqueConstraint(fields=('match', 'bookmaker_key'), name='unique_match_bookmaker'),
+        ),
+    ]
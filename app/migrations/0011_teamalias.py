@@ -0,0 +1,28 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_bookmakerodds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('football_data', 'football-data.org'), ('odds_api', 'The Odds API')], max_length=20)),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(max_length=100)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='app.team')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='teamalias',
+            constraint=models.UniqueConstraint(fields=('provider', 'normalized_name'), name='unique_provider_alias'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_teamalias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OddsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookmaker_key', models.CharField(max_length=50)),
+                ('outcome', models.CharField(choices=[('home_win', 'Home win'), ('draw', 'Draw'), ('away_win', 'Away win')], max_length=8)),
+                ('price_ticks', models.PositiveIntegerField()),
+                ('captured_at', models.DateTimeField()),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='odds_snapshots', to='app.match')),
+            ],
+            options={
+                'ordering': ['captured_at'],
+                'indexes': [models.Index(fields=['match', 'bookmaker_key', 'outcome', 'captured_at'], name='odds_snapshot_series_idx'), models.Index(fields=['match', 'captured_at'], name='odds_snapshot_match_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_oddssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArbitrageOpportunity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_probability', models.FloatField()),
+                ('profit_pct', models.FloatField()),
+                ('home_win_bookmaker', models.CharField(max_length=100)),
+                ('home_win_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('draw_bookmaker', models.CharField(max_length=100)),
+                ('draw_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('away_win_bookmaker', models.CharField(max_length=100)),
+                ('away_win_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('match_date', models.DateTimeField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='arbitrage', to='app.match')),
+            ],
+            options={
+                'ordering': ['-profit_pct'],
+                'indexes': [models.Index(fields=['-profit_pct'], name='arbitrage_profit_idx'), models.Index(fields=['match_date'], name='arbitrage_kickoff_idx')],
+            },
+        ),
+    ]
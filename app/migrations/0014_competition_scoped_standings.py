@@ -0,0 +1,48 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def scope_feed_status_names(apps, schema_editor):
+    # Feeds are now tracked per competition; everything so far was Premier League
+    FeedStatus = apps.get_model('app', 'FeedStatus')
+    db_alias = schema_editor.connection.alias
+    for feed in ('matches', 'league_table', 'odds'):
+        FeedStatus.objects.using(db_alias).filter(name=feed).update(name=f'PL:{feed}')
+
+
+def unscope_feed_status_names(apps, schema_editor):
+    FeedStatus = apps.get_model('app', 'FeedStatus')
+    db_alias = schema_editor.connection.alias
+    for feed in ('matches', 'league_table', 'odds'):
+        FeedStatus.objects.using(db_alias).filter(name=f'PL:{feed}').update(name=feed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_arbitrageopportunity'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='leaguetable',
+            options={'ordering': ['competition', 'position']},
+        ),
+        migrations.AddField(
+            model_name='leaguetable',
+            name='competition',
+            field=models.CharField(default='Premier League', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='leaguetable',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='app.team'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaguetable',
+            constraint=models.UniqueConstraint(fields=('competition', 'team'), name='unique_competition_standing'),
+        ),
+        migrations.RunPython(scope_feed_status_names, unscope_feed_status_names),
+    ]
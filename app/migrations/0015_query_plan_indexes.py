@@ -0,0 +1,58 @@
+# Generated by Django 4.2.18 on 2026-10-17 23:52
+
+from django.db import migrations, models
+
+
+def clear_duplicate_event_ids(apps, schema_editor):
+    # Blank ids would collide under the unique constraint, and an event id seen on
+    # more than one match is ambiguous; both get re-resolved on the next odds refresh
+    matches = apps.get_model('app', 'Match').objects.using(schema_editor.connection.alias)
+    matches.filter(odds_api_id='').update(odds_api_id=None)
+    duplicates = (
+        matches.exclude(odds_api_id=None)
+        .values('odds_api_id')
+        .annotate(count=models.Count('id'))
+        .filter(count__gt=1)
+        .values_list('odds_api_id', flat=True)
+    )
+    matches.filter(odds_api_id__in=list(duplicates)).update(odds_api_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_competition_scoped_standings'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_event_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='match',
+            name='odds_api_id',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='leaguetable',
+            index=models.Index(fields=['competition', 'position'], name='standing_comp_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'match_date'], name='match_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['competition', 'status', 'match_date'], name='match_comp_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['home_team', 'match_date'], name='match_home_team_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['away_team', 'match_date'], name='match_away_team_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['competition', 'matchweek'], name='match_comp_matchweek_idx'),
+        ),
+    ]
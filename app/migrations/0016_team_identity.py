@@ -0,0 +1,61 @@
+# Generated by Django 4.2.18 on 2026-10-18 00:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def renormalize_aliases(apps, schema_editor):
+    # Learned aliases were keyed with the old, narrower normalization; rekey them and
+    # drop any that now collide, since they will simply be learned again
+    from app.teams import normalize_team_name
+
+    aliases = apps.get_model('app', 'TeamAlias').objects.using(schema_editor.connection.alias)
+    seen, changed, duplicates = set(), [], []
+    for alias in aliases.order_by('id'):
+        key = (alias.provider, normalize_team_name(alias.name))
+        if key in seen:
+            duplicates.append(alias.id)
+            continue
+        seen.add(key)
+        if alias.normalized_name != key[1]:
+            alias.normalized_name = key[1]
+            changed.append(alias)
+    aliases.filter(id__in=duplicates).delete()
+    # Clear first so rekeyed rows can't trip the unique constraint mid-update
+    for alias in changed:
+        aliases.filter(id=alias.id).update(normalized_name=f"#{alias.id}")
+    aliases.bulk_update(changed, ['normalized_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_query_plan_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teamalias',
+            name='manual',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='UnresolvedTeamName',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('football_data', 'football-data.org'), ('odds_api', 'The Odds API')], max_length=20)),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(max_length=100)),
+                ('occurrences', models.PositiveIntegerField(default=1)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now)),
+                ('suggestion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.team')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='unresolvedteamname',
+            constraint=models.UniqueConstraint(fields=('provider', 'normalized_name'), name='unique_unresolved_name'),
+        ),
+        migrations.RunPython(renormalize_aliases, migrations.RunPython.noop),
+    ]
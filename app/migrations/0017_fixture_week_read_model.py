@@ -0,0 +1,61 @@
+# Generated by Django 4.2.18 on 2026-10-18 00:15
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def build_fixture_weeks(apps, schema_editor):
+    # Later rebuilds are incremental, so every existing week is written once here
+    from app.fixture_weeks import fixture_document
+
+    alias = schema_editor.connection.alias
+    Match = apps.get_model('app', 'Match')
+    FixtureWeek = apps.get_model('app', 'FixtureWeek')
+    weeks = defaultdict(list)
+    matches = Match.objects.using(alias).select_related(
+        'home_team', 'away_team', 'odds'
+    ).order_by('match_date', 'id')
+    for match in matches:
+        weeks[(match.competition, match.matchweek)].append(match)
+    FixtureWeek.objects.using(alias).bulk_create([
+        FixtureWeek(
+            competition=competition,
+            matchweek=matchweek,
+            first_kickoff=week[0].match_date,
+            last_kickoff=max(match.match_date for match in week),
+            fixtures=[fixture_document(match) for match in week],
+        )
+        for (competition, matchweek), week in weeks.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_team_identity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FixtureWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('competition', models.CharField(max_length=100)),
+                ('matchweek', models.IntegerField()),
+                ('first_kickoff', models.DateTimeField()),
+                ('last_kickoff', models.DateTimeField()),
+                ('fixtures', models.JSONField(default=list)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['competition', 'last_kickoff'], name='fixtureweek_comp_last_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fixtureweek',
+            constraint=models.UniqueConstraint(fields=('competition', 'matchweek'), name='unique_fixture_week'),
+        ),
+        migrations.RunPython(build_fixture_weeks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.18 on 2026-10-18 00:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_fixture_week_read_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketAnalytics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookmaker_count', models.PositiveSmallIntegerField()),
+                ('mean_overround', models.FloatField()),
+                ('min_overround', models.FloatField()),
+                ('home_win_probability', models.FloatField()),
+                ('draw_probability', models.FloatField()),
+                ('away_win_probability', models.FloatField()),
+                ('home_win_fair_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('draw_fair_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('away_win_fair_odds', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('bookmakers', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='market', to='app.match')),
+            ],
+            options={
+                'verbose_name_plural': 'market analytics',
+            },
+        ),
+    ]
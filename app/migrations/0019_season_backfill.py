@@ -0,0 +1,84 @@
+# Generated by Django 4.2.18 on 2026-10-18 00:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_match_seasons(apps, schema_editor):
+    # Payloads carry the season from now on; stored rows get it from their kickoff,
+    # as European league seasons start in late summer
+    matches = apps.get_model('app', 'Match').objects.using(schema_editor.connection.alias)
+    for day in matches.dates('match_date', 'year'):
+        year = matches.filter(match_date__year=day.year)
+        year.filter(match_date__month__gte=7).update(season=day.year)
+        year.filter(match_date__month__lt=7).update(season=day.year - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_market_analytics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('competition', models.CharField(max_length=10)),
+                ('season', models.IntegerField()),
+                ('feed', models.CharField(max_length=20)),
+                ('rows_done', models.PositiveIntegerField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeasonStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('competition', models.CharField(max_length=100)),
+                ('season', models.IntegerField()),
+                ('position', models.IntegerField()),
+                ('played_games', models.IntegerField()),
+                ('won', models.IntegerField()),
+                ('draw', models.IntegerField()),
+                ('lost', models.IntegerField()),
+                ('points', models.IntegerField()),
+                ('goals_for', models.IntegerField()),
+                ('goals_against', models.IntegerField()),
+                ('goal_difference', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['competition', '-season', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='season',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['competition', 'season', 'matchweek'], name='match_comp_season_week_idx'),
+        ),
+        migrations.AddField(
+            model_name='seasonstanding',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_standings', to='app.team'),
+        ),
+        migrations.AddConstraint(
+            model_name='backfillprogress',
+            constraint=models.UniqueConstraint(fields=('competition', 'season', 'feed'), name='unique_backfill_progress'),
+        ),
+        migrations.AddIndex(
+            model_name='seasonstanding',
+            index=models.Index(fields=['competition', 'season', 'position'], name='season_standing_position_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='seasonstanding',
+            constraint=models.UniqueConstraint(fields=('competition', 'season', 'team'), name='unique_season_standing'),
+        ),
+        migrations.RunPython(set_match_seasons, migrations.RunPython.noop),
+    ]
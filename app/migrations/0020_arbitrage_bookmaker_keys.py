@@ -0,0 +1,44 @@
+# Generated by Django 4.2.18 on 2026-10-18 00:56
+
+from django.db import migrations, models
+
+
+def set_bookmaker_keys(apps, schema_editor):
+    # Stored legs only name the bookmaker; take the key from the match's odds row
+    alias = schema_editor.connection.alias
+    odds = apps.get_model('app', 'BookmakerOdds').objects.using(alias)
+    opportunities = apps.get_model('app', 'ArbitrageOpportunity').objects.using(alias)
+    for opportunity in opportunities:
+        keys = dict(odds.filter(match_id=opportunity.match_id).values_list('bookmaker', 'bookmaker_key'))
+        for outcome in ('home_win', 'draw', 'away_win'):
+            name = getattr(opportunity, f"{outcome}_bookmaker")
+            setattr(opportunity, f"{outcome}_bookmaker_key", keys.get(name, ''))
+        opportunity.save(update_fields=[
+            'home_win_bookmaker_key', 'draw_bookmaker_key', 'away_win_bookmaker_key',
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_season_backfill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arbitrageopportunity',
+            name='away_win_bookmaker_key',
+            field=models.CharField(default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='arbitrageopportunity',
+            name='draw_bookmaker_key',
+            field=models.CharField(default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='arbitrageopportunity',
+            name='home_win_bookmaker_key',
+            field=models.CharField(default='', max_length=50),
+        ),
+        migrations.RunPython(set_bookmaker_keys, migrations.RunPython.noop),
+    ]
@@ -9,8 +9,50 @@ class Team(models.Model):
     def __str__(self):
         return self.name
 
+class TeamAlias(models.Model):
+    """A name an upstream provider uses for a team, keyed by its normalized form"""
+    PROVIDER_CHOICES = [
+        ('football_data', 'football-data.org'),
+        ('odds_api', 'The Odds API'),
+    ]
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='aliases')
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES)
+    name = models.CharField(max_length=100)
+    normalized_name = models.CharField(max_length=100)
+    # Entered by hand to fix a name normalization gets wrong; wins over anything learned
+    manual = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'normalized_name'], name='unique_provider_alias'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.provider}) -> {self.team}"
+
+class UnresolvedTeamName(models.Model):
+    """A provider team name that matched no team, kept until an alias resolves it"""
+    provider = models.CharField(max_length=20, choices=TeamAlias.PROVIDER_CHOICES)
+    name = models.CharField(max_length=100)
+    normalized_name = models.CharField(max_length=100)
+    # Closest known team by name, to make adding the override quick
+    suggestion = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    occurrences = models.PositiveIntegerField(default=1)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'normalized_name'], name='unique_unresolved_name'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.provider})"
+
 class LeagueTable(models.Model):
-    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='standing')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='standings')
+    competition = models.CharField(max_length=100, default='Premier League')
     position = models.IntegerField()
     played_games = models.IntegerField()
     won = models.IntegerField()
@@ -23,12 +65,48 @@ class LeagueTable(models.Model):
     last_updated = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['position']
+        ordering = ['competition', 'position']
+        indexes = [
+            models.Index(fields=['competition', 'position'], name='standing_comp_position_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['competition', 'team'], name='unique_competition_standing'),
+        ]
 
     def __str__(self):
         return f"{self.position}. {self.team.name} - {self.points} points"
 
+class SeasonStanding(models.Model):
+    """A team's final standing in a past season, loaded by manage.py backfill"""
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='season_standings')
+    competition = models.CharField(max_length=100)
+    # Year the season started, as on Match.season
+    season = models.IntegerField()
+    position = models.IntegerField()
+    played_games = models.IntegerField()
+    won = models.IntegerField()
+    draw = models.IntegerField()
+    lost = models.IntegerField()
+    points = models.IntegerField()
+    goals_for = models.IntegerField()
+    goals_against = models.IntegerField()
+    goal_difference = models.IntegerField()
+
+    class Meta:
+        ordering = ['competition', '-season', 'position']
+        indexes = [
+            models.Index(fields=['competition', 'season', 'position'], name='season_standing_position_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['competition', 'season', 'team'], name='unique_season_standing'),
+        ]
+
+    def __str__(self):
+        return f"{self.season} {self.position}. {self.team.name} - {self.points} points"
+
 class Match(models.Model):
+    # football-data.org match id; stays the same when a fixture is rescheduled
+    external_id = models.IntegerField(unique=True, null=True, blank=True)
     home_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='home_matches')
     away_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='away_matches')
     match_date = models.DateTimeField()
@@ -43,15 +121,55 @@ class Match(models.Model):
     home_score = models.IntegerField(null=True, blank=True)
     away_score = models.IntegerField(null=True, blank=True)
     competition = models.CharField(max_length=100, default='Premier League')
+    # Year the season started, e.g. 2024 for 2024/25
+    season = models.IntegerField(null=True, blank=True)
     matchweek = models.IntegerField(default=1)
-    odds_api_id = models.CharField(max_length=100, blank=True, null=True)
+    # The Odds API event id; unique so odds lookups by event are a single index probe
+    odds_api_id = models.CharField(max_length=100, unique=True, blank=True, null=True)
 
     class Meta:
         ordering = ['match_date']
+        indexes = [
+            # Upcoming fixtures: status='scheduled' AND match_date >= now ORDER BY match_date
+            models.Index(fields=['status', 'match_date'], name='match_status_date_idx'),
+            models.Index(fields=['competition', 'status', 'match_date'], name='match_comp_status_date_idx'),
+            # Team pages: fixtures for one side in date order
+            models.Index(fields=['home_team', 'match_date'], name='match_home_team_date_idx'),
+            models.Index(fields=['away_team', 'match_date'], name='match_away_team_date_idx'),
+            models.Index(fields=['competition', 'matchweek'], name='match_comp_matchweek_idx'),
+            models.Index(fields=['competition', 'season', 'matchweek'], name='match_comp_season_week_idx'),
+        ]
 
     def __str__(self):
         return f"{self.home_team} vs {self.away_team} - {self.match_date.strftime('%Y-%m-%d %H:%M')}"
 
+class FixtureWeek(models.Model):
+    """Read model: one competition matchweek's fixtures as a ready-to-serve JSON document
+
+    Written by ingestion (app/fixture_weeks.py) whenever a fixture, its teams or its
+    best odds change, so pages and the API read fixtures without touching Match.
+    """
+    competition = models.CharField(max_length=100)
+    matchweek = models.IntegerField()
+    # Bounds of the week's kickoffs; readers skip weeks whose last kickoff has passed
+    first_kickoff = models.DateTimeField()
+    last_kickoff = models.DateTimeField()
+    # Fixture documents in (kickoff, id) order, see fixture_weeks.fixture_document
+    fixtures = models.JSONField(default=list)
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['competition', 'last_kickoff'], name='fixtureweek_comp_last_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['competition', 'matchweek'], name='unique_fixture_week'),
+        ]
+
+    def __str__(self):
+        return f"{self.competition} matchweek {self.matchweek}"
+
 class MatchOdds(models.Model):
     match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='odds')
     home_win_odds = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
@@ -61,3 +179,150 @@ class MatchOdds(models.Model):
 
     def __str__(self):
         return f"Odds for {self.match}"
+
+class BookmakerOdds(models.Model):
+    """Latest h2h prices from one bookmaker for one match"""
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='bookmaker_odds')
+    bookmaker_key = models.CharField(max_length=50)
+    bookmaker = models.CharField(max_length=100)
+    home_win_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    draw_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    away_win_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    # When the bookmaker last changed these prices, according to the Odds API
+    bookmaker_updated = models.DateTimeField(null=True, blank=True)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['bookmaker']
+        constraints = [
+            models.UniqueConstraint(fields=['match', 'bookmaker_key'], name='unique_match_bookmaker'),
+        ]
+
+    def __str__(self):
+        return f"{self.bookmaker} odds for {self.match}"
+
+class OddsSnapshot(models.Model):
+    """One price change for a (match, bookmaker, outcome) series
+
+    Prices are stored as integer ticks (decimal odds x 100), and a row is only
+    written when the price differs from the series' previous snapshot.
+    """
+    OUTCOME_CHOICES = [
+        ('home_win', 'Home win'),
+        ('draw', 'Draw'),
+        ('away_win', 'Away win'),
+    ]
+
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='odds_snapshots')
+    bookmaker_key = models.CharField(max_length=50)
+    outcome = models.CharField(max_length=8, choices=OUTCOME_CHOICES)
+    price_ticks = models.PositiveIntegerField()
+    captured_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['captured_at']
+        indexes = [
+            models.Index(
+                fields=['match', 'bookmaker_key', 'outcome', 'captured_at'],
+                name='odds_snapshot_series_idx',
+            ),
+            models.Index(fields=['match', 'captured_at'], name='odds_snapshot_match_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bookmaker_key} {self.outcome} {self.price_ticks / 100:.2f} @ {self.captured_at}"
+
+class ArbitrageOpportunity(models.Model):
+    """A three-way arbitrage found by the scan that runs after each odds refresh"""
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='arbitrage')
+    # Sum of implied probabilities of the best prices; below 1 means guaranteed profit
+    total_probability = models.FloatField()
+    profit_pct = models.FloatField()
+    home_win_bookmaker = models.CharField(max_length=100)
+    home_win_bookmaker_key = models.CharField(max_length=50, default='')
+    home_win_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    draw_bookmaker = models.CharField(max_length=100)
+    draw_bookmaker_key = models.CharField(max_length=50, default='')
+    draw_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    away_win_bookmaker = models.CharField(max_length=100)
+    away_win_bookmaker_key = models.CharField(max_length=50, default='')
+    away_win_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    # Kickoff copied from the match so ranked, windowed reads need no join
+    match_date = models.DateTimeField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-profit_pct']
+        indexes = [
+            models.Index(fields=['-profit_pct'], name='arbitrage_profit_idx'),
+            models.Index(fields=['match_date'], name='arbitrage_kickoff_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profit_pct:.2f}% arbitrage on {self.match}"
+
+class MarketAnalytics(models.Model):
+    """Margins and de-vigged probabilities for one match, recomputed after each odds refresh
+
+    Consensus probabilities average each bookmaker's Shin-method fair probabilities.
+    bookmakers holds the per-book breakdown as a list of
+    {key, name, overround, shin_z, proportional, shin, edge}, the last three keyed by outcome.
+    """
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='market')
+    bookmaker_count = models.PositiveSmallIntegerField()
+    # Average and tightest bookmaker margin, as a fraction (0.05 is a 5% overround)
+    mean_overround = models.FloatField()
+    min_overround = models.FloatField()
+    home_win_probability = models.FloatField()
+    draw_probability = models.FloatField()
+    away_win_probability = models.FloatField()
+    home_win_fair_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    draw_fair_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    away_win_fair_odds = models.DecimalField(max_digits=7, decimal_places=2)
+    bookmakers = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'market analytics'
+
+    def __str__(self):
+        return f"Market analytics for {self.match}"
+
+class FeedStatus(models.Model):
+    """Bookkeeping for one upstream feed owned by the ingestor"""
+    name = models.CharField(max_length=50, unique=True)
+    last_attempt = models.DateTimeField(null=True, blank=True)
+    last_success = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    # Hash of the last applied upstream payload and a counter bumped whenever it changes
+    payload_hash = models.CharField(max_length=64, blank=True, default='')
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} (last success: {self.last_success})"
+
+    def age_seconds(self):
+        """Seconds since the feed last refreshed successfully"""
+        if self.last_success is None:
+            return None
+        return int((timezone.now() - self.last_success).total_seconds())
+
+class BackfillProgress(models.Model):
+    """Checkpoint for one season feed of manage.py backfill, so an interrupted run resumes"""
+    competition = models.CharField(max_length=10)
+    season = models.IntegerField()
+    feed = models.CharField(max_length=20)
+    # Upstream items written so far, in response order; committed with each chunk
+    rows_done = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['competition', 'season', 'feed'], name='unique_backfill_progress'),
+        ]
+
+    def __str__(self):
+        state = 'done' if self.completed_at else f"{self.rows_done} rows"
+        return f"{self.competition} {self.season} {self.feed} ({state})"
@@ -0,0 +1,108 @@
+from .arbitrage import OUTCOMES, three_way_arbitrage
+
+# Total stake used when showing how to split an arbitrage bet
+ARBITRAGE_BANKROLL = 1000
+
+
+def convert_to_american_odds(decimal_odds):
+    """Convert decimal odds to American odds"""
+    if decimal_odds >= 2.00:
+        return round((decimal_odds - 1) * 100)
+    else:
+        return round(-100 / (decimal_odds - 1))
+
+
+def parse_h2h_bookmakers(event):
+    """Extract h2h prices from an Odds API event, keeping bookmakers that quote all three outcomes"""
+    event_home_team = event['home_team'].lower()
+    event_away_team = event['away_team'].lower()
+
+    bookmakers = []
+    for bookmaker in event.get('bookmakers', []):
+        prices = {}
+        # Find the h2h market
+        h2h_market = next((market for market in bookmaker['markets'] if market['key'] == 'h2h'), None)
+        if h2h_market and 'outcomes' in h2h_market:
+            for outcome in h2h_market['outcomes']:
+                # A price of 1.0 or less returns nothing on a win; treat it as no quote
+                price = outcome.get('price')
+                if not isinstance(price, (int, float)) or price <= 1.0:
+                    continue
+                outcome_name = outcome['name'].lower()
+                if outcome_name == event_home_team:
+                    prices['home_win'] = price
+                elif outcome_name == event_away_team:
+                    prices['away_win'] = price
+                elif outcome_name == 'draw':
+                    prices['draw'] = price
+
+        if all(key in prices for key in OUTCOMES):
+            bookmakers.append({
+                'key': bookmaker['key'],
+                'name': bookmaker['title'],
+                'last_update': bookmaker.get('last_update'),
+                **prices,
+            })
+    return bookmakers
+
+
+def summarize_odds(bookmakers):
+    """Build the odds structure rendered by match_details from per-bookmaker decimal prices
+
+    Each bookmaker is a dict with 'name' and decimal 'home_win', 'draw' and 'away_win' prices.
+    """
+    if not bookmakers:
+        return None
+
+    # Initialize odds structure
+    odds_structure = {
+        'bookmakers': [],
+        'best_odds': {
+            key: {'decimal': 0, 'american': 0, 'bookmaker': None} for key in OUTCOMES
+        },
+        'arbitrage': None
+    }
+
+    for bookmaker in bookmakers:
+        bookmaker_odds = {'name': bookmaker['name']}
+        for key in OUTCOMES:
+            decimal_price = float(bookmaker[key])
+            bookmaker_odds[key] = {
+                'decimal': decimal_price,
+                'american': convert_to_american_odds(decimal_price),
+            }
+            # Update best odds
+            if decimal_price > odds_structure['best_odds'][key]['decimal']:
+                odds_structure['best_odds'][key] = {
+                    **bookmaker_odds[key],
+                    'bookmaker': bookmaker['name'],
+                }
+        odds_structure['bookmakers'].append(bookmaker_odds)
+
+    # Three-way arbitrage across the best price for each outcome
+    best = [[odds_structure['best_odds'][key]['decimal'] for key in OUTCOMES]]
+    result = three_way_arbitrage(best, bankroll=ARBITRAGE_BANKROLL)
+    total_prob = float(result['total_probability'][0])
+
+    if result['is_arbitrage'][0]:
+        odds_structure['arbitrage'] = {
+            'exists': True,
+            'bankroll': ARBITRAGE_BANKROLL,
+            'profit': round(float(result['profit'][0]), 2),
+            'profit_pct': round(float(result['profit_pct'][0]), 2),
+            'legs': [
+                {
+                    'outcome': key,
+                    'bookmaker': odds_structure['best_odds'][key]['bookmaker'],
+                    'stake': round(float(result['stakes'][0][k]), 2),
+                }
+                for k, key in enumerate(OUTCOMES)
+            ],
+        }
+    else:
+        odds_structure['arbitrage'] = {
+            'exists': False,
+            'total_probability': round(total_prob * 100, 2)
+        }
+
+    return odds_structure
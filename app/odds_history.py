@@ -0,0 +1,135 @@
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from .models import OddsSnapshot
+from .odds import OUTCOMES
+
+TICKS_PER_UNIT = 100
+
+
+def to_ticks(price):
+    """Convert a decimal price to integer ticks, e.g. 2.35 -> 235"""
+    return int((Decimal(str(price)) * TICKS_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_ticks(ticks):
+    return ticks / TICKS_PER_UNIT
+
+
+def changed_snapshots(quotes, previous, captured_at):
+    """Build snapshots for the prices in quotes that moved since the previous refresh
+
+    quotes are BookmakerOdds instances about to be saved; previous maps
+    (match_id, bookmaker_key) to the {outcome: ticks} last stored for that series.
+    """
+    snapshots = []
+    for quote in quotes:
+        last = previous.get((quote.match_id, quote.bookmaker_key), {})
+        for outcome in OUTCOMES:
+            ticks = to_ticks(getattr(quote, f"{outcome}_odds"))
+            if last.get(outcome) != ticks:
+                snapshots.append(OddsSnapshot(
+                    match_id=quote.match_id,
+                    bookmaker_key=quote.bookmaker_key,
+                    outcome=outcome,
+                    price_ticks=ticks,
+                    captured_at=captured_at,
+                ))
+    return snapshots
+
+
+def _series(match, bookmaker_key=None, start=None, end=None):
+    snapshots = OddsSnapshot.objects.filter(match=match)
+    if bookmaker_key:
+        snapshots = snapshots.filter(bookmaker_key=bookmaker_key)
+    if start:
+        snapshots = snapshots.filter(captured_at__gte=start)
+    if end:
+        snapshots = snapshots.filter(captured_at__lt=end)
+    return snapshots.order_by('bookmaker_key', 'outcome', 'captured_at').values_list(
+        'bookmaker_key', 'outcome', 'price_ticks', 'captured_at'
+    )
+
+
+def opening_line(match, bookmaker_key=None):
+    """Return {(bookmaker_key, outcome): price} for the first quote of every series"""
+    line = {}
+    for key, outcome, ticks, _ in _series(match, bookmaker_key):
+        line.setdefault((key, outcome), from_ticks(ticks))
+    return line
+
+
+def closing_line(match, bookmaker_key=None):
+    """Return {(bookmaker_key, outcome): price} for the last quote before kickoff"""
+    line = {}
+    for key, outcome, ticks, _ in _series(match, bookmaker_key, end=match.match_date):
+        line[(key, outcome)] = from_ticks(ticks)
+    return line
+
+
+def largest_move(match, start=None, end=None, bookmaker_key=None):
+    """Find the series whose price moved furthest between the start and end of a window
+
+    The window includes start and excludes end; a series enters it at the last
+    price quoted before start. Returns a dict describing the move, or None if no
+    price moved inside the window.
+    """
+    first, last = {}, {}
+    if start:
+        for key, outcome, ticks, captured_at in _series(match, bookmaker_key, end=start):
+            first[(key, outcome)] = (ticks, captured_at)
+    for key, outcome, ticks, captured_at in _series(match, bookmaker_key, start, end):
+        first.setdefault((key, outcome), (ticks, captured_at))
+        last[(key, outcome)] = (ticks, captured_at)
+
+    best, best_ticks = None, 0
+    for series, (open_ticks, opened_at) in first.items():
+        close_ticks, closed_at = last.get(series, (open_ticks, opened_at))
+        move = close_ticks - open_ticks
+        if abs(move) > abs(best_ticks):
+            best_ticks = move
+            best = {
+                'bookmaker_key': series[0],
+                'outcome': series[1],
+                'from_price': from_ticks(open_ticks),
+                'to_price': from_ticks(close_ticks),
+                'move': from_ticks(move),
+                'from_time': opened_at,
+                'to_time': closed_at,
+            }
+    return best
+
+
+def downsample(match, bookmaker_key, outcome, bucket_seconds, start=None, end=None):
+    """Return OHLC price buckets for one series, suitable for charting
+
+    Each bucket is (bucket_start, open, high, low, close). Buckets without a
+    price change are omitted, since the previous close still applies.
+    """
+    snapshots = OddsSnapshot.objects.filter(
+        match=match, bookmaker_key=bookmaker_key, outcome=outcome
+    )
+    if start:
+        snapshots = snapshots.filter(captured_at__gte=start)
+    if end:
+        snapshots = snapshots.filter(captured_at__lt=end)
+
+    buckets = []
+    for ticks, captured_at in snapshots.order_by('captured_at').values_list('price_ticks', 'captured_at'):
+        timestamp = captured_at.timestamp()
+        bucket_start = timestamp - timestamp % bucket_seconds
+        if buckets and buckets[-1][0] == bucket_start:
+            _, open_, high, low, _ = buckets[-1]
+            buckets[-1] = (bucket_start, open_, max(high, ticks), min(low, ticks), ticks)
+        else:
+            buckets.append((bucket_start, ticks, ticks, ticks, ticks))
+
+    tz = match.match_date.tzinfo
+    return [
+        (
+            datetime.fromtimestamp(bucket_start, tz),
+            from_ticks(open_), from_ticks(high), from_ticks(low), from_ticks(close)
+        )
+        for bucket_start, open_, high, low, close in buckets
+    ]
+
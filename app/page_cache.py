@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .models import FeedStatus
+
+
+def feed_versions(names):
+    """Current FeedStatus version of each named feed, in the order given"""
+    versions = dict(FeedStatus.objects.filter(name__in=names).values_list('name', 'version'))
+    return [versions.get(name, 0) for name in names]
+
+
+async def afeed_versions(names):
+    """feed_versions for async views"""
+    versions = {
+        name: version
+        async for name, version in FeedStatus.objects.filter(name__in=names).values_list('name', 'version')
+    }
+    return [versions.get(name, 0) for name in names]
+
+
+def is_cacheable(request):
+    """Only anonymous GETs with no session or pending flash messages share a cached page"""
+    return (
+        request.method == 'GET'
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def page_key(request, versions):
+    """Cache key for a page at the given data versions
+
+    Versions live in the database, so a bump by the ingestor process is seen by
+    every web process and old entries simply stop being read.
+    """
+    digest = hashlib.sha256(request.get_full_path().encode()).hexdigest()[:32]
+    return f"page:{digest}:{'.'.join(map(str, versions))}"
+
+
+def _cached_response(entry):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['X-Page-Cache'] = 'hit'
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def _store(key, response):
+    patch_vary_headers(response, ['Cookie'])
+    # Responses that set cookies (CSRF, messages) are per-visitor
+    if response.status_code != 200 or response.cookies:
+        return None
+    response['X-Page-Cache'] = 'miss'
+    return key, {'content': response.content, 'content_type': response['Content-Type']}
+
+
+def cache_page_for_anonymous(feeds):
+    """Serve a view from the page cache for anonymous visitors until its feeds change
+
+    feeds(request, **kwargs) returns the FeedStatus names the page depends on; the
+    ingestion pipeline (and the model signals in app.signals) bump their versions.
+    Works for both sync and async views.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not is_cacheable(request):
+                    return await view(request, *args, **kwargs)
+                key = page_key(request, await afeed_versions(feeds(request, **kwargs)))
+                entry = await cache.aget(key)
+                if entry is not None:
+                    return _cached_response(entry)
+                response = await view(request, *args, **kwargs)
+                stored = _store(key, response)
+                if stored:
+                    await cache.aset(*stored, settings.PAGE_CACHE_TIMEOUT)
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable(request):
+                return view(request, *args, **kwargs)
+            key = page_key(request, feed_versions(feeds(request, **kwargs)))
+            entry = cache.get(key)
+            if entry is not None:
+                return _cached_response(entry)
+            response = view(request, *args, **kwargs)
+            stored = _store(key, response)
+            if stored:
+                cache.set(*stored, settings.PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,100 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Match
+
+# A fixture past kickoff that is still marked scheduled is most likely in play
+IN_PLAY_GRACE = timedelta(hours=3)
+
+# (time since kickoff, tier) for fixtures not yet finished: polled at the live rate
+# through the grace window, then less often until they reach a final status
+OVERRUN_TIERS = [
+    (IN_PLAY_GRACE, 'live'),
+    (timedelta(days=1), 'today'),
+]
+
+# (seconds until kickoff, tier in settings.FIXTURE_POLL_INTERVALS), nearest first
+KICKOFF_TIERS = [
+    (60 * 60, 'kickoff'),
+    (24 * 60 * 60, 'today'),
+    (7 * 24 * 60 * 60, 'week'),
+]
+
+
+class FixtureScheduler:
+    """Decides which of a competition's fixtures to poll next and batches them into upstream calls
+
+    Every fixture gets its own poll interval from its status and how close kickoff
+    is: in-play matches every ~30s, tighter tiers approaching kickoff and daily for
+    fixtures more than a week out. Fixtures still unfinished well after kickoff (a
+    late or missed status update) are polled less often, but never dropped; only
+    finished and cancelled matches stop being polled.
+    """
+
+    def __init__(self, competition, intervals=None, batch_size=None):
+        self.competition = competition
+        self.intervals = intervals or settings.FIXTURE_POLL_INTERVALS
+        self.batch_size = batch_size or settings.FIXTURE_POLL_BATCH_SIZE
+        # football-data match id -> when we last polled it
+        self.last_polled = {}
+
+    def poll_interval(self, status, kickoff, now):
+        """Seconds between polls for one fixture, or None if it needs no more polling"""
+        if status not in ('scheduled', 'live', 'postponed'):
+            return None
+        if status == 'postponed':
+            return self.intervals['far']
+
+        if kickoff <= now or status == 'live':
+            for since_kickoff, tier in OVERRUN_TIERS:
+                if now - kickoff <= since_kickoff:
+                    return self.intervals[tier]
+            return self.intervals['far']
+        until_kickoff = (kickoff - now).total_seconds()
+        for horizon, tier in KICKOFF_TIERS:
+            if until_kickoff <= horizon:
+                return self.intervals[tier]
+        return self.intervals['far']
+
+    def due(self, now=None):
+        """External ids of fixtures whose interval has elapsed, most overdue first"""
+        now = now or timezone.now()
+        fixtures = Match.objects.filter(
+            competition=self.competition.name,
+            status__in=['scheduled', 'live', 'postponed'],
+            external_id__isnull=False,
+        ).values_list('external_id', 'status', 'match_date')
+
+        due = []
+        for external_id, status, kickoff in fixtures:
+            interval = self.poll_interval(status, kickoff, now)
+            if interval is None:
+                continue
+            last = self.last_polled.get(external_id)
+            # Never-polled fixtures are treated as one interval overdue
+            overdue = 1.0 if last is None else (now - last).total_seconds() / interval
+            if overdue >= 1.0:
+                due.append((overdue, interval, external_id))
+        # Most overdue first; among equals, the shortest interval (live games) wins
+        due.sort(key=lambda item: (-item[0], item[1]))
+        return [external_id for _, _, external_id in due]
+
+    def plan(self, budget, now=None):
+        """Batches of external ids to fetch this tick, using at most budget upstream calls
+
+        Due fixtures are packed into as few calls as possible; when the rate limit
+        allows fewer calls than that, the most overdue fixtures go first and the
+        rest wait for the next tick.
+        """
+        due = self.due(now)
+        calls = min(budget, math.ceil(len(due) / self.batch_size))
+        due = due[:calls * self.batch_size]
+        return [due[i:i + self.batch_size] for i in range(0, len(due), self.batch_size)]
+
+    def mark_polled(self, external_ids, now=None):
+        now = now or timezone.now()
+        for external_id in external_ids:
+            self.last_polled[external_id] = now
@@ -1,8 +1,25 @@
+import hashlib
+import json
 import os
 import requests
 from datetime import datetime, timedelta
+from decimal import Decimal
+from django.db import transaction
 from django.utils import timezone
-from .models import Team, Match, MatchOdds, LeagueTable
+from django.utils.dateparse import parse_datetime
+from .models import Team, Match, MatchOdds, BookmakerOdds, OddsSnapshot, LeagueTable, FeedStatus
+from .http_cache import get_response_cache
+from .http_client import get_client
+from .teams import get_team_resolver
+from .competitions import DEFAULT_COMPETITION, budget_share, get_competition
+from .scheduling import FixtureScheduler
+from .arbitrage import rebuild_opportunities
+from .market import rebuild_market_analytics
+from .fixture_weeks import rebuild_fixture_weeks, rebuild_weeks_for_teams
+from .db import WRITER, writes
+from .metrics import ingest_phase, record_rows
+from .odds import OUTCOMES, convert_to_american_odds, parse_h2h_bookmakers, summarize_odds
+from .odds_history import changed_snapshots, to_ticks
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,16 +28,23 @@ class FootballDataService:
     BASE_URL = "http://api.football-data.org/v4"
     ODDS_BASE_URL = "https://api.the-odds-api.com/v4/sports"
     
-    def __init__(self):
+    def __init__(self, competition=None, cache=None, share=None):
+        self.competition = get_competition(competition or DEFAULT_COMPETITION)
+        self.cache = cache or get_response_cache()
+        # Each competition spends its own share of the upstream rate limits
+        if share is None:
+            share = budget_share(self.competition)
+        self.football_client = get_client('football_data', self.competition.code, share)
+        self.odds_client = get_client('odds_api', self.competition.code, share)
+        self.fixture_scheduler = FixtureScheduler(self.competition)
         self.api_key = os.getenv('FOOTBALL_DATA_API_KEY')
         self.headers = {'X-Auth-Token': self.api_key}
         self.odds_api_key = os.getenv('ODDS_API_KEY')
         self.odds_base_url = "https://api.the-odds-api.com/v4"
     
-    def fetch_upcoming_matches(self):
-        """Fetch upcoming Premier League matches"""
-        # Premier League competition ID
-        competition_id = "PL"
+    def upcoming_matches_request(self):
+        """URL and params for this competition's upcoming matches"""
+        competition_id = self.competition.code
         
         # Get matches for the next 30 days
         from_date = datetime.now().strftime("%Y-%m-%d")
@@ -32,251 +56,563 @@ class FootballDataService:
             'dateTo': to_date,
             'status': 'SCHEDULED'
         }
-        
+        return url, params
+
+    def fetch_upcoming_matches(self):
+        """Fetch upcoming matches for this competition"""
+        url, params = self.upcoming_matches_request()
         try:
-            #print(f"Fetching matches from {from_date} to {to_date}")
-            #print(f"URL: {url}")
-            #print(f"Headers: {self.headers}")
-            
-            response = requests.get(url, headers=self.headers, params=params)
-            #print(f"Response status code: {response.status_code}")
-            #print(f"Response content: {response.text[:500]}...")  # Print first 500 chars of response
-            
-            response.raise_for_status()
-            data = response.json()
-            #print(f"Number of matches found: {len(data.get('matches', []))}")
+            data = self.cache.get_json(
+                'matches', url, params=params, headers=self.headers,
+                fetch=self.football_client.get
+            )
             return data.get('matches', [])
         except requests.RequestException as e:
-            print(f"Error fetching matches: {e}")
+            logger.error(f"Error fetching matches: {e}")
             return []
 
-    def fetch_odds(self, match):
-        """Fetch odds for a specific match"""
+    def fixtures_request(self, external_ids):
+        """URL and params for specific fixtures: the single-match endpoint, or one ?ids= call"""
+        if len(external_ids) == 1:
+            return f"{self.BASE_URL}/matches/{external_ids[0]}", None
+        return f"{self.BASE_URL}/matches", {'ids': ','.join(map(str, external_ids))}
+
+    @staticmethod
+    def fixtures_from_response(external_ids, data):
+        # The single-match endpoint returns the match itself rather than a list
+        return [data] if len(external_ids) == 1 else data.get('matches', [])
+
+    def fetch_fixtures(self, external_ids):
+        """Fetch current score and status for the given football-data match ids"""
+        url, params = self.fixtures_request(external_ids)
+        response = self.football_client.get(url, params=params, headers=self.headers)
+        response.raise_for_status()
+        return self.fixtures_from_response(external_ids, response.json())
+
+    def fixture_budget(self):
+        """Upstream calls the fixture poller may spend now, keeping one back for the other feeds"""
+        return max(0, self.football_client.limiter.available() - 1)
+
+    def poll_fixtures(self):
+        """Refresh whichever fixtures the scheduler says are due, in as few calls as the budget allows"""
+        polled = 0
+        for batch in self.fixture_scheduler.plan(self.fixture_budget()):
+            try:
+                with ingest_phase(self.competition.code, 'live', 'fetch'):
+                    matches = self.fetch_fixtures(batch)
+            except requests.RequestException as e:
+                logger.error(f"Error polling {len(batch)} fixtures: {e}")
+                continue
+            self.upsert_matches(matches, feed='live')
+            self.fixture_scheduler.mark_polled(batch)
+            polled += len(batch)
+        return polled
+
+    def odds_board_request(self):
+        """URL and params for h2h odds on every upcoming fixture in this competition"""
+        url = f"{self.odds_base_url}/sports/{self.competition.odds_sport_key}/odds"
+        params = {
+            'apiKey': self.odds_api_key,
+            'regions': 'us',
+            'markets': 'h2h',
+            'oddsFormat': 'decimal',
+            'dateFormat': 'iso'
+        }
+        return url, params
+
+    def fetch_odds_board(self):
+        """Fetch h2h odds for every upcoming fixture in this competition in one Odds API call"""
+        url, params = self.odds_board_request()
+        response = self.odds_client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_odds_events(self):
+        """Fetch this competition's upcoming events (no odds) from The Odds API"""
+        url = f"{self.odds_base_url}/sports/{self.competition.odds_sport_key}/events"
+        params = {
+            'apiKey': self.odds_api_key,
+            'dateFormat': 'iso'
+        }
+        response = self.odds_client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    @writes
+    def resolve_event_matches(self, events):
+        """Map Odds API events to stored matches, persisting each match's event id
+
+        Returns {event_id: Match}. Matches that already carry an odds_api_id are found
+        directly; the rest are resolved once through the team identity index, and any
+        team names it can't place are reported in UnresolvedTeamName.
+        """
+        upcoming = list(
+            Match.objects.filter(
+                competition=self.competition.name,
+                status__in=['scheduled', 'live']
+            ).select_related('home_team', 'away_team')
+        )
+        by_event_id = {match.odds_api_id: match for match in upcoming if match.odds_api_id}
+        by_teams = {}
+        for match in upcoming:
+            by_teams.setdefault((match.home_team_id, match.away_team_id), []).append(match)
+
+        resolver = None
+        resolved, linked = {}, []
+        for event in events:
+            match = by_event_id.get(event['id'])
+            if match is None:
+                resolver = resolver or get_team_resolver()
+                home_id = resolver.resolve('odds_api', event['home_team'])
+                away_id = resolver.resolve('odds_api', event['away_team'])
+                commence_time = parse_datetime(event['commence_time'])
+                # The same pairing can appear more than once; take the closest kickoff
+                match = min(
+                    by_teams.get((home_id, away_id), []),
+                    key=lambda m: abs(m.match_date - commence_time),
+                    default=None,
+                )
+                if match is None:
+                    logger.warning(f"No match found for odds event: {event['home_team']} vs {event['away_team']}")
+                    continue
+                match.odds_api_id = event['id']
+                linked.append(match)
+            resolved[event['id']] = match
+
+        if linked:
+            Match.objects.bulk_update(linked, ['odds_api_id'])
+        if resolver is not None:
+            resolver.flush()
+        return resolved
+
+    def refresh_odds(self):
+        """Refresh stored odds for all upcoming matches from a single bulk Odds API call"""
         try:
-            # Format the teams for the odds API
-            teams = f"{match.home_team.name} vs {match.away_team.name}"
-            
-            # Get odds for soccer matches
-            url = f"{self.ODDS_BASE_URL}/soccer_epl/odds"
-            params = {
-                'apiKey': self.ODDS_API_KEY,
-                'regions': 'eu',
-                'markets': 'h2h',
-                'oddsFormat': 'decimal'
+            with ingest_phase(self.competition.code, 'odds', 'fetch'):
+                events = self.fetch_odds_board()
+        except requests.RequestException as e:
+            logger.error(f"Error fetching odds: {e}")
+            return False
+        return self.store_odds(events)
+
+    @writes
+    def store_odds(self, events):
+        """Persist the bookmaker quotes in an odds board payload, then rescan for arbitrage
+        and recompute market analytics"""
+        code = self.competition.code
+        with ingest_phase(code, 'odds', 'resolve'):
+            matches = self.resolve_event_matches(events)
+
+        quotes, best_rows, matched = [], [], set()
+        for event in events:
+            match = matches.get(event['id'])
+            if match is None:
+                continue
+
+            bookmakers = parse_h2h_bookmakers(event)
+            if not bookmakers:
+                continue
+            matched.add(match.id)
+            for bookmaker in bookmakers:
+                quotes.append(BookmakerOdds(
+                    match=match,
+                    bookmaker_key=bookmaker['key'],
+                    bookmaker=bookmaker['name'],
+                    home_win_odds=Decimal(str(bookmaker['home_win'])),
+                    draw_odds=Decimal(str(bookmaker['draw'])),
+                    away_win_odds=Decimal(str(bookmaker['away_win'])),
+                    bookmaker_updated=parse_datetime(bookmaker['last_update'] or ''),
+                ))
+            best_rows.append(MatchOdds(
+                match=match,
+                **{
+                    f"{key}_odds": Decimal(str(max(b[key] for b in bookmakers)))
+                    for key in OUTCOMES
+                }
+            ))
+
+        started = timezone.now()
+        with ingest_phase(code, 'odds', 'write'), transaction.atomic(using=WRITER):
+            status, payload_hash = self._lock_feed('odds', events)
+            if status.payload_hash == payload_hash:
+                logger.info("Odds board unchanged, skipping write")
+                record_rows(code, 'odds', skipped=len(quotes))
+                return len(matched)
+
+            # Append history only for prices that moved since the last refresh
+            previous = {}
+            for quote in BookmakerOdds.objects.filter(match_id__in=matched):
+                previous[(quote.match_id, quote.bookmaker_key)] = {
+                    outcome: to_ticks(getattr(quote, f"{outcome}_odds")) for outcome in OUTCOMES
+                }
+            snapshots = OddsSnapshot.objects.bulk_create(changed_snapshots(quotes, previous, started))
+
+            BookmakerOdds.objects.bulk_create(
+                quotes,
+                update_conflicts=True,
+                unique_fields=['match', 'bookmaker_key'],
+                update_fields=[
+                    'bookmaker', 'home_win_odds', 'draw_odds', 'away_win_odds',
+                    'bookmaker_updated', 'last_updated'
+                ],
+            )
+            # Drop quotes from bookmakers that no longer price these matches
+            withdrawn, _ = BookmakerOdds.objects.filter(match_id__in=matched).exclude(
+                last_updated__gte=started
+            ).delete()
+            # Upcoming matches the board no longer lists have no current prices either.
+            # Deleting their MatchOdds fires match_odds_changed, which rebuilds their weeks.
+            stale = list(MatchOdds.objects.filter(
+                match__competition=self.competition.name, match__status='scheduled',
+                match__match_date__gte=started,
+            ).exclude(match_id__in=matched).values_list('match_id', flat=True))
+            if stale:
+                withdrawn += BookmakerOdds.objects.filter(match_id__in=stale).delete()[0]
+                MatchOdds.objects.filter(match_id__in=stale).delete()
+            # Only matches whose best prices moved need their fixture week rebuilt
+            previous_best = {
+                values[0]: values[1:]
+                for values in MatchOdds.objects.filter(match_id__in=matched).values_list(
+                    'match_id', *(f"{outcome}_odds" for outcome in OUTCOMES)
+                )
             }
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Find the matching game
-            for game in data:
-                if game['home_team'] == match.home_team.name and game['away_team'] == match.away_team.name:
-                    # Extract odds for home win, away win, and draw
-                    odds = {}
-                    for market in game['bookmakers'][0]['markets'][0]['outcomes']:
-                        if market['name'] == match.home_team.name:
-                            odds['home_win'] = market['price']
-                        elif market['name'] == match.away_team.name:
-                            odds['away_win'] = market['price']
-                        elif market['name'] == 'Draw':
-                            odds['draw'] = market['price']
-                    
-                    # Update or create MatchOdds
-                    match_odds, created = MatchOdds.objects.update_or_create(
-                        match=match,
-                        defaults={
-                            'home_win_odds': odds.get('home_win'),
-                            'away_win_odds': odds.get('away_win'),
-                            'draw_odds': odds.get('draw')
-                        }
-                    )
-                    return match_odds
-            
-            return None
-        except Exception as e:
-            print(f"Error fetching odds: {e}")
-            return None
+            best_rows = [
+                row for row in best_rows
+                if previous_best.get(row.match_id) != tuple(
+                    getattr(row, f"{outcome}_odds") for outcome in OUTCOMES
+                )
+            ]
+            MatchOdds.objects.bulk_create(
+                best_rows,
+                update_conflicts=True,
+                unique_fields=['match'],
+                update_fields=['home_win_odds', 'draw_odds', 'away_win_odds', 'last_updated'],
+            )
+            rebuild_fixture_weeks(self.competition.name, {row.match.matchweek for row in best_rows})
+            self._publish_feed(status, payload_hash)
+
+        updated = sum((quote.match_id, quote.bookmaker_key) in previous for quote in quotes)
+        record_rows(
+            code, 'odds', inserted=len(quotes) - updated, updated=updated, deleted=withdrawn,
+            skipped=len(events) - len(matched),
+        )
+        record_rows(code, 'odds_history', inserted=len(snapshots))
+        logger.info(f"Stored {len(quotes)} bookmaker quotes for {len(matched)} matches")
+
+        with ingest_phase(code, 'odds', 'arbitrage'):
+            found = rebuild_opportunities(self.competition.name)
+        logger.info(f"Found {found} arbitrage opportunities")
+        with ingest_phase(code, 'odds', 'analytics'):
+            analysed = rebuild_market_analytics(self.competition.name)
+        logger.info(f"Computed market analytics for {analysed} matches")
+        return len(matched)
+
+    # Map API status to our model status
+    STATUS_MAPPING = {
+        'SCHEDULED': 'scheduled',
+        'TIMED': 'scheduled',
+        'LIVE': 'live',
+        'IN_PLAY': 'live',
+        'IN_PROGRESS': 'live',
+        'PAUSED': 'live',
+        'FINISHED': 'finished',
+        'POSTPONED': 'postponed',
+        'SUSPENDED': 'cancelled',
+        'CANCELLED': 'cancelled'
+    }
+
+    MATCH_UPDATE_FIELDS = [
+        'home_team', 'away_team', 'match_date', 'venue', 'status',
+        'home_score', 'away_score', 'matchweek', 'competition', 'season'
+    ]
 
     def update_matches(self):
         """Update matches in the database"""
-        matches = self.fetch_upcoming_matches()
-        print(f"Processing {len(matches)} matches")
-        
+        with ingest_phase(self.competition.code, 'matches', 'fetch'):
+            matches = self.fetch_upcoming_matches()
+        logger.info(f"Processing {len(matches)} matches")
+        return self.upsert_matches(matches)
+
+    def resolve_teams(self, teams_data):
+        """Return {name: Team} for the given API team payloads, creating or updating in bulk"""
+        wanted = {}
+        for team_data in teams_data:
+            # Undecided fixtures (e.g. cup rounds) have no team name yet
+            if team_data.get('name'):
+                wanted[team_data['name']] = team_data
+
+        teams = {team.name: team for team in Team.objects.filter(name__in=wanted)}
+
+        missing = [
+            Team(name=name, short_name=data.get('shortName'), logo_url=data.get('crest'))
+            for name, data in wanted.items() if name not in teams
+        ]
+        if missing:
+            Team.objects.bulk_create(missing)
+            # Re-read so new rows carry primary keys on every database backend
+            teams = {team.name: team for team in Team.objects.filter(name__in=wanted)}
+
+        # Update logo URLs if they've changed
+        changed = []
+        for name, data in wanted.items():
+            team = teams[name]
+            if data.get('crest') and team.logo_url != data['crest']:
+                team.logo_url = data['crest']
+                changed.append(team)
+        if changed:
+            Team.objects.bulk_update(changed, ['logo_url'])
+            rebuild_weeks_for_teams([team.id for team in changed])
+
+        return teams
+
+    @writes
+    def upsert_matches(self, matches, feed='matches'):
+        """Insert or update a batch of API match payloads keyed on the upstream match id
+
+        feed names the FeedStatus whose version is bumped: 'matches' for the fixture
+        window, 'live' for the per-fixture poller.
+        """
+        if not matches:
+            return 0
+
+        code = self.competition.code
+        with ingest_phase(code, feed, 'write'), transaction.atomic(using=WRITER):
+            status, payload_hash = self._lock_feed(feed, matches)
+            if status.payload_hash == payload_hash:
+                logger.info("Matches unchanged, skipping write")
+                record_rows(code, feed, skipped=len(matches))
+                return len(matches)
+
+            rows = self.match_rows(matches)
+            self._adopt_legacy_matches(rows)
+            # Only fixtures whose stored values differ are written and re-published
+            existing = {
+                values[0]: values[1:]
+                for values in Match.objects.filter(
+                    external_id__in=[row.external_id for row in rows]
+                ).values_list('external_id', *self.MATCH_UPDATE_FIELDS)
+            }
+            changed = [
+                row for row in rows
+                if existing.get(row.external_id) != tuple(
+                    getattr(row, f"{field}_id" if field in ('home_team', 'away_team') else field)
+                    for field in self.MATCH_UPDATE_FIELDS
+                )
+            ]
+
+            Match.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['external_id'],
+                update_fields=self.MATCH_UPDATE_FIELDS,
+            )
+            # A fixture moved to another matchweek leaves its old week too
+            week_field = self.MATCH_UPDATE_FIELDS.index('matchweek')
+            weeks = {row.matchweek for row in changed} | {
+                existing[row.external_id][week_field] for row in changed if row.external_id in existing
+            }
+            rebuild_fixture_weeks(self.competition.name, weeks)
+            self._publish_feed(status, payload_hash)
+
+        inserted = sum(row.external_id not in existing for row in changed)
+        record_rows(
+            code, feed, inserted=inserted, updated=len(changed) - inserted,
+            skipped=len(matches) - len(changed),
+        )
+        logger.info(f"Upserted {len(changed)} of {len(rows)} matches")
+        return len(rows)
+
+    def match_rows(self, matches):
+        """Unsaved Match rows for API match payloads, one per upstream id; bad payloads are logged and skipped"""
+        teams = self.resolve_teams(
+            [m['homeTeam'] for m in matches] + [m['awayTeam'] for m in matches]
+        )
+        rows = {}
         for match_data in matches:
             try:
-                # Get or create teams
-                home_team, _ = Team.objects.get_or_create(
-                    name=match_data['homeTeam']['name'],
-                    defaults={
-                        'short_name': match_data['homeTeam']['shortName'],
-                        'logo_url': match_data['homeTeam']['crest']
-                    }
+                match_date = timezone.make_aware(
+                    datetime.strptime(match_data['utcDate'], "%Y-%m-%dT%H:%M:%SZ")
                 )
-                
-                away_team, _ = Team.objects.get_or_create(
-                    name=match_data['awayTeam']['name'],
-                    defaults={
-                        'short_name': match_data['awayTeam']['shortName'],
-                        'logo_url': match_data['awayTeam']['crest']
-                    }
-                )
-                
-                # Update logo URLs if they've changed
-                if home_team.logo_url != match_data['homeTeam']['crest']:
-                    home_team.logo_url = match_data['homeTeam']['crest']
-                    home_team.save()
-                
-                if away_team.logo_url != match_data['awayTeam']['crest']:
-                    away_team.logo_url = match_data['awayTeam']['crest']
-                    away_team.save()
-                
-                # Convert match date to timezone-aware datetime
-                match_date = datetime.strptime(match_data['utcDate'], "%Y-%m-%dT%H:%M:%SZ")
-                match_date = timezone.make_aware(match_date)
-                
-                # Map API status to our model status
-                status_mapping = {
-                    'SCHEDULED': 'scheduled',
-                    'LIVE': 'live',
-                    'IN_PROGRESS': 'live',
-                    'PAUSED': 'live',
-                    'FINISHED': 'finished',
-                    'POSTPONED': 'postponed',
-                    'SUSPENDED': 'cancelled',
-                    'CANCELLED': 'cancelled'
-                }
-                
-                status = status_mapping.get(match_data['status'], 'scheduled')
-                
-                # Update or create match
-                match, created = Match.objects.update_or_create(
-                    home_team=home_team,
-                    away_team=away_team,
+                rows[match_data['id']] = Match(
+                    external_id=match_data['id'],
+                    competition=self.competition.name,
+                    season=self.season_of(match_data, match_date),
+                    home_team=teams[match_data['homeTeam']['name']],
+                    away_team=teams[match_data['awayTeam']['name']],
                     match_date=match_date,
-                    defaults={
-                        'venue': match_data.get('venue', ''),
-                        'status': status,
-                        'home_score': match_data['score']['fullTime']['home'],
-                        'away_score': match_data['score']['fullTime']['away'],
-                        'matchweek': match_data['matchday']
-                    }
+                    venue=match_data.get('venue') or '',
+                    status=self.STATUS_MAPPING.get(match_data['status'], 'scheduled'),
+                    home_score=match_data['score']['fullTime']['home'],
+                    away_score=match_data['score']['fullTime']['away'],
+                    matchweek=match_data.get('matchday') or 1,
                 )
-                print(f"{'Created' if created else 'Updated'} match: {match}")
-                
-            except Exception as e:
-                print(f"Error processing match: {e}")
-                print(f"Match data: {match_data}")
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Error processing match {match_data.get('id')}: {e}")
+        return list(rows.values())
+
+    @staticmethod
+    def season_of(match_data, match_date):
+        """Year a match's season started, from the payload or failing that its kickoff"""
+        start = (match_data.get('season') or {}).get('startDate')
+        if start:
+            return int(start[:4])
+        # European league seasons start in late summer
+        return match_date.year if match_date.month >= 7 else match_date.year - 1
+
+    def _adopt_legacy_matches(self, rows):
+        """Attach upstream ids to rows stored before matches were keyed on external_id"""
+        legacy = Match.objects.filter(
+            external_id__isnull=True,
+            match_date__in={row.match_date for row in rows},
+        ).only('id', 'home_team_id', 'away_team_id', 'match_date')
+        by_key = {(m.home_team_id, m.away_team_id, m.match_date): m for m in legacy}
+        if not by_key:
+            return
+
+        adopted = []
+        for row in rows:
+            existing = by_key.get((row.home_team.id, row.away_team.id, row.match_date))
+            if existing is not None:
+                existing.external_id = row.external_id
+                adopted.append(existing)
+        if adopted:
+            Match.objects.bulk_update(adopted, ['external_id'])
+
+    # LeagueTable field -> key in the API standings payload
+    LEAGUE_TABLE_FIELDS = {
+        'position': 'position',
+        'played_games': 'playedGames',
+        'won': 'won',
+        'draw': 'draw',
+        'lost': 'lost',
+        'points': 'points',
+        'goals_for': 'goalsFor',
+        'goals_against': 'goalsAgainst',
+        'goal_difference': 'goalDifference'
+    }
+
+    def league_table_request(self):
+        """URL for this competition's standings"""
+        competition_id = self.competition.code
+        return f"{self.BASE_URL}/competitions/{competition_id}/standings"
 
     def fetch_league_table(self):
-        """Fetch Premier League table"""
-        competition_id = "PL"
-        url = f"{self.BASE_URL}/competitions/{competition_id}/standings"
-        
+        """Fetch this competition's league table"""
+        url = self.league_table_request()
         try:
-            print("Fetching league table...")
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            standings = data['standings'][0]['table']
-            print(f"Found {len(standings)} teams in the table")
-            
-            for standing in standings:
-                team_data = standing['team']
-                team, _ = Team.objects.get_or_create(
-                    name=team_data['name'],
-                    defaults={
-                        'short_name': team_data['shortName'],
-                        'logo_url': team_data['crest']
-                    }
-                )
-                
-                # Update team logo if it has changed
-                if team.logo_url != team_data['crest']:
-                    team.logo_url = team_data['crest']
-                    team.save()
-                
-                # Update or create league table entry
-                LeagueTable.objects.update_or_create(
-                    team=team,
-                    defaults={
-                        'position': standing['position'],
-                        'played_games': standing['playedGames'],
-                        'won': standing['won'],
-                        'draw': standing['draw'],
-                        'lost': standing['lost'],
-                        'points': standing['points'],
-                        'goals_for': standing['goalsFor'],
-                        'goals_against': standing['goalsAgainst'],
-                        'goal_difference': standing['goalDifference']
-                    }
+            with ingest_phase(self.competition.code, 'league_table', 'fetch'):
+                data = self.cache.get_json(
+                    'standings', url, headers=self.headers, fetch=self.football_client.get
                 )
             
+            standings = data['standings'][0]['table']
+            logger.info(f"Found {len(standings)} teams in the table")
+            self.sync_league_table(standings)
             return True
         except Exception as e:
-            print(f"Error fetching league table: {e}")
+            logger.error(f"Error fetching league table: {e}")
             return False
 
+    @writes
+    def sync_league_table(self, standings):
+        """Apply a standings payload, writing only the rows that changed
+
+        Returns the table version, which is bumped whenever the payload changes.
+        """
+        code = self.competition.code
+        with ingest_phase(code, 'league_table', 'write'), transaction.atomic(using=WRITER):
+            status, payload_hash = self._lock_feed('league_table', standings)
+            if status.payload_hash == payload_hash:
+                logger.info("League table unchanged, skipping write")
+                record_rows(code, 'league_table', skipped=len(standings))
+                return status.version
+
+            teams = self.resolve_teams([standing['team'] for standing in standings])
+            standings_rows = LeagueTable.objects.filter(competition=self.competition.name)
+            existing = {
+                row.team_id: row
+                for row in standings_rows.filter(team__in=teams.values())
+            }
+
+            now = timezone.now()
+            created, changed = [], []
+            for standing in standings:
+                team = teams[standing['team']['name']]
+                values = {
+                    field: standing[key] for field, key in self.LEAGUE_TABLE_FIELDS.items()
+                }
+                row = existing.get(team.id)
+                if row is None:
+                    created.append(LeagueTable(
+                        team=team, competition=self.competition.name, **values
+                    ))
+                elif any(getattr(row, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(row, field, value)
+                    # bulk_update bypasses auto_now, so stamp changed rows ourselves
+                    row.last_updated = now
+                    changed.append(row)
+
+            if created:
+                LeagueTable.objects.bulk_create(created)
+            if changed:
+                LeagueTable.objects.bulk_update(
+                    changed, [*self.LEAGUE_TABLE_FIELDS, 'last_updated']
+                )
+            # Drop teams that have left the competition (e.g. relegation)
+            relegated, _ = standings_rows.exclude(team__in=teams.values()).delete()
+
+            self._publish_feed(status, payload_hash)
+
+        record_rows(
+            code, 'league_table', inserted=len(created), updated=len(changed), deleted=relegated,
+            skipped=len(standings) - len(created) - len(changed),
+        )
+
+        logger.info(
+            f"{self.competition.name} table v{status.version}: {len(created)} created, {len(changed)} updated"
+        )
+        return status.version
+
+    def _lock_feed(self, feed, payload):
+        """Lock this competition's FeedStatus row for a feed and hash the incoming payload
+
+        Callers compare the hash with status.payload_hash to skip unchanged payloads.
+        Must be called inside transaction.atomic(using=WRITER).
+        """
+        payload_hash = hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode()
+        ).hexdigest()
+        status, _ = FeedStatus.objects.select_for_update().get_or_create(
+            name=self.competition.feed_name(feed)
+        )
+        return status, payload_hash
+
+    def _publish_feed(self, status, payload_hash):
+        """Record a newly applied payload, bumping the version that API ETags are built from"""
+        status.payload_hash = payload_hash
+        status.version += 1
+        status.save(update_fields=['payload_hash', 'version'])
+
     def convert_to_american_odds(self, decimal_odds):
         """Convert decimal odds to American odds"""
-        if decimal_odds >= 2.00:
-            return round((decimal_odds - 1) * 100)
-        else:
-            return round(-100 / (decimal_odds - 1))
+        return convert_to_american_odds(decimal_odds)
 
     def get_odds_for_match(self, match):
         """Get odds for a specific match from The Odds API"""
         try:
-            # First, get the event ID for this match
-            event_url = f"{self.odds_base_url}/sports/soccer_epl/events"
-            
-            # Use the match date for the time window
-            match_time = match.match_date
-            # Convert to EST
-            est = timezone.get_fixed_timezone(-300)  # EST is UTC-5
-            match_time_est = match_time.astimezone(est)
-            
-            # Set a 1-hour window around the match time
-            start_time = match_time_est - timedelta(minutes=30)
-            end_time = match_time_est + timedelta(minutes=60)
-            
-            # Convert back to UTC for API call
-            start_time_utc = start_time.astimezone(timezone.utc)
-            end_time_utc = end_time.astimezone(timezone.utc)
-            
-            event_params = {
-                'apiKey': self.odds_api_key,
-                'dateFormat': 'iso',
-                'commenceTimeFrom': start_time_utc.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                'commenceTimeTo': end_time_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
-            }
-            
-            event_response = requests.get(event_url, params=event_params)
-            event_response.raise_for_status()
-            events = event_response.json()
-
-            # Find the matching event by team names
-            event_id = None
-            for event in events:
-                event_home = event['home_team'].lower().strip()
-                event_away = event['away_team'].lower().strip()
-                match_home = match.home_team.name.lower().strip()
-                match_away = match.away_team.name.lower().strip()
-                
-                home_match = match_home in event_home or event_home in match_home
-                away_match = match_away in event_away or event_away in match_away
-                
-                if home_match and away_match:
-                    event_id = event['id']
-                    break
+            # Resolve and store the event id the first time this match is looked up
+            if not match.odds_api_id:
+                self.resolve_event_matches(self.fetch_odds_events())
+                match.refresh_from_db(fields=['odds_api_id'])
 
+            event_id = match.odds_api_id
             if not event_id:
                 logger.warning(f"No event ID found for match: {match.home_team.name} vs {match.away_team.name}")
                 return None
 
             # Get odds for the specific event
-            odds_url = f"{self.odds_base_url}/sports/soccer_epl/events/{event_id}/odds"
+            odds_url = f"{self.odds_base_url}/sports/{self.competition.odds_sport_key}/events/{event_id}/odds"
             odds_params = {
                 'apiKey': self.odds_api_key,
                 'regions': 'us',
@@ -284,7 +620,7 @@ class FootballDataService:
                 'oddsFormat': 'decimal'
             }
 
-            odds_response = requests.get(odds_url, params=odds_params)
+            odds_response = self.odds_client.get(odds_url, params=odds_params)
             odds_response.raise_for_status()
             odds_data = odds_response.json()
 
@@ -292,111 +628,7 @@ class FootballDataService:
                 logger.warning(f"No odds data found for event ID: {event_id}")
                 return None
 
-            # Get the event teams from the API response
-            event_home_team = odds_data['home_team'].lower()
-            event_away_team = odds_data['away_team'].lower()
-            
-            # Initialize odds structure
-            odds_structure = {
-                'bookmakers': [],
-                'best_odds': {
-                    'home_win': {'decimal': 0, 'american': 0, 'bookmaker': None},
-                    'away_win': {'decimal': 0, 'american': 0, 'bookmaker': None},
-                    'draw': {'decimal': 0, 'american': 0, 'bookmaker': None}
-                },
-                'arbitrage': None
-            }
-
-            # Process each bookmaker's odds
-            for bookmaker in odds_data['bookmakers']:
-                bookmaker_odds = {
-                    'name': bookmaker['title'],
-                    'home_win': {'decimal': None, 'american': None},
-                    'away_win': {'decimal': None, 'american': None},
-                    'draw': {'decimal': None, 'american': None}
-                }
-
-                # Find the h2h market
-                h2h_market = next((market for market in bookmaker['markets'] if market['key'] == 'h2h'), None)
-                if h2h_market and 'outcomes' in h2h_market:
-                    for outcome in h2h_market['outcomes']:
-                        outcome_name = outcome['name'].lower()
-                        decimal_price = outcome['price']
-                        american_price = self.convert_to_american_odds(decimal_price)
-                        
-                        if outcome_name == event_home_team:
-                            bookmaker_odds['home_win'] = {'decimal': decimal_price, 'american': american_price}
-                        elif outcome_name == event_away_team:
-                            bookmaker_odds['away_win'] = {'decimal': decimal_price, 'american': american_price}
-                        elif outcome_name == 'draw':
-                            bookmaker_odds['draw'] = {'decimal': decimal_price, 'american': american_price}
-
-                # Only add bookmaker if it has all three outcomes
-                if all(bookmaker_odds[key]['decimal'] is not None for key in ['home_win', 'away_win', 'draw']):
-                    odds_structure['bookmakers'].append(bookmaker_odds)
-                    
-                    # Update best odds
-                    if bookmaker_odds['home_win']['decimal'] > odds_structure['best_odds']['home_win']['decimal']:
-                        odds_structure['best_odds']['home_win'] = {
-                            'decimal': bookmaker_odds['home_win']['decimal'],
-                            'american': bookmaker_odds['home_win']['american'],
-                            'bookmaker': bookmaker['title']
-                        }
-                    
-                    if bookmaker_odds['away_win']['decimal'] > odds_structure['best_odds']['away_win']['decimal']:
-                        odds_structure['best_odds']['away_win'] = {
-                            'decimal': bookmaker_odds['away_win']['decimal'],
-                            'american': bookmaker_odds['away_win']['american'],
-                            'bookmaker': bookmaker['title']
-                        }
-                    
-                    if bookmaker_odds['draw']['decimal'] > odds_structure['best_odds']['draw']['decimal']:
-                        odds_structure['best_odds']['draw'] = {
-                            'decimal': bookmaker_odds['draw']['decimal'],
-                            'american': bookmaker_odds['draw']['american'],
-                            'bookmaker': bookmaker['title']
-                        }
-
-            # Calculate arbitrage opportunity
-            home_odds = odds_structure['best_odds']['home_win']['decimal']
-            away_odds = odds_structure['best_odds']['away_win']['decimal']
-            
-            # Calculate implied probabilities
-            home_prob = 1 / home_odds
-            away_prob = 1 / away_odds
-            
-            # Sum of probabilities
-            total_prob = home_prob + away_prob
-            
-            # If total probability is less than 1, there's an arbitrage opportunity
-            if total_prob < 1:
-                # Calculate stakes for $1000 total bet
-                total_bankroll = 1000
-                arb_sum = total_prob
-                
-                home_stake = round((total_bankroll * home_prob) / arb_sum, 2)
-                away_stake = round((total_bankroll * away_prob) / arb_sum, 2)
-                
-                # Calculate potential profit
-                home_profit = round(home_stake * home_odds - total_bankroll, 2)
-                away_profit = round(away_stake * away_odds - total_bankroll, 2)
-                
-                odds_structure['arbitrage'] = {
-                    'exists': True,
-                    'home_stake': home_stake,
-                    'away_stake': away_stake,
-                    'home_profit': home_profit,
-                    'away_profit': away_profit,
-                    'home_bookmaker': odds_structure['best_odds']['home_win']['bookmaker'],
-                    'away_bookmaker': odds_structure['best_odds']['away_win']['bookmaker']
-                }
-            else:
-                odds_structure['arbitrage'] = {
-                    'exists': False,
-                    'total_probability': round(total_prob * 100, 2)
-                }
-
-            return odds_structure
+            return summarize_odds(parse_h2h_bookmakers(odds_data))
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching odds: {str(e)}")
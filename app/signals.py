@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .competitions import competition_named
+from .fixture_weeks import rebuild_fixture_weeks, rebuild_weeks_for_matches, rebuild_weeks_for_teams
+from .models import FeedStatus, LeagueTable, Match, MatchOdds, Team, TeamAlias
+from .teams import clear_unresolved, invalidate_team_resolver
+
+
+def bump_feed_version(competition, feed):
+    """Invalidate cached pages built from one competition's feed
+
+    Ingestion bumps versions itself when it applies a new payload; this covers
+    row-level edits made elsewhere (admin, shell, management commands).
+    """
+    name = competition_named(competition).feed_name(feed)
+    FeedStatus.objects.filter(name=name).update(version=F('version') + 1)
+
+
+# Read models are rebuilt on commit of the sender's transaction: the rebuild goes
+# through the writer connection, which can neither see the sender's uncommitted rows
+# nor take the SQLite write lock it still holds. Outside a transaction it runs at once.
+
+
+@receiver(pre_save, sender=Match)
+def match_saving(sender, instance, raw=False, using=None, **kwargs):
+    # The week the match is leaving also has to drop it
+    instance._previous_week = None
+    if instance.pk and not raw:
+        instance._previous_week = Match.objects.using(using).filter(
+            pk=instance.pk
+        ).values_list('competition', 'matchweek').first()
+
+
+@receiver([post_save, post_delete], sender=Match)
+def match_changed(sender, instance, using, **kwargs):
+    weeks = {(instance.competition, instance.matchweek)}
+    previous = getattr(instance, '_previous_week', None)
+    if previous:
+        weeks.add(previous)
+    transaction.on_commit(lambda: rebuild_weeks_for_matches(weeks), using=using)
+    bump_feed_version(instance.competition, 'matches')
+    if previous and previous[0] != instance.competition:
+        bump_feed_version(previous[0], 'matches')
+
+
+@receiver([post_save, post_delete], sender=LeagueTable)
+def standing_changed(sender, instance, **kwargs):
+    bump_feed_version(instance.competition, 'league_table')
+
+
+@receiver([post_save, post_delete], sender=MatchOdds)
+def match_odds_changed(sender, instance, using, **kwargs):
+    match = Match.objects.using(using).filter(
+        id=instance.match_id
+    ).only('competition', 'matchweek').first()
+    if match is not None:
+        transaction.on_commit(
+            lambda: rebuild_fixture_weeks(match.competition, [match.matchweek]), using=using
+        )
+        bump_feed_version(match.competition, 'odds')
+
+
+@receiver([post_save, post_delete], sender=Team)
+def team_changed(sender, instance, using, **kwargs):
+    invalidate_team_resolver()
+    if kwargs.get('signal') is post_save:
+        transaction.on_commit(lambda: rebuild_weeks_for_teams([instance.id]), using=using)
+
+
+@receiver([post_save, post_delete], sender=TeamAlias)
+def team_alias_changed(sender, instance, **kwargs):
+    invalidate_team_resolver()
+    if kwargs.get('created'):
+        clear_unresolved([(instance.provider, instance.normalized_name)])
@@ -0,0 +1,102 @@
+import codecs
+import json
+from itertools import islice
+
+# Bytes read from an upstream body at a time
+CHUNK_SIZE = 64 * 1024
+
+
+def decode_chunks(chunks, encoding='utf-8'):
+    """Decode an iterable of byte chunks to text, even when a character spans two chunks"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def iter_json_array(chunks, key):
+    """Yield the items of the top-level array under key in a streamed JSON object
+
+    chunks is an iterable of text. Only the text before the array is scanned
+    character by character; each item is then decoded on its own as soon as it has
+    fully arrived, so the whole body is never held in memory. Items must be objects
+    or arrays, whose end is unambiguous. Yields nothing if the key is absent.
+    """
+    chunks = iter(chunks)
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+
+    def more(keep):
+        """Read the next chunk, discarding the buffer before index keep"""
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer = buffer[keep:] + chunk
+        pos -= keep
+        return True
+
+    # Find '"key": [' at depth 1, skipping strings so nested or quoted text can't match
+    depth, in_string, escaped, string_start, last_string = 0, False, False, 0, None
+    while True:
+        if pos >= len(buffer):
+            # An open string stays buffered so it can be read whole once closed
+            keep = string_start if in_string else pos
+            if not more(keep):
+                return
+            string_start -= keep
+            continue
+        char = buffer[pos]
+        pos += 1
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+                last_string = buffer[string_start:pos]
+        elif char == '"':
+            in_string, string_start = True, pos - 1
+        elif char in '{[':
+            if depth == 1 and char == '[' and last_string == json.dumps(key):
+                break
+            depth += 1
+            last_string = None
+        elif char in '}]':
+            depth -= 1
+            if depth <= 0:
+                return
+        elif char == ',':
+            last_string = None
+
+    while True:
+        # Skip separators up to the next item or the end of the array
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) or not more(pos):
+                break
+        if pos >= len(buffer) or buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The item hasn't fully arrived yet
+            if not more(pos):
+                raise
+            continue
+        pos = end
+        yield item
+
+
+def chunked(items, size):
+    """Consecutive lists of up to size items from an iterable, read lazily"""
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
@@ -0,0 +1,234 @@
+import difflib
+import logging
+import re
+import threading
+import unicodedata
+
+from django.db import transaction
+from django.utils import timezone
+
+from .db import WRITER, writes
+from .models import Team, TeamAlias, UnresolvedTeamName
+
+logger = logging.getLogger(__name__)
+
+# Tokens that carry no identity, e.g. "Arsenal FC" vs "Arsenal", "RC Celta de Vigo" vs "Celta Vigo"
+NOISE_TOKENS = {
+    'fc', 'afc', 'cf', 'sc', 'ssc', 'ss', 'ac', 'as', 'us', 'cd', 'ud', 'sd', 'ca', 'rc', 'rcd',
+    'club', 'de', 'futbol', 'balompie',
+}
+
+# Spellings that differ between providers only by abbreviation or language
+TOKEN_REWRITES = {
+    'utd': 'united',
+    'nottm': 'nottingham',
+    'munchen': 'munich',
+}
+
+# Provider names that normalization alone can't map, as {provider: {name: football-data.org name}}.
+# TeamAlias rows marked manual (added in the admin) take precedence over these.
+KNOWN_ALIASES = {
+    'odds_api': {
+        'Athletic Bilbao': 'Athletic Club',
+        'Alavés': 'Deportivo Alavés',
+        'Espanyol': 'RCD Espanyol de Barcelona',
+        'Rayo Vallecano': 'Rayo Vallecano de Madrid',
+        'Inter Milan': 'FC Internazionale Milano',
+    },
+}
+
+# Index value for a key that more than one team normalizes to
+AMBIGUOUS = object()
+
+
+def normalize_team_name(name):
+    """Reduce a team name to a key that is stable across providers"""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    name = name.lower().replace('&', ' and ').replace("'", '')
+    tokens = re.sub(r'[^a-z0-9 ]+', ' ', name).split()
+    # Founding years and numbers ("1. FC Köln", "Bayer 04 Leverkusen") are dropped too
+    return ' '.join(
+        TOKEN_REWRITES.get(token, token) for token in tokens
+        if token not in NOISE_TOKENS and not token.isdigit()
+    )
+
+
+class TeamResolver:
+    """Maps provider team names to Team ids in O(1) through a prebuilt dictionary index
+
+    The index holds every team's normalized football-data.org name, the built-in
+    KNOWN_ALIASES and the persisted TeamAlias rows, manual ones last so they win.
+    Provider names that match a team's normalized name are learned as aliases.
+    Names that resolve to nothing are collected in self.unresolved and reported by
+    flush(), never silently dropped.
+
+    One resolver is shared by every competition's ingestor thread, so the index and
+    the learned/unresolved maps are only touched under self.lock.
+    """
+
+    def __init__(self):
+        # Guards the index and maps only; database queries always run outside it
+        self.lock = threading.Lock()
+        self.learned = {}
+        self.unresolved = {}
+        # Set when teams or aliases changed; the index is rebuilt before its next use
+        self.dirty = False
+        self.load()
+
+    def load(self, reloaded=False):
+        """Build a fresh index from the database and swap it in"""
+        # Cleared before the build, so an invalidate() that lands mid-build isn't lost
+        self.dirty = False
+        index = {}
+        for team_id, name in Team.objects.values_list('id', 'name'):
+            key = ('football_data', normalize_team_name(name))
+            index[key] = AMBIGUOUS if index.get(key, team_id) != team_id else team_id
+        for provider, names in KNOWN_ALIASES.items():
+            for name, canonical in names.items():
+                team_id = index.get(('football_data', normalize_team_name(canonical)))
+                if team_id is not None and team_id is not AMBIGUOUS:
+                    index[(provider, normalize_team_name(name))] = team_id
+        for provider, key, team_id in TeamAlias.objects.order_by('manual').values_list(
+            'provider', 'normalized_name', 'team_id'
+        ):
+            index[(provider, key)] = team_id
+        with self.lock:
+            self.index = index
+            # A miss may be a team bulk-created since the build (no signal fires for those)
+            self.reloaded = reloaded
+
+    def lookup(self, provider, name):
+        """Team id for a name from the index alone, or None; never touches the database"""
+        key = normalize_team_name(name)
+        with self.lock:
+            team_id = self.index.get((provider, key))
+            if team_id is None and provider != 'football_data':
+                team_id = self.index.get(('football_data', key))
+                if team_id is not None and team_id is not AMBIGUOUS:
+                    self.learned[(provider, key)] = (name, team_id)
+                    self.index[(provider, key)] = team_id
+        return None if team_id is AMBIGUOUS else team_id
+
+    def resolve(self, provider, name):
+        """Return the Team id for a provider's team name, or None if it is unknown
+
+        The first miss after a flush reloads the index, since teams are bulk-created
+        without signals; names that still don't resolve are recorded for flush() to report.
+        """
+        if self.dirty:
+            self.load()
+        team_id = self.lookup(provider, name)
+        if team_id is None and self.claim_reload():
+            self.load(reloaded=True)
+            team_id = self.lookup(provider, name)
+        if team_id is None:
+            key = normalize_team_name(name)
+            with self.lock:
+                first = (provider, key) not in self.unresolved
+                ambiguous = self.index.get(('football_data', key)) is AMBIGUOUS
+                self.unresolved[(provider, key)] = name
+            if first:
+                reason = 'ambiguous' if ambiguous else 'unknown'
+                logger.warning(f"Could not resolve {provider} team name ({reason}): {name}")
+        return team_id
+
+    def claim_reload(self):
+        """True for the one caller that should reload after a miss; other threads skip it"""
+        with self.lock:
+            if self.reloaded:
+                return False
+            self.reloaded = True
+            return True
+
+    @writes
+    def flush(self):
+        """Persist learned aliases and report unresolved names; returns the unresolved names"""
+        with self.lock:
+            learned, self.learned = self.learned, {}
+            unresolved, self.unresolved = self.unresolved, {}
+            self.reloaded = False
+        if not learned and not unresolved:
+            return []
+
+        with transaction.atomic(using=WRITER):
+            if learned:
+                TeamAlias.objects.bulk_create(
+                    [
+                        TeamAlias(provider=provider, normalized_name=key, name=name, team_id=team_id)
+                        for (provider, key), (name, team_id) in learned.items()
+                    ],
+                    ignore_conflicts=True,
+                )
+                clear_unresolved(learned)
+            if unresolved:
+                report_unresolved(unresolved, self.suggest)
+        return list(unresolved.values())
+
+    def suggest(self, key):
+        """Closest known team to a normalized name, for the unresolved report"""
+        with self.lock:
+            items = list(self.index.items())
+        known = {k: team_id for (provider, k), team_id in items
+                 if provider == 'football_data' and team_id is not AMBIGUOUS}
+        close = difflib.get_close_matches(key, list(known), n=1, cutoff=0.6)
+        return known[close[0]] if close else None
+
+    def invalidate(self):
+        """Rebuild the index before its next use, e.g. after teams or aliases change"""
+        self.dirty = True
+
+
+def clear_unresolved(keys):
+    """Forget unresolved reports for (provider, normalized_name) keys that now resolve"""
+    by_provider = {}
+    for provider, key in keys:
+        by_provider.setdefault(provider, []).append(key)
+    for provider, names in by_provider.items():
+        UnresolvedTeamName.objects.filter(provider=provider, normalized_name__in=names).delete()
+
+
+def report_unresolved(unresolved, suggest):
+    """Record {(provider, normalized_name): name} misses, counting repeat sightings"""
+    now = timezone.now()
+    existing = {}
+    for provider in {provider for provider, _ in unresolved}:
+        for row in UnresolvedTeamName.objects.filter(
+            provider=provider,
+            normalized_name__in=[key for p, key in unresolved if p == provider],
+        ):
+            existing[(row.provider, row.normalized_name)] = row
+
+    created = []
+    for (provider, key), name in unresolved.items():
+        row = existing.get((provider, key))
+        if row is None:
+            created.append(UnresolvedTeamName(
+                provider=provider, normalized_name=key, name=name,
+                suggestion_id=suggest(key), last_seen=now,
+            ))
+        else:
+            row.name = name
+            row.occurrences += 1
+            row.last_seen = now
+    if created:
+        UnresolvedTeamName.objects.bulk_create(created, ignore_conflicts=True)
+    if existing:
+        UnresolvedTeamName.objects.bulk_update(existing.values(), ['name', 'occurrences', 'last_seen'])
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_team_resolver():
+    """Return the process-wide TeamResolver, building its index on first use"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = TeamResolver()
+        return _resolver
+
+
+def invalidate_team_resolver():
+    if _resolver is not None:
+        _resolver.invalidate()
@@ -1,3 +1,605 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
-# Create your tests here.
+import numpy as np
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TransactionTestCase
+from django.utils import timezone
+
+from .arbitrage import three_way_arbitrage
+from .backfill import SeasonBackfill
+from .competitions import COMPETITIONS
+from .db import READER, WRITER, use_writer
+from .db.router import DatabaseRouter
+from .http_client import ApiClient, RateLimitExceeded
+from .market import overround, proportional_probabilities, shin_probabilities
+from .models import (
+    BackfillProgress, BookmakerOdds, FeedStatus, LeagueTable, Match, MatchOdds, OddsSnapshot, Team,
+)
+from .odds import parse_h2h_bookmakers
+from .odds_history import largest_move
+from .scheduling import FixtureScheduler
+from .services import FootballDataService
+from .streaming import decode_chunks, iter_json_array
+from .views import decode_cursor, encode_cursor
+
+
+class WriterTestCase(TransactionTestCase):
+    """Base for tests that write through ingestion and read back like a page does
+
+    Writes go through the writer connection and reads through the reader, two
+    connections to the one test database. TestCase would hold each in its own open
+    transaction and lock the other out, so these tests commit as they go.
+    """
+    databases = '__all__'
+
+
+def kickoff(days=1):
+    """football-data.org utcDate for a kickoff some days from now"""
+    return (timezone.now() + timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def match_payload(external_id, home, away, utc_date=None, status='TIMED', matchday=1, score=(None, None)):
+    """One match as football-data.org's /matches returns it"""
+    return {
+        'id': external_id,
+        'utcDate': utc_date or kickoff(),
+        'status': status,
+        'matchday': matchday,
+        'venue': 'Stadium',
+        'season': {'startDate': '2025-08-15'},
+        'homeTeam': {'name': home, 'crest': None},
+        'awayTeam': {'name': away, 'crest': None},
+        'score': {'fullTime': {'home': score[0], 'away': score[1]}},
+    }
+
+
+class UpsertMatchesTests(WriterTestCase):
+    def setUp(self):
+        self.service = FootballDataService('PL')
+        self.matches = [
+            match_payload(1, 'Arsenal FC', 'Chelsea FC'),
+            match_payload(2, 'Everton FC', 'Fulham FC', matchday=2),
+        ]
+
+    def version(self):
+        return FeedStatus.objects.get(name=COMPETITIONS['PL'].feed_name('matches')).version
+
+    def test_updates_in_place_on_external_id(self):
+        self.service.upsert_matches(self.matches)
+        ids = dict(Match.objects.values_list('external_id', 'id'))
+
+        finished = match_payload(1, 'Arsenal FC', 'Chelsea FC', status='FINISHED', score=(2, 1))
+        self.service.upsert_matches([finished, self.matches[1]])
+
+        self.assertEqual(dict(Match.objects.values_list('external_id', 'id')), ids)
+        match = Match.objects.get(external_id=1)
+        self.assertEqual((match.status, match.home_score, match.away_score), ('finished', 2, 1))
+        self.assertEqual(match.home_team.name, 'Arsenal FC')
+
+    def test_unchanged_payload_is_not_written(self):
+        self.service.upsert_matches(self.matches)
+        version = self.version()
+        # Only a write from the payload would undo this
+        Match.objects.filter(external_id=1).update(venue='Edited')
+
+        self.assertEqual(self.service.upsert_matches(self.matches), 2)
+
+        self.assertEqual(Match.objects.get(external_id=1).venue, 'Edited')
+        self.assertEqual(self.version(), version)
+
+
+def standing_payload(position, team, points):
+    """One row of a football-data.org standings table"""
+    return {
+        'position': position, 'team': {'name': team, 'crest': None}, 'playedGames': 10,
+        'won': points // 3, 'draw': points % 3, 'lost': 10 - points // 3 - points % 3,
+        'points': points, 'goalsFor': 15, 'goalsAgainst': 10, 'goalDifference': 5,
+    }
+
+
+class LeagueTableSyncTests(WriterTestCase):
+    def setUp(self):
+        self.service = FootballDataService('PL')
+        self.table = [
+            standing_payload(1, 'Liverpool FC', 25),
+            standing_payload(2, 'Arsenal FC', 22),
+            standing_payload(3, 'Chelsea FC', 19),
+        ]
+
+    def points(self):
+        return dict(LeagueTable.objects.values_list('team__name', 'points'))
+
+    def test_unchanged_table_is_not_written(self):
+        version = self.service.sync_league_table(self.table)
+        LeagueTable.objects.filter(team__name='Chelsea FC').update(points=0)
+
+        self.assertEqual(self.service.sync_league_table(self.table), version)
+        self.assertEqual(self.points()['Chelsea FC'], 0)
+
+    def test_changed_rows_are_updated_and_departed_teams_dropped(self):
+        version = self.service.sync_league_table(self.table)
+        table = [
+            standing_payload(1, 'Arsenal FC', 28),
+            standing_payload(2, 'Liverpool FC', 26),
+            standing_payload(3, 'Brentford FC', 20),
+        ]
+
+        self.assertEqual(self.service.sync_league_table(table), version + 1)
+        self.assertEqual(self.points(), {'Arsenal FC': 28, 'Liverpool FC': 26, 'Brentford FC': 20})
+
+
+class StubResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class StubSession:
+    """Answers each GET with the next of the given responses"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        return self.responses.pop(0)
+
+
+class ApiClientRetryTests(SimpleTestCase):
+    def api_client(self, *responses):
+        return ApiClient('test', StubSession(*responses), rate_per_minute=600, max_wait=5)
+
+    def test_retries_after_short_retry_after(self):
+        response = self.api_client(StubResponse(429, {'Retry-After': '0'}), StubResponse(200)).get('/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_retry_after_beyond_max_wait_raises(self):
+        limited = StubResponse(429, {'Retry-After': '3600'})
+        with self.assertRaises(RateLimitExceeded) as raised:
+            self.api_client(limited, StubResponse(200)).get('/')
+        # The caller still gets the response, and with it the Retry-After header
+        self.assertIs(raised.exception.response, limited)
+        self.assertTrue(limited.closed)
+
+
+def odds_event(event_id, match, prices):
+    """An Odds API event for a stored match, priced {bookmaker_key: (home, draw, away)}"""
+    home, away = match.home_team.name, match.away_team.name
+    return {
+        'id': event_id,
+        'commence_time': match.match_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'home_team': home,
+        'away_team': away,
+        'bookmakers': [
+            {
+                'key': key,
+                'title': key.title(),
+                'last_update': '2025-08-10T10:00:00Z',
+                'markets': [{'key': 'h2h', 'outcomes': [
+                    {'name': home, 'price': home_win},
+                    {'name': 'Draw', 'price': draw},
+                    {'name': away, 'price': away_win},
+                ]}],
+            }
+            for key, (home_win, draw, away_win) in prices.items()
+        ],
+    }
+
+
+class StoreOddsTests(WriterTestCase):
+    def setUp(self):
+        self.service = FootballDataService('PL')
+        arsenal, chelsea, everton = (
+            Team.objects.create(name=name) for name in ('Arsenal FC', 'Chelsea FC', 'Everton FC')
+        )
+        # Stored event ids, so the events are matched without going through the resolver
+        self.first = Match.objects.create(
+            home_team=arsenal, away_team=chelsea, external_id=1, odds_api_id='e1',
+            match_date=timezone.now() + timedelta(days=1),
+        )
+        self.second = Match.objects.create(
+            home_team=everton, away_team=arsenal, external_id=2, odds_api_id='e2',
+            match_date=timezone.now() + timedelta(days=2), matchweek=2,
+        )
+
+    def quotes(self, match):
+        return dict(BookmakerOdds.objects.filter(match=match).values_list('bookmaker_key', 'home_win_odds'))
+
+    def test_withdrawn_bookmaker_is_dropped(self):
+        self.service.store_odds([odds_event('e1', self.first, {'dk': (2.0, 3.4, 4.0), 'fd': (2.1, 3.3, 3.9)})])
+        self.service.store_odds([odds_event('e1', self.first, {'dk': (2.0, 3.4, 4.0)})])
+
+        self.assertEqual(list(self.quotes(self.first)), ['dk'])
+        self.assertEqual(MatchOdds.objects.get(match=self.first).home_win_odds, Decimal('2.00'))
+
+    def test_only_moved_prices_are_snapshotted(self):
+        self.service.store_odds([odds_event('e1', self.first, {'dk': (2.0, 3.4, 4.0)})])
+        self.service.store_odds([odds_event('e1', self.first, {'dk': (2.1, 3.4, 4.0)})])
+
+        snapshots = list(OddsSnapshot.objects.order_by('captured_at', 'outcome').values_list('outcome', 'price_ticks'))
+        self.assertEqual(snapshots, [('away_win', 400), ('draw', 340), ('home_win', 200), ('home_win', 210)])
+
+    def test_match_missing_from_board_loses_its_quotes(self):
+        self.service.store_odds([
+            odds_event('e1', self.first, {'dk': (2.0, 3.4, 4.0)}),
+            odds_event('e2', self.second, {'dk': (1.8, 3.6, 4.5)}),
+        ])
+        self.service.store_odds([odds_event('e1', self.first, {'dk': (2.0, 3.4, 4.0)})])
+
+        self.assertEqual(self.quotes(self.second), {})
+        self.assertFalse(MatchOdds.objects.filter(match=self.second).exists())
+        self.assertTrue(MatchOdds.objects.filter(match=self.first).exists())
+        # The history of its prices stays
+        self.assertEqual(OddsSnapshot.objects.filter(match=self.second).count(), 3)
+
+
+class LargestMoveTests(WriterTestCase):
+    def setUp(self):
+        arsenal, chelsea = Team.objects.create(name='Arsenal FC'), Team.objects.create(name='Chelsea FC')
+        self.match = Match.objects.create(
+            home_team=arsenal, away_team=chelsea, match_date=datetime(2025, 3, 1, 15, tzinfo=dt_timezone.utc),
+        )
+        for day, ticks, key in [(1, 200, 'dk'), (2, 300, 'dk'), (10, 210, 'fd'), (11, 250, 'fd')]:
+            OddsSnapshot.objects.create(
+                match=self.match, bookmaker_key=key, outcome='home_win', price_ticks=ticks,
+                captured_at=datetime(2025, 2, day, tzinfo=dt_timezone.utc),
+            )
+
+    def history(self, query=''):
+        return Client().get(f"/api/matches/{self.match.id}/odds-history/{query}")
+
+    def test_largest_move_over_all_history(self):
+        move = largest_move(self.match)
+        self.assertEqual((move['bookmaker_key'], move['from_price'], move['to_price']), ('dk', 2.0, 3.0))
+
+    def test_window_limits_the_move(self):
+        move = self.history('?from=2025-02-05').json()['largest_move']
+        self.assertEqual((move['bookmaker_key'], move['move']), ('fd', 0.4))
+        # to is inclusive: the fd move on the 11th falls outside a window ending on the 10th
+        self.assertIsNone(self.history('?from=2025-02-05&to=2025-02-10').json()['largest_move'])
+
+    def test_invalid_date_is_rejected(self):
+        response = self.history('?to=yesterday')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('to must be a date', response.json()['error'])
+
+
+class ThreeWayArbitrageTests(SimpleTestCase):
+    def test_finds_arbitrage_and_equalizes_payouts(self):
+        best = [[2.2, 3.8, 4.5]]
+        result = three_way_arbitrage(best, bankroll=1000.0)
+        total = 1 / 2.2 + 1 / 3.8 + 1 / 4.5
+        self.assertTrue(result['is_arbitrage'][0])
+        self.assertAlmostEqual(result['total_probability'][0], total)
+        self.assertAlmostEqual(result['stakes'][0].sum(), 1000.0)
+        np.testing.assert_allclose(result['stakes'][0] * best[0], 1000.0 / total)
+        self.assertAlmostEqual(result['profit'][0], 1000.0 / total - 1000.0)
+        self.assertAlmostEqual(result['profit_pct'][0], (1 / total - 1) * 100)
+
+    def test_board_with_margin_is_not_arbitrage(self):
+        result = three_way_arbitrage([[1.9, 3.4, 4.0]])
+        self.assertFalse(result['is_arbitrage'][0])
+        self.assertTrue(result['complete'][0])
+        self.assertLess(result['profit'][0], 0.0)
+
+    def test_missing_outcome_is_skipped(self):
+        result = three_way_arbitrage([[5.0, 0.0, 5.0], [2.2, 3.8, 4.5]])
+        np.testing.assert_array_equal(result['complete'], [False, True])
+        np.testing.assert_array_equal(result['is_arbitrage'], [False, True])
+        self.assertTrue(np.isnan(result['total_probability'][0]))
+        self.assertEqual(result['profit'][0], 0.0)
+        np.testing.assert_array_equal(result['stakes'][0], [0.0, 0.0, 0.0])
+
+
+class ParseH2HBookmakersTests(SimpleTestCase):
+    def event(self, prices):
+        return {
+            'home_team': 'Arsenal',
+            'away_team': 'Chelsea',
+            'bookmakers': [
+                {'key': key, 'title': key, 'markets': [{'key': 'h2h', 'outcomes': [
+                    {'name': 'Arsenal', 'price': home},
+                    {'name': 'Chelsea', 'price': 3.0},
+                    {'name': 'Draw', 'price': 3.2},
+                ]}]}
+                for key, home in prices.items()
+            ],
+        }
+
+    def test_prices_of_one_or_less_are_dropped(self):
+        bookmakers = parse_h2h_bookmakers(self.event({'even': 1.0, 'good': 2.1, 'broken': 0.5}))
+        self.assertEqual([bookmaker['key'] for bookmaker in bookmakers], ['good'])
+        self.assertEqual(bookmakers[0]['home_win'], 2.1)
+
+
+class CursorTests(SimpleTestCase):
+    fixture = {'id': 42, 'kickoff_at': datetime(2025, 8, 16, 14, 0, tzinfo=dt_timezone.utc)}
+
+    def test_round_trip(self):
+        self.assertEqual(
+            decode_cursor(encode_cursor(self.fixture)), (self.fixture['kickoff_at'], 42)
+        )
+
+    def test_cursor_is_url_safe(self):
+        self.assertRegex(encode_cursor(self.fixture), r'^[A-Za-z0-9_-]+$')
+
+    def test_rejects_tampered_cursors(self):
+        cursor = encode_cursor(self.fixture)
+        tampered = [
+            '',
+            'not-a-cursor',
+            cursor[:-3],
+            cursor[:5] + ('A' if cursor[5] != 'A' else 'B') + cursor[6:],
+            cursor + 'fA',
+            '_' * 8,
+        ]
+        for value in tampered:
+            with self.subTest(cursor=value):
+                with self.assertRaises(ValueError):
+                    decode_cursor(value)
+
+    def test_rejects_naive_kickoff(self):
+        cursor = base64.urlsafe_b64encode(b'2025-01-01T00:00:00|5').decode().rstrip('=')
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor)
+
+
+class MatchesApiETagTests(WriterTestCase):
+    def setUp(self):
+        self.service = FootballDataService('PL')
+        self.service.upsert_matches([match_payload(1, 'Arsenal FC', 'Chelsea FC')])
+
+    def test_unchanged_data_answers_304(self):
+        etag = Client().get('/api/matches/')['ETag']
+        response = Client().get('/api/matches/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_ingested_change_answers_200(self):
+        first = Client().get('/api/matches/')
+        self.service.upsert_matches([match_payload(1, 'Arsenal FC', 'Chelsea FC', utc_date=kickoff(days=3))])
+
+        response = Client().get('/api/matches/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertNotEqual(
+            response.json()['matches'][0]['match_date'], first.json()['matches'][0]['match_date']
+        )
+
+
+class PageCacheTests(WriterTestCase):
+    path = '/competitions/PL/table/'
+
+    def setUp(self):
+        cache.clear()
+        self.service = FootballDataService('PL')
+        self.service.sync_league_table([standing_payload(1, 'Liverpool FC', 25)])
+
+    def test_anonymous_page_is_served_from_cache(self):
+        self.assertEqual(Client().get(self.path)['X-Page-Cache'], 'miss')
+        self.assertEqual(Client().get(self.path)['X-Page-Cache'], 'hit')
+
+    def test_ingested_change_replaces_cached_page(self):
+        Client().get(self.path)
+        self.service.sync_league_table([standing_payload(1, 'Liverpool FC', 28)])
+
+        response = Client().get(self.path)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, '28')
+
+    def test_signed_in_users_bypass_the_page_cache(self):
+        client = Client()
+        client.force_login(User.objects.create(username='member'))
+        self.assertNotIn('X-Page-Cache', client.get(self.path))
+
+
+class DatabaseRouterTests(SimpleTestCase):
+    router = DatabaseRouter()
+
+    def test_app_reads_use_reader(self):
+        self.assertEqual(self.router.db_for_read(Match), READER)
+
+    def test_app_writes_outside_ingestion_use_default(self):
+        self.assertEqual(self.router.db_for_write(Match), 'default')
+
+    def test_use_writer_routes_reads_and_writes_to_writer(self):
+        with use_writer():
+            self.assertEqual(self.router.db_for_read(Match), WRITER)
+            self.assertEqual(self.router.db_for_write(Match), WRITER)
+        self.assertEqual(self.router.db_for_read(Match), READER)
+
+    def test_other_apps_are_left_to_default(self):
+        with use_writer():
+            self.assertIsNone(self.router.db_for_read(User))
+            self.assertIsNone(self.router.db_for_write(User))
+
+    def test_migrations_only_run_on_default(self):
+        self.assertTrue(self.router.allow_migrate('default', 'app'))
+        self.assertFalse(self.router.allow_migrate(WRITER, 'app'))
+        self.assertFalse(self.router.allow_migrate(READER, 'app'))
+
+
+class FixtureSchedulerTests(WriterTestCase):
+    intervals = {'live': 30, 'kickoff': 120, 'today': 1800, 'week': 21600, 'far': 86400}
+
+    def setUp(self):
+        self.scheduler = FixtureScheduler(COMPETITIONS['PL'], intervals=self.intervals)
+        self.now = timezone.now()
+
+    def interval(self, status, hours_from_kickoff):
+        return self.scheduler.poll_interval(status, self.now - timedelta(hours=hours_from_kickoff), self.now)
+
+    def test_intervals_tighten_towards_kickoff(self):
+        self.assertEqual(self.interval('scheduled', -200), 86400)
+        self.assertEqual(self.interval('scheduled', -12), 1800)
+        self.assertEqual(self.interval('scheduled', -0.5), 120)
+        self.assertEqual(self.interval('live', 1), 30)
+
+    def test_unfinished_fixture_is_polled_less_often_after_the_grace_window(self):
+        self.assertEqual(self.interval('scheduled', 2), 30)
+        self.assertEqual(self.interval('live', 5), 1800)
+        self.assertEqual(self.interval('scheduled', 48), 86400)
+        self.assertIsNone(self.interval('finished', 48))
+
+    def test_overrunning_fixture_stays_due(self):
+        FootballDataService('PL').upsert_matches([
+            match_payload(1, 'Arsenal FC', 'Chelsea FC', utc_date=kickoff(days=-2)),
+            match_payload(2, 'Everton FC', 'Fulham FC', utc_date=kickoff(days=-2), status='FINISHED'),
+        ])
+        self.assertEqual(self.scheduler.due(), [1])
+
+
+class OverroundTests(SimpleTestCase):
+    def test_fair_book_has_no_margin(self):
+        self.assertAlmostEqual(overround([2.0, 4.0, 4.0]), 0.0)
+
+    def test_margin_is_sum_of_implied_probabilities_above_one(self):
+        self.assertAlmostEqual(overround([1.9, 3.5, 4.2]), 1 / 1.9 + 1 / 3.5 + 1 / 4.2 - 1)
+
+    def test_book_missing_a_quote_has_no_margin(self):
+        self.assertTrue(np.isnan(overround([1.9, np.nan, 4.2])))
+
+    def test_proportional_probabilities_sum_to_one(self):
+        probabilities = proportional_probabilities([1.9, 3.5, 4.2])
+        self.assertAlmostEqual(probabilities.sum(), 1.0)
+        np.testing.assert_allclose(probabilities / probabilities[0], [1, 1.9 / 3.5, 1.9 / 4.2])
+
+
+class ShinProbabilityTests(SimpleTestCase):
+    prices = [1.5, 4.2, 7.0]
+
+    def test_probabilities_sum_to_one(self):
+        probabilities, z = shin_probabilities(self.prices)
+        self.assertAlmostEqual(probabilities.sum(), 1.0)
+        self.assertGreater(z, 0.0)
+
+    def test_z_solves_shin_equation(self):
+        # At the fixed point the unnormalized Shin probabilities already sum to 1
+        _, z = shin_probabilities(self.prices)
+        implied = 1 / np.array(self.prices)
+        booksum = implied.sum()
+        raw = (np.sqrt(z ** 2 + 4 * (1 - z) * implied ** 2 / booksum) - z) / (2 * (1 - z))
+        self.assertAlmostEqual(raw.sum(), 1.0, places=6)
+
+    def test_takes_more_margin_off_longshots(self):
+        shin, _ = shin_probabilities(self.prices)
+        proportional = proportional_probabilities(self.prices)
+        self.assertGreater(shin[0], proportional[0])
+        self.assertLess(shin[2], proportional[2])
+
+    def test_book_without_margin_is_normalized_proportionally(self):
+        probabilities, z = shin_probabilities([2.0, 4.0, 5.0])
+        np.testing.assert_allclose(probabilities, np.array([0.5, 0.25, 0.2]) / 0.95)
+        self.assertEqual(z, 0.0)
+
+    def test_whole_board_at_once(self):
+        board = np.array([
+            [[1.5, 4.2, 7.0], [1.55, 4.0, 6.5]],
+            [[2.6, 3.2, 2.9], [2.0, 4.0, 4.0]],
+        ])
+        probabilities, z = shin_probabilities(board)
+        self.assertEqual(probabilities.shape, board.shape)
+        self.assertEqual(z.shape, (2, 2))
+        np.testing.assert_allclose(probabilities.sum(axis=-1), np.ones((2, 2)))
+        single, single_z = shin_probabilities(board[1, 0])
+        np.testing.assert_allclose(probabilities[1, 0], single)
+        self.assertAlmostEqual(z[1, 0], single_z)
+
+
+def split_every(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class IterJsonArrayTests(SimpleTestCase):
+    items = [
+        {'id': 1, 'name': 'Brighton & Hove Albion', 'note': 'say "matches": [1, 2]'},
+        {'id': 2, 'name': 'Atlético de Madrid', 'path': 'C:\\teams\\', 'quote': '\\"'},
+        {'id': 3, 'nested': {'matches': [{'id': 99}]}, 'list': [[1, 2], {'a': ']'}]},
+    ]
+    document = json.dumps({
+        'filters': {'matches': [{'id': 0}]},
+        'decoy': '"matches": [{"id": -1}]',
+        'matches': items,
+        'after': {'id': 4},
+    })
+
+    def test_every_chunk_split(self):
+        for size in range(1, len(self.document) + 1):
+            with self.subTest(size=size):
+                chunks = split_every(self.document, size)
+                self.assertEqual(list(iter_json_array(chunks, 'matches')), self.items)
+
+    def test_missing_key_yields_nothing(self):
+        self.assertEqual(list(iter_json_array(split_every(self.document, 7), 'standings')), [])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array(['{"matches": [', ' ]}'], 'matches')), [])
+
+    def test_truncated_body_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_array([self.document[:-40]], 'matches'))
+
+    def test_decode_chunks_joins_split_characters(self):
+        body = self.document.encode()
+        for size in (1, 2, 3, 5):
+            with self.subTest(size=size):
+                chunks = [body[i:i + size] for i in range(0, len(body), size)]
+                self.assertEqual(list(iter_json_array(decode_chunks(chunks), 'matches')), self.items)
+
+
+class FlakyBackfill(SeasonBackfill):
+    """Replays a season of matches, dropping the connection after fail_after items"""
+
+    def __init__(self, matches, fail_after=None):
+        super().__init__('PL', chunk_rows=2, attempts=1)
+        self.matches = matches
+        self.fail_after = fail_after
+        self.streamed = 0
+
+    def stream(self, feed, season):
+        for i, match in enumerate(self.matches):
+            if i == self.fail_after:
+                raise requests.ConnectionError('connection reset')
+            self.streamed += 1
+            yield match
+
+
+class BackfillResumeTests(WriterTestCase):
+    def setUp(self):
+        self.matches = [
+            match_payload(i, f"Home {name}", f"Away {name}", utc_date='2024-09-01T14:00:00Z',
+                          status='FINISHED', score=(1, 0))
+            for i, name in enumerate(['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo'], start=1)
+        ]
+
+    def progress(self):
+        return BackfillProgress.objects.get(competition='PL', season=2024, feed='matches')
+
+    def test_resumes_after_last_committed_chunk(self):
+        with self.assertRaises(requests.ConnectionError):
+            FlakyBackfill(self.matches, fail_after=3).run([2024], ['matches'])
+        # The first chunk of two committed; the third match died with its chunk
+        self.assertEqual(self.progress().rows_done, 2)
+        self.assertEqual(Match.objects.count(), 2)
+        self.assertIn('connection reset', self.progress().last_error)
+
+        resumed = FlakyBackfill(self.matches)
+        self.assertEqual(resumed.run([2024], ['matches']), {(2024, 'matches'): 3})
+        self.assertEqual(Match.objects.count(), 5)
+        progress = self.progress()
+        self.assertEqual(progress.rows_done, 5)
+        self.assertIsNotNone(progress.completed_at)
+
+    def test_completed_season_is_skipped(self):
+        FlakyBackfill(self.matches).run([2024], ['matches'])
+        again = FlakyBackfill(self.matches)
+        self.assertEqual(again.run([2024], ['matches']), {(2024, 'matches'): 0})
+        self.assertEqual(again.streamed, 0)
@@ -7,6 +7,13 @@ urlpatterns = [
     path('signup/', views.signup_view, name='signup'),
     path('logout/', views.logout_view, name='logout'),
     path('epl/', views.epl, name='epl'),
+    path('competitions/<str:code>/table/', views.league_table, name='league_table'),
     path('match/<int:match_id>/', views.match_details, name='match_details'),
+    path('arbitrage/', views.arbitrage, name='arbitrage'),
     path('api/matches/', views.get_matches, name='get_matches'),
+    path('api/live/', views.live_stream, name='live_stream'),
+    path('api/arbitrage/', views.arbitrage_api, name='arbitrage_api'),
+    path('api/matches/<int:match_id>/odds-history/', views.odds_history, name='odds_history'),
+    path('api/export/<str:dataset>/', views.export, name='export'),
+    path('metrics', views.prometheus_metrics, name='metrics'),
 ]
\ No newline at end of file
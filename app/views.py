@@ -1,54 +1,103 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.core.cache import cache
 from django.contrib.auth import authenticate, login
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import parse_etags, quote_etag
+from datetime import datetime, timedelta
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import math
 from pytz import timezone as pytz_timezone
-from .models import Match, LeagueTable, Team
-from .services import FootballDataService
-import os
+from asgiref.sync import sync_to_async
+from .models import Match, LeagueTable, Team, ArbitrageOpportunity, FeedStatus
+from .competitions import COMPETITIONS, DEFAULT_COMPETITION, competition_named, enabled_competitions
+from .ingestion import afeed_freshness, feed_freshness
+from .page_cache import afeed_versions, cache_page_for_anonymous
+from .live import broadcaster
+from .odds import OUTCOMES, summarize_odds
+from .market import annotate_odds
+from .fixture_weeks import aupcoming_fixtures, next_fixture_ids, upcoming_fixtures
+from . import metrics
+from .odds_history import opening_line, closing_line, largest_move, downsample
+from . import exports
 from django.contrib.auth.forms import UserCreationForm
-from django.http import JsonResponse
+from django.http import (
+    HttpResponse, HttpResponseForbidden, HttpResponseNotAllowed, HttpResponseNotModified,
+    JsonResponse, StreamingHttpResponse,
+)
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth import logout
+from django.conf import settings
 
 def home(request):
     if request.user.is_authenticated:
-        service = FootballDataService()
-        service.fetch_league_table()
-        standings = LeagueTable.objects.all().order_by('position')
+        competition = COMPETITIONS[DEFAULT_COMPETITION]
+        # Lazy, so a cached table fragment never runs this query
+        standings = LeagueTable.objects.filter(
+            competition=competition.name
+        ).select_related('team').order_by('position')
         return render(request, 'index.html', {
-            'standings': standings
+            'competition': competition,
+            'standings': standings,
+            'freshness': feed_freshness(competition.feed_name('league_table')),
         })
     return render(request, 'index.html')
 
-def epl(request):
-    print("Starting EPL view...")
-    print(f"API Key: {os.getenv('FOOTBALL_DATA_API_KEY')}")
-    # Update matches from API
-    service = FootballDataService()
-    print("Created FootballDataService instance")
-    
-    print("Calling update_matches...")
-    service.update_matches()
-    print("Finished update_matches")
-    
-    # Get upcoming matches
-    print("Fetching matches from database...")
-    upcoming_matches = Match.objects.filter(
-        match_date__gte=timezone.now(),
-        status='scheduled'
-    ).order_by('match_date')
-    print(f"Found {upcoming_matches.count()} matches in database")
+@cache_page_for_anonymous(lambda request, code: [f"{code.upper()}:league_table"])
+def league_table(request, code):
+    competition = COMPETITIONS.get(code.upper())
+    if competition is None:
+        raise Http404('Unknown competition')
+    standings = LeagueTable.objects.filter(
+        competition=competition.name
+    ).select_related('team').order_by('position')
+    return render(request, 'league_table.html', {
+        'competition': competition,
+        'competitions': enabled_competitions(),
+        'standings': standings,
+        'freshness': feed_freshness(competition.feed_name('league_table')),
+    })
+
+@cache_page_for_anonymous(
+    lambda request: [COMPETITIONS['PL'].feed_name(feed) for feed in ('matches', 'live')]
+)
+async def epl(request):
+    # Matches are refreshed by the background ingestor (manage.py run_ingestor)
+    competition = COMPETITIONS['PL']
     
     # Set timezone to EST
     est = pytz_timezone('America/New_York')
-    
+
+    def local_fixtures():
+        fixtures = upcoming_fixtures(competition.name)
+        for fixture in fixtures:
+            # Converted once here; naive, so the date filters don't convert again per cell
+            fixture['kickoff_local'] = fixture['kickoff_at'].astimezone(est).replace(tzinfo=None)
+        return fixtures
+
     context = {
-        'matches': upcoming_matches,
+        'competition': competition,
+        # Lazy: read from the FixtureWeek read model (inside render's thread) only when
+        # the fixtures fragment isn't already cached for the current fixture versions
+        'matches': SimpleLazyObject(local_fixtures),
+        # Fixtures drop off at kickoff, which no feed version tracks
+        'cache_timeout': settings.PAGE_CACHE_TIMEOUT,
+        # The window feed and the live poller both change which fixtures are listed
+        'fixtures_version': '.'.join(map(str, await afeed_versions(
+            [competition.feed_name('matches'), competition.feed_name('live')]
+        ))),
         'user_timezone': est,
+        'freshness': await afeed_freshness(competition.feed_name('matches')),
     }
-    return render(request, 'epl.html', context)
+    # Rendering reads the session and user, which are sync-only in Django 4.2
+    return await sync_to_async(render)(request, 'epl.html', context)
 
 def login_view(request):
     if request.user.is_authenticated:
@@ -71,26 +120,50 @@ def logout_view(request):
     logout(request)
     return redirect('login')
 
-def match_details(request, match_id):
+def match_page_feeds(request, match_id):
+    # The match's competition isn't known before it is loaded, so depend on them all
+    return [
+        competition.feed_name(feed)
+        for competition in enabled_competitions() for feed in ('matches', 'live', 'odds')
+    ]
+
+@cache_page_for_anonymous(match_page_feeds)
+async def match_details(request, match_id):
     try:
-        match = Match.objects.get(id=match_id)
-        user_timezone = request.session.get('user_timezone', 'UTC')
-        
-        # Get odds for this specific match
-        football_service = FootballDataService()
-        odds_data = football_service.get_odds_for_match(match)
-        
+        match = await Match.objects.select_related('home_team', 'away_team', 'market').aget(id=match_id)
+        user_timezone = await sync_to_async(request.session.get)('user_timezone', 'UTC')
+        freshness = await afeed_freshness(competition_named(match.competition).feed_name('odds'))
+
+        # Odds are refreshed in bulk by the ingestor; summarize what is stored once per version
+        odds_key = f"odds-summary:{match.id}:{freshness['version']}"
+        odds_data = await cache.aget(odds_key)
+        if odds_data is None:
+            quotes = [quote async for quote in match.bookmaker_odds.all()]
+            odds_data = summarize_odds([
+                {
+                    'name': quote.bookmaker,
+                    'home_win': quote.home_win_odds,
+                    'draw': quote.draw_odds,
+                    'away_win': quote.away_win_odds,
+                }
+                for quote in quotes
+            ]) or {}
+            # Margins, fair odds and edges were computed by the ingestor after the refresh
+            annotate_odds(odds_data, getattr(match, 'market', None))
+            await cache.aset(odds_key, odds_data, settings.PAGE_CACHE_TIMEOUT)
+
         context = {
             'match': match,
             'user_timezone': user_timezone,
-            'odds': odds_data
+            'odds': odds_data or None,
+            'freshness': freshness,
         }
-        return render(request, 'match_details.html', context)
+        return await sync_to_async(render)(request, 'match_details.html', context)
     except Match.DoesNotExist:
-        messages.error(request, 'Match not found.')
+        await sync_to_async(messages.error)(request, 'Match not found.')
         return redirect('epl')
     except Exception as e:
-        messages.error(request, f'Error loading match details: {str(e)}')
+        await sync_to_async(messages.error)(request, f'Error loading match details: {str(e)}')
         return redirect('epl')
 
 def signup_view(request):
@@ -107,24 +180,318 @@ def signup_view(request):
                     messages.error(request, f"{field}: {error}")
     return render(request, 'signup.html')
 
+# Fields selectable with ?fields= on /api/matches/, read from FixtureWeek fixture documents
+MATCH_API_FIELDS = {
+    'id': lambda fixture, competition: fixture['id'],
+    'home_team': lambda fixture, competition: fixture['home_team']['name'],
+    'away_team': lambda fixture, competition: fixture['away_team']['name'],
+    'match_date': lambda fixture, competition: fixture['kickoff_at'].strftime('%Y-%m-%d %H:%M:%S'),
+    'status': lambda fixture, competition: fixture['status'],
+    'competition': lambda fixture, competition: competition.name,
+    'venue': lambda fixture, competition: fixture['venue'],
+    'matchweek': lambda fixture, competition: fixture['matchweek'],
+}
+DEFAULT_MATCH_API_FIELDS = ['id', 'home_team', 'away_team', 'match_date', 'status']
+MATCH_API_PAGE_SIZE = 50
+MATCH_API_MAX_PAGE_SIZE = 200
+
+def encode_cursor(fixture):
+    """Opaque keyset cursor pointing just past this fixture in (kickoff, id) order"""
+    raw = f"{fixture['kickoff_at'].isoformat()}|{fixture['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        match_date, match_id = raw.split('|')
+        kickoff = datetime.fromisoformat(match_date)
+        match_id = int(match_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    # encode_cursor always writes an offset; a naive time can't be compared with kickoffs
+    if kickoff.tzinfo is None:
+        raise ValueError('Invalid cursor: kickoff has no UTC offset')
+    return kickoff, match_id
+
+def serialize_match(fixture, competition, fields, embed_odds):
+    data = {field: MATCH_API_FIELDS[field](fixture, competition) for field in fields}
+    if embed_odds:
+        # Best available price per outcome, or None before any odds are ingested
+        data['odds'] = fixture['odds']
+    return data
+
+async def get_matches(request):
+    """Upcoming matches as keyset-paginated JSON
+
+    Query params: competition (code, default PL), limit, cursor (from next_cursor),
+    fields (comma-separated subset of MATCH_API_FIELDS) and embed=odds for best prices.
+    Fixtures come from the FixtureWeek read model, with no joins. Responses carry a
+    strong ETag built from the ingestion versions, so repeat polls with If-None-Match
+    get a 304 before any fixture is loaded.
+    """
+    # require_http_methods only wraps sync views in Django 4.2
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    competition = COMPETITIONS.get(request.GET.get('competition', DEFAULT_COMPETITION).upper())
+    if competition is None:
+        return JsonResponse({'error': 'Unknown competition'}, status=400)
+
+    fields = [f.strip() for f in request.GET.get('fields', '').split(',') if f.strip()]
+    fields = fields or DEFAULT_MATCH_API_FIELDS
+    unknown = set(fields) - set(MATCH_API_FIELDS)
+    if unknown:
+        return JsonResponse({'error': f"Unknown field(s): {', '.join(sorted(unknown))}"}, status=400)
+    embed_odds = 'odds' in request.GET.get('embed', '').split(',')
+    try:
+        limit = min(MATCH_API_MAX_PAGE_SIZE, max(1, int(request.GET.get('limit', MATCH_API_PAGE_SIZE))))
+        cursor = request.GET.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # The page only changes when an ingest writes new data or a kickoff passes,
+    # so the ETag needs the feed versions and the next fixture, not the documents
+    now = timezone.now()
+    feeds = [competition.feed_name('matches'), competition.feed_name('live')]
+    if embed_odds:
+        feeds.append(competition.feed_name('odds'))
+    statuses = {status.name: status async for status in FeedStatus.objects.filter(name__in=feeds)}
+    versions = {name: status.version for name, status in statuses.items()}
+    first = await next_fixture_ids(competition.name, now).afirst()
+    etag = quote_etag(hashlib.sha256(json.dumps([
+        [versions.get(name, 0) for name in feeds], first,
+        competition.code, fields, embed_odds, limit, cursor,
+    ]).encode()).hexdigest()[:32])
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    upcoming = await aupcoming_fixtures(competition.name, now)
+    if after is not None:
+        # Fixtures are already in (kickoff, id) order, so skip everything up to the cursor
+        upcoming = [
+            fixture for fixture in upcoming
+            if (fixture['kickoff_at'], fixture['id']) > after
+        ]
+    page = upcoming[:limit + 1]
+
+    has_more = len(page) > limit
+    page = page[:limit]
+    response = JsonResponse({
+        'matches': [serialize_match(fixture, competition, fields, embed_odds) for fixture in page],
+        'next_cursor': encode_cursor(page[-1]) if has_more else None,
+        'version': versions.get(competition.feed_name('matches'), 0),
+    })
+    response['ETag'] = etag
+    # Freshness changes every second, so it travels in headers rather than the tagged body
+    freshness = feed_freshness(feeds[0], statuses.get(feeds[0]) or FeedStatus(name=feeds[0]))
+    if freshness['last_updated']:
+        response['X-Data-Last-Updated'] = freshness['last_updated'].isoformat()
+    response['X-Data-Stale'] = 'true' if freshness['is_stale'] else 'false'
+    # Let clients cache but always revalidate; the ETag makes that cheap
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+async def live_stream(request):
+    """Server-Sent Events stream of score, status and odds changes
+
+    Optional ?competition=<code> or ?match=<id> narrow the stream. Reconnecting
+    clients send Last-Event-ID and get the recent events they missed.
+    """
+    # require_http_methods only wraps sync views in Django 4.2
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    competition = None
+    if request.GET.get('competition'):
+        competition = COMPETITIONS.get(request.GET['competition'].upper())
+        if competition is None:
+            return JsonResponse({'error': 'Unknown competition'}, status=400)
+    try:
+        match_id = int(request.GET['match']) if request.GET.get('match') else None
+        last_event_id = int(request.headers.get('Last-Event-ID') or 0)
+    except ValueError:
+        return JsonResponse({'error': 'match and Last-Event-ID must be integers'}, status=400)
+
+    loop = asyncio.get_running_loop()
+
+    async def events():
+        # Subscribe only once the server starts streaming, so the finally always runs
+        subscriber = broadcaster.subscribe(competition and competition.name, match_id)
+        # Django 4.2 can't tell a streaming view that the client went away, so streams
+        # end on their own; EventSource reconnects and resumes from Last-Event-ID
+        deadline = loop.time() + settings.LIVE_MAX_STREAM_SECONDS
+        try:
+            yield f"retry: {settings.LIVE_RETRY_MS}\n\n"
+            for _, message in broadcaster.replay(subscriber, last_event_id):
+                yield message
+            while not (subscriber.dropped and subscriber.queue.empty()):
+                timeout = min(settings.LIVE_HEARTBEAT_INTERVAL, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    # Comment line; keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield message
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @require_http_methods(["GET"])
-def get_matches(request):
-    service = FootballDataService()
-    service.update_matches()
-    
-    matches = Match.objects.filter(
-        match_date__gte=timezone.now(),
-        status='scheduled'
-    ).order_by('match_date')
-    
-    matches_data = []
-    for match in matches:
-        matches_data.append({
-            'id': match.id,
-            'home_team': match.home_team.name,
-            'away_team': match.away_team.name,
-            'match_date': match.match_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'status': match.status
+def odds_history(request, match_id):
+    """Opening and closing lines, the largest move and (per bookmaker) an OHLC series
+
+    ?from and ?to (ISO dates, to inclusive, as for exports) limit the largest move
+    and the series to prices seen in that window.
+    """
+    match = get_object_or_404(Match, id=match_id)
+    bookmaker_key = request.GET.get('bookmaker')
+    outcome = request.GET.get('outcome', 'home_win')
+    try:
+        bucket_seconds = max(60, int(request.GET.get('bucket', 3600)))
+    except ValueError:
+        return JsonResponse({'error': 'bucket must be an integer number of seconds'}, status=400)
+    try:
+        start, end = exports.parse_date_range(request.GET) or (None, None)
+    except exports.ExportError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    def serialize_line(line):
+        return [
+            {'bookmaker': key, 'outcome': name, 'price': price}
+            for (key, name), price in line.items()
+        ]
+
+    data = {
+        'opening': serialize_line(opening_line(match, bookmaker_key)),
+        'closing': serialize_line(closing_line(match, bookmaker_key)),
+        'largest_move': largest_move(match, start, end, bookmaker_key=bookmaker_key),
+    }
+    if bookmaker_key:
+        data['series'] = [
+            {'time': bucket_start, 'open': open_, 'high': high, 'low': low, 'close': close}
+            for bucket_start, open_, high, low, close in downsample(
+                match, bookmaker_key, outcome, bucket_seconds, start, end
+            )
+        ]
+    return JsonResponse(data)
+
+async def export(request, dataset):
+    """Stream a dataset as CSV, NDJSON or Parquet
+
+    ?format=csv|ndjson|parquet (default csv); ?competition, ?season, ?from, ?to and
+    ?bookmaker filter the rows, see exports.parse_filters.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    fmt = request.GET.get('format', 'csv')
+    try:
+        chunks, content_type = exports.export(dataset, fmt, exports.parse_filters(request.GET))
+    except exports.ExportError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+
+    async def body():
+        # An async iterator, as ASGI would buffer a sync one; rows are read one chunk
+        # at a time on the sync thread that holds the database connection
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+
+    response = StreamingHttpResponse(body(), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+# Widest kickoff window the arbitrage filters accept
+ARBITRAGE_MAX_HOURS = 24 * 366
+
+def parse_number(value, minimum=-math.inf, maximum=math.inf):
+    """float(value), raising ValueError for NaN, infinities and values outside [minimum, maximum]"""
+    number = float(value)
+    if not (math.isfinite(number) and minimum <= number <= maximum):
+        raise ValueError(f"{value} is out of range")
+    return number
+
+def filter_opportunities(params):
+    """Apply the scanner's query-string filters; raises ValueError on bad input"""
+    opportunities = ArbitrageOpportunity.objects.filter(
+        match_date__gte=timezone.now()
+    ).select_related('match__home_team', 'match__away_team')
+
+    if params.get('min_margin'):
+        opportunities = opportunities.filter(profit_pct__gte=parse_number(params['min_margin']))
+    if params.get('hours'):
+        hours = parse_number(params['hours'], 0, ARBITRAGE_MAX_HOURS)
+        opportunities = opportunities.filter(match_date__lte=timezone.now() + timedelta(hours=hours))
+    if params.get('bookmakers'):
+        # Every leg must be placeable at one of the allowed bookmakers, by bookmaker_key
+        allowed = [key.strip() for key in params['bookmakers'].split(',') if key.strip()]
+        opportunities = opportunities.filter(
+            home_win_bookmaker_key__in=allowed,
+            draw_bookmaker_key__in=allowed,
+            away_win_bookmaker_key__in=allowed,
+        )
+    return opportunities.order_by('-profit_pct')
+
+@require_http_methods(["GET"])
+def arbitrage_api(request):
+    try:
+        opportunities = filter_opportunities(request.GET)
+    except ValueError:
+        return JsonResponse({'error': 'min_margin and hours must be numbers'}, status=400)
+
+    data = []
+    for opportunity in opportunities:
+        data.append({
+            'match_id': opportunity.match_id,
+            'home_team': opportunity.match.home_team.name,
+            'away_team': opportunity.match.away_team.name,
+            'match_date': opportunity.match_date.isoformat(),
+            'profit_pct': round(opportunity.profit_pct, 2),
+            'total_probability': round(opportunity.total_probability * 100, 2),
+            'legs': [
+                {
+                    'outcome': outcome,
+                    'bookmaker': getattr(opportunity, f"{outcome}_bookmaker"),
+                    'bookmaker_key': getattr(opportunity, f"{outcome}_bookmaker_key"),
+                    'price': float(getattr(opportunity, f"{outcome}_odds")),
+                }
+                for outcome in OUTCOMES
+            ],
+            'computed_at': opportunity.computed_at.isoformat(),
         })
-    
-    return JsonResponse({'matches': matches_data})
\ No newline at end of file
+    return JsonResponse({'opportunities': data})
+
+def arbitrage(request):
+    try:
+        opportunities = filter_opportunities(request.GET)
+    except ValueError:
+        messages.error(request, 'Minimum margin and kickoff window must be numbers.')
+        opportunities = filter_opportunities({})
+
+    return render(request, 'arbitrage.html', {
+        'opportunities': opportunities,
+        'filters': request.GET,
+        'user_timezone': pytz_timezone('America/New_York'),
+        'freshness': feed_freshness(COMPETITIONS[DEFAULT_COMPETITION].feed_name('odds')),
+    })
+
+@require_http_methods(["GET"])
+def prometheus_metrics(request):
+    """This process's request, upstream and ingestion metrics in Prometheus text format"""
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
@@ -96,7 +96,108 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 TAILWIND_APP_NAME = 'theme'
 
+# Background ingestion (manage.py run_ingestor), intervals in seconds per feed
+INGESTION_INTERVALS = {
+    'matches': int(os.getenv('INGEST_MATCHES_INTERVAL', '300')),
+    # How often the fixture poller checks for due fixtures (see FIXTURE_POLL_INTERVALS)
+    'live': int(os.getenv('INGEST_LIVE_INTERVAL', '10')),
+    'league_table': int(os.getenv('INGEST_LEAGUE_TABLE_INTERVAL', '900')),
+    # Each bulk odds refresh costs one Odds API credit
+    'odds': int(os.getenv('INGEST_ODDS_INTERVAL', '900')),
+}
+
+# Per-fixture poll intervals in seconds (app/scheduling.py), by match status and time to kickoff
+FIXTURE_POLL_INTERVALS = {
+    'live': 30,
+    'kickoff': 120,  # kickoff within the hour
+    'today': 1800,  # within 24 hours
+    'week': 6 * 3600,  # within 7 days
+    'far': 24 * 3600,
+}
+# Fixtures fetched per /matches?ids= call
+FIXTURE_POLL_BATCH_SIZE = 50
+
+# football-data.org competition codes to ingest (see app/competitions.py)
+INGEST_COMPETITIONS = [
+    code.strip() for code in os.getenv('INGEST_COMPETITIONS', 'PL').split(',') if code.strip()
+]
+
+# Historical loads (manage.py backfill, app/backfill.py): upstream items written per
+# transaction, and the share of the football-data.org rate limit the backfill's own
+# client may use. The ingestor is a separate process with its own full budget; the two
+# only meet in football-data.org's remaining-requests header, so lower this (or pause
+# the ingestor) to stay under the limit while both run.
+BACKFILL_CHUNK_ROWS = int(os.getenv('BACKFILL_CHUNK_ROWS', '200'))
+BACKFILL_RATE_SHARE = float(os.getenv('BACKFILL_RATE_SHARE', '0.5'))
+
+# Data exports (/api/export/, manage.py export, app/exports.py): rows fetched from the
+# database cursor and written to the response per chunk (one Parquet row group each)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Server-Sent Events at /api/live/ (app/live.py). The broadcaster checks feed
+# versions every LIVE_POLL_INTERVAL seconds, however many clients are connected.
+LIVE_POLL_INTERVAL = float(os.getenv('LIVE_POLL_INTERVAL', '2'))
+LIVE_HEARTBEAT_INTERVAL = 15
+LIVE_RETRY_MS = 5000
+# Streams close after this long and the browser reconnects, which bounds how long a
+# vanished client can hold a subscription
+LIVE_MAX_STREAM_SECONDS = 300
+# Events buffered per client before a slow reader is disconnected
+LIVE_QUEUE_SIZE = 100
+
+# Pooled HTTP clients for upstream APIs (app/http_client.py)
+UPSTREAM_APIS = {
+    'football_data': {
+        # Free tier allows 10 requests per minute
+        'rate_per_minute': int(os.getenv('FOOTBALL_DATA_RATE_PER_MINUTE', '10')),
+        'remaining_header': 'X-Requests-Available-Minute',
+        'reset_header': 'X-RequestCounter-Reset',
+    },
+    'odds_api': {
+        'rate_per_minute': int(os.getenv('ODDS_API_RATE_PER_MINUTE', '30')),
+        # Monthly credit quota; keep a few credits back for manual use
+        'quota_header': 'X-Requests-Remaining',
+        'quota_reserve': int(os.getenv('ODDS_API_QUOTA_RESERVE', '10')),
+    },
+}
+
+# Cache for upstream API responses (app/http_cache.py).
+# BACKEND is one of 'lru', 'filesystem' or 'django'; TTLS are seconds per endpoint.
+HTTP_RESPONSE_CACHE = {
+    'BACKEND': os.getenv('HTTP_CACHE_BACKEND', 'lru'),
+    'OPTIONS': (
+        {'directory': os.getenv('HTTP_CACHE_DIR', str(BASE_DIR / '.http_cache'))}
+        if os.getenv('HTTP_CACHE_BACKEND') == 'filesystem' else {}
+    ),
+    'DEFAULT_TTL': 60,
+    'TTLS': {
+        'matches': 60,
+        'standings': 300,
+    },
+}
+
+# Shared by the page/fragment cache (app/page_cache.py) and the 'django' HTTP cache backend.
+# Use a shared backend (e.g. memcached) when running more than one web process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'footybetz',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Cached pages are keyed on feed versions, so this only bounds how long a page
+# can show a fixture that has already kicked off
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '300'))
+
+# Prometheus metrics (app/metrics.py). /metrics requires "Authorization: Bearer <token>"
+# when METRICS_TOKEN is set; the ingestor serves its own on INGEST_METRICS_PORT.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+INGEST_METRICS_PORT = int(os.getenv('INGEST_METRICS_PORT', '0')) or None
+
 MIDDLEWARE = [
+    # First, so its timings and Server-Timing header cover the rest of the stack
+    'app.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -131,13 +232,40 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# One SQLite file behind three aliases: 'default' for auth/sessions and ad-hoc writes,
+# 'writer' for ingestion and 'reader' (query_only) for page views; see app/db/router.py.
+# The app.db.sqlite3 backend applies SQLITE_PRAGMAS on connect.
+SQLITE_PRAGMAS = {
+    # Readers never block on the writer, and the writer never blocks readers
+    'journal_mode': 'WAL',
+    # Safe with WAL: a crash can lose the last commits but never corrupts the file
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,  # KiB, i.e. 64 MB per connection
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_database(**extra):
+    return {
+        'ENGINE': 'app.db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        # Seconds to wait for a lock before raising "database is locked"
+        'OPTIONS': {'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20'))},
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        **extra,
     }
+
+
+DATABASES = {
+    'default': sqlite_database(),
+    'writer': sqlite_database(TEST={'MIRROR': 'default'}),
+    'reader': sqlite_database(READ_ONLY=True, TEST={'MIRROR': 'default'}),
 }
 
+DATABASE_ROUTERS = ['app.db.router.DatabaseRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators